@@ -48,17 +48,18 @@ def main():
         game_state = GameStateImpl()
         lore_keeper = LoreKeeperImpl()
         dungeon_master = DungeonMasterImpl(game_state=game_state, persona_type=selected_persona)
+        dungeon_master.set_chunk_locator(lore_keeper.locate_chunk)
         
-        # 3. Data Loading (MVP: Load the default story file)
-        story_path = os.path.join(os.path.dirname(__file__), 'data', 'story.txt')
-        if os.path.exists(story_path):
-            output_display.display_system(f"📚 스토리 로딩 중: {story_path}")
-            lore_keeper.load_book(story_path)
+        # 3. Data Loading (every tale under data/)
+        data_dir = os.path.join(os.path.dirname(__file__), 'data')
+        if os.path.isdir(data_dir):
+            output_display.display_system(f"📚 스토리 로딩 중: {data_dir}")
+            lore_keeper.load_library(data_dir)
             output_display.display_system("🔍 벡터 인덱스 생성 중... (Ollama 임베딩 모델 필요)")
             lore_keeper.build_index()
             output_display.display_system("✅ 지식 베이스 준비 완료!")
         else:
-            output_display.display_system("⚠️ Warning: story.txt not found. Starting with empty knowledge.")
+            output_display.display_system("⚠️ Warning: data/ not found. Starting with empty knowledge.")
 
         # 3. Setup AI Persona
         # Note: System prompt is already set by DungeonMasterImpl based on selected persona.
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ANN(IVF) 검색 벤치마크
+코퍼스 크기별로 정확(brute-force) 검색과 IVF 근사 검색의 recall@k 및 p50/p99 지연을 비교합니다.
+
+story.txt 문단을 섞어 이어 붙인 텍스트에서 임의 위치의 1000자 청크를 잘라
+오프라인 해싱 임베더로 임베딩하므로 네트워크 없이 실행됩니다.
+사용법: python scripts/benchmark_ann_search.py [--sizes 10000 50000 100000] [--nprobe 4 8 16]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Windows 콘솔 UTF-8 인코딩 설정
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+    sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+import numpy as np
+from src.impl.hashing_embeddings import HashingEmbeddings
+from src.impl.vector_store import NumpyVectorStore
+
+QUERIES = [
+    "두꺼비를 도와준다",
+    "밑 빠진 독에 물을 채운다",
+    "새어머니에게 따진다",
+    "참새들이 곡식을 골라준다",
+    "잔치에 몰래 간다",
+    "원님 아들과 꽃신",
+]
+
+
+def build_corpus(size, chunk_chars=1000, seed=42):
+    """문단을 섞어 이어 붙인 긴 텍스트에서 임의 위치의 청크를 size 개 잘라냄"""
+    story_path = os.path.join(project_root, 'data', 'story.txt')
+    with open(story_path, 'r', encoding='utf-8') as f:
+        paragraphs = [p.strip() for p in f.read().split("\n\n") if p.strip()]
+    rng = random.Random(seed)
+    stream = []
+    for _ in range(20):
+        shuffled = paragraphs[:]
+        rng.shuffle(shuffled)
+        stream.extend(shuffled)
+    text = "\n\n".join(stream)
+    return [text[start:start + chunk_chars]
+            for start in (rng.randrange(0, len(text) - chunk_chars) for _ in range(size))]
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def run_queries(store, query_vectors, k):
+    timings, results = [], []
+    for q in query_vectors:
+        start = time.perf_counter()
+        results.append(store.search(q, k=k))
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return results, timings
+
+
+def recall(results, expected, vectors, query_vectors, k):
+    """k번째 정답 거리 이하(동점 포함)인 결과를 정답으로 계산"""
+    total = 0.0
+    for found, truth, q in zip(results, expected, query_vectors):
+        kth = max(d for _, d in truth)
+        total += sum(1 for row, _ in found if float(((vectors[row] - q) ** 2).sum()) <= kth + 1e-4) / k
+    return total / len(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IVF ANN search benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000, 100000], help="코퍼스 청크 수")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32], help="탐색할 리스트 수")
+    parser.add_argument("--dim", type=int, default=768, help="임베딩 차원")
+    parser.add_argument("--k", type=int, default=3, help="top-k")
+    parser.add_argument("--queries", type=int, default=200, help="측정 쿼리 수")
+    args = parser.parse_args()
+
+    embedder = HashingEmbeddings(dimension=args.dim)
+    largest = build_corpus(max(args.sizes))
+    start = time.perf_counter()
+    all_vectors = embedder.embed_array(largest)
+    print(f"📚 {len(largest)} 청크 x {args.dim}차원 임베딩: {time.perf_counter() - start:.1f}s\n")
+
+    rng = random.Random(7)
+    query_texts = QUERIES + [c[rng.randrange(0, 800):][:120] for c in rng.sample(largest, args.queries - len(QUERIES))]
+    query_vectors = embedder.embed_array(query_texts)
+
+    print(f"{'chunks':>8}{'method':>14}{f'recall@{args.k}':>11}{'p50(ms)':>10}{'p99(ms)':>10}{'scanned':>10}")
+    for size in args.sizes:
+        vectors = all_vectors[:size]
+        ids = [str(i) for i in range(size)]
+
+        exact = NumpyVectorStore()
+        exact.add_embeddings(ids, ids, vectors)
+        expected, timings = run_queries(exact, query_vectors, args.k)
+        print(f"{size:>8}{'exact':>14}{1.0:>11.3f}{percentile(timings, 0.5):>10.2f}"
+              f"{percentile(timings, 0.99):>10.2f}{'100%':>10}")
+
+        store = NumpyVectorStore(ann="ivf", ann_min_rows=0)
+        store.add_embeddings(ids, ids, vectors)
+        start = time.perf_counter()
+        ivf = store.build_ann()
+        build_s = time.perf_counter() - start
+        for nprobe in args.nprobe:
+            store.nprobe = nprobe
+            results, timings = run_queries(store, query_vectors, args.k)
+            scanned = np.mean([len(ivf.probe(q, nprobe)) for q in query_vectors[:20]]) / size
+            print(f"{size:>8}{f'ivf p={nprobe}':>14}{recall(results, expected, vectors, query_vectors, args.k):>11.3f}"
+                  f"{percentile(timings, 0.5):>10.2f}{percentile(timings, 0.99):>10.2f}{scanned:>10.1%}")
+        print(f"{'':>8}  ⏱️ IVF 생성 {build_s:.1f}s ({ivf.n_lists} lists)\n")
+
+
+if __name__ == "__main__":
+    main()
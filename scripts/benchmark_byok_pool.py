@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BYOK 클라이언트 풀 벤치마크
+턴마다 임베딩 클라이언트 + Chroma 핸들을 새로 만드는 기존 방식과
+API Key 해시 기반 풀(KeyedClientPool)을 재사용하는 방식의 턴당 오버헤드를 비교합니다.
+
+네트워크 호출 없이 객체 생성 비용만 측정합니다 (임베딩 요청은 보내지 않음).
+사용법: python scripts/benchmark_byok_pool.py [--turns 50] [--users 5]
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+# Windows 콘솔 UTF-8 인코딩 설정
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+    sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from src.impl.lore_keeper_impl import LoreKeeperImpl
+from src.impl.retrieval_metrics import format_metrics
+
+
+def measure(fn, api_keys, turns):
+    timings = []
+    for turn in range(turns):
+        api_key = api_keys[turn % len(api_keys)]
+        start = time.perf_counter()
+        fn(api_key)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.mean(timings), timings[len(timings) // 2], timings[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BYOK client pool benchmark")
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--users", type=int, default=5, help="서로 다른 API Key 개수")
+    args = parser.parse_args()
+
+    # BYOK 풀은 Gemini 경로에서만 쓰입니다 (local/offline은 사용자 키를 무시하므로 풀이 비어 있음).
+    # vector_backend처럼 provider도 고정해 주변 환경의 AI_PROVIDER와 무관하게 측정합니다.
+    if os.getenv("AI_PROVIDER", "google").lower() != "google":
+        print(f"[INFO] AI_PROVIDER={os.getenv('AI_PROVIDER')} 대신 google로 측정합니다 (BYOK 풀은 google 전용).")
+    os.environ["AI_PROVIDER"] = "google"
+
+    db_path = tempfile.mkdtemp(prefix="byok_bench_")
+    try:
+        keeper = LoreKeeperImpl()
+        keeper.db_path = db_path
+        keeper.vector_backend = "chroma"
+        api_keys = [f"dummy-key-{i:02d}" for i in range(args.users)]
+
+        fresh = measure(keeper._create_user_search_target, api_keys, args.turns)
+        pooled = measure(keeper._resolve_search_target, api_keys, args.turns)
+
+        print(f"🔑 사용자 {args.users}명, {args.turns}턴\n")
+        print(f"{'method':<14}{'mean(ms)':>10}{'p50(ms)':>10}{'max(ms)':>10}")
+        print(f"{'fresh':<14}{fresh[0]:>10.2f}{fresh[1]:>10.2f}{fresh[2]:>10.2f}")
+        print(f"{'pooled':<14}{pooled[0]:>10.2f}{pooled[1]:>10.2f}{pooled[2]:>10.2f}")
+        print(f"\n📊 pool: {keeper.get_byok_pool_stats()}")
+        print(f"⏱️ 풀 조회 구간 (byok_client):\n{format_metrics(keeper.get_retrieval_metrics())}")
+        print(f"⚡ 턴당 평균 오버헤드 감소: x{fresh[0] / max(pooled[0], 1e-6):.0f}")
+    finally:
+        shutil.rmtree(db_path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
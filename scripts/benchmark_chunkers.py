@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+청크 분할기 벤치마크
+고정 길이 분할(RecursiveCharacterTextSplitter), 장(chapter)별 분할, 구조 인식 분할(KoreanStructureChunker)의
+분할 처리량과 검색 정밀도를 비교합니다.
+
+- 처리량: story.txt 를 반복해 만든 긴 텍스트를 분할하는 속도 (MB/s, chunks/s)
+- 검색 정밀도: 정답 장(chapter)이 정해진 질의로 top-k 를 검색했을 때
+  결과 청크 글자 중 정답 장에 속한 비율(precision@k)과, 1위 청크가 정답 장인 비율(hit@1)
+- 문장 경계: 문장 끝(다. / 요. / 까? 등)에서 끝나는 청크 비율
+
+오프라인 해싱 임베더를 사용하므로 네트워크 없이 실행됩니다.
+사용법: python scripts/benchmark_chunkers.py [--sizes 120 300 1000] [--k 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Windows 콘솔 UTF-8 인코딩 설정
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+    sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from src.impl.chapters import split_chapters
+from src.impl.hashing_embeddings import HashingEmbeddings
+from src.impl.korean_chunker import KoreanStructureChunker, SENTENCE_END_RE
+from src.impl.vector_store import NumpyVectorStore
+
+# (질의, 정답 장)
+QUERIES = [
+    ("팥쥐는 하루 종일 놀기만 한다", 1),
+    ("아버지가 장사를 하러 먼 곳에 간다", 1),
+    ("원님이 큰 잔치를 연다는 소식", 2),
+    ("새어머니가 잔치에 가려면 일을 끝내라고 한다", 2),
+    ("밑 빠진 독에 물을 부어도 새어 나간다", 3),
+    ("두꺼비가 몸으로 독의 구멍을 막는다", 3),
+    ("참새 떼가 겨와 쌀을 골라낸다", 4),
+    ("선녀가 내려와 베를 짜 준다", 4),
+    ("비단 치마저고리와 꽃신을 받는다", 5),
+    ("해가 지기 전에 돌아와야 마법이 풀리지 않는다", 5),
+    ("개울을 건너다 꽃신 한 짝을 잃어버렸다", 6),
+    ("팥쥐의 발이 너무 커서 꽃신이 맞지 않는다", 7),
+    ("부엌에서 일하는 처녀에게도 신겨 본다", 7),
+    ("콩쥐와 원님의 아들이 결혼한다", 8),
+]
+
+
+def recursive_chunks(text, size, overlap):
+    """기존 방식: 전체 텍스트를 고정 길이로 분할"""
+    splitter = RecursiveCharacterTextSplitter(chunk_size=size, chunk_overlap=overlap, add_start_index=True)
+    return splitter.create_documents([text])
+
+
+def chapter_chunks(text, size, overlap):
+    """LORE_CHUNKER=chapters: '## ' 섹션별로 고정 길이 분할"""
+    splitter = RecursiveCharacterTextSplitter(chunk_size=size, chunk_overlap=overlap, add_start_index=True)
+    documents = []
+    for chapter, offset, section in split_chapters(text):
+        for doc in splitter.create_documents([section], metadatas=[{"chapter": chapter}]):
+            doc.metadata["start_index"] += offset
+            documents.append(doc)
+    return documents
+
+
+def structure_chunks(text, size, overlap):
+    """LORE_CHUNKER=structure: 제목/문단/문장 경계를 따르는 분할"""
+    return KoreanStructureChunker(size, overlap).split_text(text)
+
+
+CHUNKERS = [("recursive", recursive_chunks), ("chapters", chapter_chunks), ("structure", structure_chunks)]
+
+
+def chapter_spans(text):
+    """장 번호 -> (시작, 끝) 문자 위치"""
+    sections = split_chapters(text)
+    ends = [offset for _, offset, _ in sections[1:]] + [len(text)]
+    return {chapter: (offset, end) for (chapter, offset, _), end in zip(sections, ends) if chapter}
+
+
+def in_chapter_ratio(doc, span):
+    start = doc.metadata["start_index"]
+    end = start + len(doc.page_content)
+    return max(0, min(end, span[1]) - max(start, span[0])) / max(1, end - start)
+
+
+def throughput(chunk_fn, text, size, overlap, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = len(chunk_fn(text, size, overlap))
+        best = min(best, time.perf_counter() - start)
+    return len(text.encode("utf-8")) / best / 1e6, count / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunker throughput / retrieval precision benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[120, 300, 1000], help="chunk_size 목록 (overlap = size/5)")
+    parser.add_argument("--k", type=int, default=3, help="top-k")
+    parser.add_argument("--copies", type=int, default=100, help="처리량 측정용 story.txt 반복 횟수")
+    args = parser.parse_args()
+
+    with open(os.path.join(project_root, 'data', 'story.txt'), 'r', encoding='utf-8') as f:
+        text = f.read()
+    spans = chapter_spans(text)
+    embedder = HashingEmbeddings()
+    query_vectors = embedder.embed_array([query for query, _ in QUERIES])
+    big_text = "\n\n".join([text] * args.copies)
+
+    print(f"📚 story.txt {len(text)}자, 질의 {len(QUERIES)}개, 처리량 측정 텍스트 {len(big_text) / 1e6:.1f}M자\n")
+    print(f"{'size':>6}{'chunker':>11}{'chunks':>8}{'MB/s':>8}{'chunks/s':>10}"
+          f"{f'prec@{args.k}':>9}{'hit@1':>7}{'문장끝':>7}")
+    for size in args.sizes:
+        overlap = size // 5
+        for name, chunk_fn in CHUNKERS:
+            docs = chunk_fn(text, size, overlap)
+            mb_per_s, chunks_per_s = throughput(chunk_fn, big_text, size, overlap)
+
+            store = NumpyVectorStore()
+            ids = [str(i) for i in range(len(docs))]
+            store.add_embeddings(ids, [d.page_content for d in docs],
+                                 embedder.embed_array([d.page_content for d in docs]))
+            precision, hits = 0.0, 0
+            for (_, chapter), q in zip(QUERIES, query_vectors):
+                rows = [row for row, _ in store.search(q, k=args.k)]
+                ratios = [in_chapter_ratio(docs[row], spans[chapter]) for row in rows]
+                precision += sum(ratios) / len(ratios)
+                hits += ratios[0] >= 0.5
+            sentence_end = sum(1 for d in docs if SENTENCE_END_RE.search(d.page_content.rstrip()[-3:])) / len(docs)
+
+            print(f"{size:>6}{name:>11}{len(docs):>8}{mb_per_s:>8.2f}{chunks_per_s:>10.0f}"
+                  f"{precision / len(QUERIES):>9.3f}{hits / len(QUERIES):>7.2f}{sentence_end:>7.0%}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
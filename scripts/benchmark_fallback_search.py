@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fallback 검색 벤치마크
+기존 선형 키워드 스캔과 BM25 역색인 검색의 지연 시간을 비교합니다.
+
+story.txt 문단을 섞어 복제하여 원본보다 훨씬 큰 코퍼스를 만든 뒤 측정합니다.
+사용법: python scripts/benchmark_fallback_search.py [--copies 500] [--repeat 20]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+# Windows 콘솔 UTF-8 인코딩 설정
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+    sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from src.impl.bm25_index import BM25Index
+
+QUERIES = [
+    "1",
+    "두꺼비를 도와준다",
+    "거부한다",
+    "밑 빠진 독에 물을 채운다",
+    "새어머니에게 따진다",
+    "참새들이 곡식을 골라준다",
+    "잔치에 몰래 간다",
+    "원님 아들과 꽃신",
+]
+
+
+def legacy_keyword_scan(documents, query, top_k=3):
+    """LoreKeeperImpl._fallback_search 의 기존 구현 (비교 기준)"""
+    query_lower = query.lower()
+    scored_docs = []
+    for content in documents:
+        content_lower = content.lower()
+        score = sum(1 for word in query_lower.split() if word in content_lower)
+        if score > 0:
+            scored_docs.append((score, content))
+    scored_docs.sort(reverse=True, key=lambda x: x[0])
+    return [content for _, content in scored_docs[:top_k]]
+
+
+def build_corpus(copies, seed=42):
+    """story.txt 문단을 섞어 copies 배 크기의 코퍼스 생성"""
+    story_path = os.path.join(project_root, 'data', 'story.txt')
+    with open(story_path, 'r', encoding='utf-8') as f:
+        paragraphs = [p.strip() for p in f.read().split("\n\n") if p.strip()]
+
+    rng = random.Random(seed)
+    corpus = []
+    for copy_index in range(copies):
+        shuffled = paragraphs[:]
+        rng.shuffle(shuffled)
+        # 약 1000자 단위 청크 (load_book 과 비슷한 크기)
+        chunk = ""
+        for paragraph in shuffled:
+            chunk += paragraph + "\n\n"
+            if len(chunk) >= 1000:
+                corpus.append(chunk)
+                chunk = ""
+        if chunk:
+            corpus.append(chunk)
+    return corpus
+
+
+def measure(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        for query in QUERIES:
+            start = time.perf_counter()
+            fn(query)
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "mean": statistics.mean(timings),
+        "p50": timings[len(timings) // 2],
+        "p99": timings[min(len(timings) - 1, int(len(timings) * 0.99))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fallback search benchmark")
+    parser.add_argument("--copies", type=int, default=500, help="story.txt 복제 배수")
+    parser.add_argument("--repeat", type=int, default=20, help="쿼리 세트 반복 횟수")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.copies)
+    total_chars = sum(len(c) for c in corpus)
+    print(f"📚 코퍼스: {len(corpus)} 청크, {total_chars / 1e6:.1f}M 문자 (story.txt x{args.copies})\n")
+
+    start = time.perf_counter()
+    index = BM25Index().build(corpus)
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"🔨 BM25 색인 생성: {build_ms:.0f} ms ({len(index.postings)} terms)\n")
+
+    legacy = measure(lambda q: legacy_keyword_scan(corpus, q), args.repeat)
+    bm25 = measure(lambda q: [corpus[i] for i, _ in index.search(q, 3)], args.repeat)
+
+    print(f"{'method':<16}{'mean(ms)':>10}{'p50(ms)':>10}{'p99(ms)':>10}")
+    for name, result in (("linear scan", legacy), ("bm25 index", bm25)):
+        print(f"{name:<16}{result['mean']:>10.2f}{result['p50']:>10.2f}{result['p99']:>10.2f}")
+    print(f"\n⚡ 평균 속도 향상: x{legacy['mean'] / max(bm25['mean'], 1e-9):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+양자화 벡터 검색 벤치마크
+float32 정확 검색과 float16 / int8 양자화 검색(+ 전정밀도 재채점)을 비교합니다.
+
+오프라인 해싱 임베더(HashingEmbeddings)로 story.txt 기반 코퍼스를 임베딩하므로
+네트워크나 Ollama 없이 실행됩니다. 메모리 사용량, 지연 시간, recall@k 를 출력합니다.
+사용법: python scripts/benchmark_quantized_search.py [--copies 300] [--dim 768] [--k 3]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+# Windows 콘솔 UTF-8 인코딩 설정
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+    sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+import numpy as np
+from src.impl.hashing_embeddings import HashingEmbeddings
+from src.impl.vector_store import NumpyVectorStore
+
+QUERIES = [
+    "두꺼비를 도와준다",
+    "밑 빠진 독에 물을 채운다",
+    "새어머니에게 따진다",
+    "참새들이 곡식을 골라준다",
+    "잔치에 몰래 간다",
+    "원님 아들과 꽃신",
+]
+
+
+def build_corpus(copies, seed=42):
+    """story.txt 문단을 섞어 약 1000자 청크로 묶은 코퍼스 생성"""
+    story_path = os.path.join(project_root, 'data', 'story.txt')
+    with open(story_path, 'r', encoding='utf-8') as f:
+        paragraphs = [p.strip() for p in f.read().split("\n\n") if p.strip()]
+
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(copies):
+        shuffled = paragraphs[:]
+        rng.shuffle(shuffled)
+        chunk = ""
+        for paragraph in shuffled:
+            chunk += paragraph + "\n\n"
+            if len(chunk) >= 1000:
+                corpus.append(chunk)
+                chunk = ""
+        if chunk:
+            corpus.append(chunk)
+    return corpus
+
+
+def recall_at_k(results, expected, exact_distances, k):
+    """정답 집합과의 겹침 비율. 거리가 k번째 정답과 같은(동점) 결과도 정답으로 인정"""
+    kth = max(exact_distances[r] for r, _ in expected)
+    return sum(1 for r, _ in results if exact_distances[r] <= kth + 1e-5) / k
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantized vector search benchmark")
+    parser.add_argument("--copies", type=int, default=300, help="story.txt 복제 배수")
+    parser.add_argument("--dim", type=int, default=768, help="임베딩 차원")
+    parser.add_argument("--k", type=int, default=3, help="top-k")
+    parser.add_argument("--rescore", type=int, default=4, help="재채점 후보 배수 (k * rescore)")
+    parser.add_argument("--queries", type=int, default=200, help="측정 쿼리 수")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.copies)
+    embedder = HashingEmbeddings(dimension=args.dim)
+    start = time.perf_counter()
+    vectors = embedder.embed_array(corpus)
+    print(f"📚 코퍼스: {len(corpus)} 청크 x {args.dim}차원 "
+          f"(임베딩 {len(corpus) / (time.perf_counter() - start):.0f} chunks/s)\n")
+
+    rng = random.Random(7)
+    query_texts = QUERIES + [c[rng.randrange(0, 600):][:120] for c in rng.sample(corpus, args.queries - len(QUERIES))]
+    query_vectors = embedder.embed_array(query_texts)
+    ids = [str(i) for i in range(len(corpus))]
+
+    exact_store = NumpyVectorStore()
+    exact_store.add_embeddings(ids, corpus, vectors)
+    expected = [exact_store.search(q, k=args.k) for q in query_vectors]
+
+    print(f"{'mode':<10}{'RAM(MB)':>10}{'mean(ms)':>10}{'p50(ms)':>10}{'p99(ms)':>10}{f'recall@{args.k}':>11}")
+    baseline_mb = None
+    for mode in (None, "float16", "int8"):
+        directory = tempfile.mkdtemp()
+        store = NumpyVectorStore(persist_directory=directory, quantization=mode, rescore_factor=args.rescore)
+        store.add_embeddings(ids, corpus, vectors)
+        store.persist()
+        store = NumpyVectorStore.load(directory, mmap=mode is not None, quantization=mode,
+                                      rescore_factor=args.rescore)
+        store.search(query_vectors[0], k=args.k)  # warm-up
+
+        timings, recalls = [], []
+        for q, truth in zip(query_vectors, expected):
+            t0 = time.perf_counter()
+            results = store.search(q, k=args.k)
+            timings.append((time.perf_counter() - t0) * 1000)
+            exact_distances = ((vectors - q) ** 2).sum(axis=1)
+            recalls.append(recall_at_k(results, truth, exact_distances, args.k))
+        timings.sort()
+
+        ram_mb = sum(store.memory_usage().values()) / 1e6
+        baseline_mb = baseline_mb or ram_mb
+        print(f"{mode or 'float32':<10}{ram_mb:>10.1f}{statistics.mean(timings):>10.2f}"
+              f"{timings[len(timings) // 2]:>10.2f}{timings[min(len(timings) - 1, int(len(timings) * 0.99))]:>10.2f}"
+              f"{statistics.mean(recalls):>11.3f}")
+
+    print(f"\n💾 float32 상주 메모리 {baseline_mb:.1f} MB 대비 int8 은 약 1/4 (전정밀도 벡터는 mmap 으로 디스크에 유지)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+인덱스 스냅샷 빌드 (배포 단계용)
+data/ 아래 동화를 청킹/임베딩한 뒤, 청크·메타데이터·임베딩 행렬을 스냅샷 파일 하나(.npz)로 저장합니다.
+서버는 LORE_INDEX_SNAPSHOT 이 가리키는 스냅샷을 메모리 매핑으로 불러오므로
+콜드 스타트마다 임베딩 API를 호출하지 않습니다.
+
+서버와 같은 AI_PROVIDER / 임베딩 모델 / LORE_CHUNKER 설정으로 실행해야 합니다
+(설정이 다르면 서버가 스냅샷을 무시하고 직접 인덱스를 만듭니다).
+
+사용법: python scripts/build_index_snapshot.py [--data data] [--output index_snapshot/lore_index.npz]
+Render 빌드 명령 예: pip install -r requirements.txt && python scripts/build_index_snapshot.py
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Windows 콘솔 UTF-8 인코딩 설정
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+    sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from src.impl.lore_keeper_impl import LoreKeeperImpl
+
+DEFAULT_SNAPSHOT = os.path.join("index_snapshot", "lore_index.npz")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a single-file lore index snapshot")
+    parser.add_argument("--data", default=os.path.join(project_root, "data"), help="동화 텍스트 폴더")
+    parser.add_argument("--output", default=os.getenv("LORE_INDEX_SNAPSHOT") or os.path.join(project_root, DEFAULT_SNAPSHOT),
+                        help="스냅샷 파일 경로 (기본: $LORE_INDEX_SNAPSHOT)")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.data):
+        print(f"❌ 동화 폴더를 찾을 수 없습니다: {args.data}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    keeper = LoreKeeperImpl()
+    keeper.load_library(args.data)
+    keeper.build_index()
+    if keeper.fallback_mode:
+        print("❌ 인덱스 생성에 실패했습니다 (임베딩 설정/API 키를 확인하세요).")
+        sys.exit(1)
+
+    manifest = keeper.save_snapshot(args.output)
+    print(f"📦 스냅샷 저장 완료: {args.output}")
+    print(f"   동화 {len(manifest['books'])}편, 청크 {manifest['chunk_count']}개, "
+          f"{manifest['dimension']}차원, 모델 {manifest['model']} ({time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+검색 구간별 지연 프로파일
+LoreKeeperImpl 에 내장된 계측(get_retrieval_metrics)으로 한 턴의 시간이 어디에 쓰였는지 보여줍니다:
+임베딩 초기화 / 인덱스 빌드 / 쿼리 임베딩 / 유사도 검색 / 폴백 검색, 그리고 경로별(vector, cached, fallback ...) 횟수.
+
+기본은 네트워크 없이 도는 오프라인 해싱 임베딩 + NumPy 저장소입니다.
+AI_PROVIDER 등 환경 변수를 직접 지정하면 실제 설정으로 측정합니다.
+사용법: python scripts/profile_retrieval.py [--data data] [--repeat 3]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+# Windows 콘솔 UTF-8 인코딩 설정
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+    sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+os.environ.setdefault("AI_PROVIDER", "offline")
+os.environ.setdefault("LORE_VECTOR_BACKEND", "numpy")
+
+from src.impl.lore_keeper_impl import LoreKeeperImpl
+from src.impl.retrieval_metrics import format_metrics
+
+QUERIES = [
+    "밑 빠진 독에 물을 채운다",
+    "두꺼비가 나타나 도와준다",
+    "참새 떼가 곡식을 골라 준다",
+    "팥쥐 엄마가 잔치에 가지 못하게 한다",
+    "원님의 잔치에 가는 길",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage retrieval latency profile")
+    parser.add_argument("--data", default=os.path.join(project_root, "data"), help="동화 텍스트 폴더")
+    parser.add_argument("--repeat", type=int, default=3, help="쿼리 세트 반복 횟수 (2회차부터 결과 캐시 적중)")
+    args = parser.parse_args()
+
+    db_path = tempfile.mkdtemp(prefix="retrieval_profile_")
+    try:
+        keeper = LoreKeeperImpl()
+        keeper.db_path = db_path
+        keeper.load_library(args.data)
+
+        # 벡터 인덱스가 준비되기 전 (서버 시작 직후와 같은 키워드 검색)
+        for query in QUERIES:
+            keeper.retrieve(query, top_k=3, chapter=1)
+        keeper.build_index()
+        for _ in range(args.repeat):
+            for query in QUERIES:
+                keeper.retrieve(query, top_k=3, chapter=1)
+
+        print(f"\n📚 동화 {len(keeper.books)}편, 청크 {len(keeper.documents)}개, "
+              f"AI_PROVIDER={keeper.provider}, 검색 모드={keeper.search_mode}\n")
+        print(format_metrics(keeper.get_retrieval_metrics()))
+    finally:
+        shutil.rmtree(db_path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any
 
@@ -17,6 +18,17 @@ class LoreKeeper(ABC):
         """
         pass
 
+    @abstractmethod
+    def load_library(self, directory: str) -> None:
+        """
+        Loads every book in a directory, tagging chunks with per-book metadata.
+        Only added or modified books need to be re-chunked and re-embedded.
+        
+        Args:
+            directory (str): Directory containing the book files.
+        """
+        pass
+
     @abstractmethod
     def build_index(self) -> None:
         """
@@ -37,3 +49,11 @@ class LoreKeeper(ABC):
             List[str]: A list of relevant text chunks.
         """
         pass
+
+    async def aretrieve(self, query: str, top_k: int = 3) -> List[str]:
+        """
+        Async version of retrieve().
+        Default runs retrieve() on a worker thread; implementations with async
+        embedding clients should override it to avoid holding a thread per call.
+        """
+        return await asyncio.to_thread(self.retrieve, query, top_k)
@@ -0,0 +1,101 @@
+import heapq
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+# Common Korean particles (josa), longest first so "에서" wins over "에"
+KOREAN_PARTICLES = sorted([
+    "에서는", "에게서", "으로는", "에서", "에게", "한테", "으로", "까지", "부터", "처럼", "보다",
+    "하고", "이나", "이랑", "마저", "조차", "밖에",
+    "을", "를", "이", "가", "은", "는", "에", "의", "도", "와", "과", "로", "만", "랑", "나",
+], key=len, reverse=True)
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _is_hangul(ch: str) -> bool:
+    return "가" <= ch <= "힣"
+
+
+def strip_particle(word: str) -> str:
+    """'두꺼비를' -> '두꺼비', '마당에서' -> '마당'. Keeps at least one syllable of stem."""
+    if not word or not _is_hangul(word[-1]):
+        return word
+    for particle in KOREAN_PARTICLES:
+        if word.endswith(particle) and len(word) - len(particle) >= 1:
+            return word[:-len(particle)]
+    return word
+
+
+def tokenize(text: str, ngram: int = 2) -> List[str]:
+    """
+    Korean-aware tokenizer for lexical search.
+    Emits the particle-stripped word plus its character n-grams, so inflected
+    forms ('도와준다' / '도와주었다') still share terms.
+    """
+    tokens = []
+    for word in _WORD_RE.findall(unicodedata.normalize("NFC", text).lower()):
+        stem = strip_particle(word)
+        tokens.append(stem)
+        if len(stem) > ngram and _is_hangul(stem[0]):
+            tokens.extend(stem[i:i + ngram] for i in range(len(stem) - ngram + 1))
+    return tokens
+
+
+class BM25Index:
+    """
+    Inverted index with Okapi BM25 scoring.
+    Built once at load time; a query only touches the postings of its own terms.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.idf: Dict[str, float] = {}
+        self.doc_lens: List[int] = []
+        self.avg_doc_len = 0.0
+
+    def __len__(self) -> int:
+        return len(self.doc_lens)
+
+    def build(self, texts: List[str]) -> "BM25Index":
+        postings = defaultdict(list)
+        self.doc_lens = []
+        for doc_id, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            self.doc_lens.append(sum(counts.values()))
+            for term, tf in counts.items():
+                postings[term].append((doc_id, tf))
+
+        n = len(self.doc_lens)
+        self.postings = dict(postings)
+        self.avg_doc_len = (sum(self.doc_lens) / n) if n else 0.0
+        self.idf = {
+            term: math.log(1 + (n - len(plist) + 0.5) / (len(plist) + 0.5))
+            for term, plist in self.postings.items()
+        }
+        return self
+
+    def search(self, query: str, top_k: int = 3, allowed: Optional[Set[int]] = None) -> List[Tuple[int, float]]:
+        """
+        Returns [(doc_id, score)] of the best top_k documents, best first.
+        `allowed` restricts scoring to a subset of doc ids (e.g. one book).
+        """
+        if not self.doc_lens or top_k <= 0 or (allowed is not None and not allowed):
+            return []
+        k1, b, avg = self.k1, self.b, self.avg_doc_len or 1.0
+        scores: Dict[int, float] = defaultdict(float)
+        for term, qtf in Counter(tokenize(query)).items():
+            plist = self.postings.get(term)
+            if not plist:
+                continue
+            idf = self.idf[term] * qtf
+            for doc_id, tf in plist:
+                if allowed is not None and doc_id not in allowed:
+                    continue
+                norm = k1 * (1 - b + b * self.doc_lens[doc_id] / avg)
+                scores[doc_id] += idf * tf * (k1 + 1) / (tf + norm)
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: (item[1], -item[0]))
@@ -0,0 +1,201 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, List, Optional
+
+CHECKPOINT_FILENAME = "lore_index_checkpoint.json"
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket limiting embedding requests per minute.
+    Allows bursts of up to `capacity` requests; rate <= 0 disables limiting.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else max(1.0, rate_per_minute / 60.0)
+        self.tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Blocks until `tokens` are available. Returns the seconds spent waiting."""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                delay = (tokens - self.tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """True for quota / 429 style errors that are worth retrying after a pause."""
+    text = f"{type(error).__name__} {error}".lower()
+    return any(marker in text for marker in ("429", "resourceexhausted", "resource_exhausted", "quota", "rate limit"))
+
+
+# ---- Checkpoint file ----
+def checkpoint_path(index_dir: str) -> str:
+    return os.path.join(index_dir, CHECKPOINT_FILENAME)
+
+
+def load_checkpoint(index_dir: str) -> Optional[Dict[str, Any]]:
+    """Returns the checkpoint of an unfinished build, or None."""
+    path = checkpoint_path(index_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"[WARN] Could not read index checkpoint ({path}): {e}")
+        return None
+
+
+def save_checkpoint(index_dir: str, checkpoint: Dict[str, Any]) -> None:
+    os.makedirs(index_dir, exist_ok=True)
+    path = checkpoint_path(index_dir)
+    with open(path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, ensure_ascii=False, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def clear_checkpoint(index_dir: str) -> None:
+    path = checkpoint_path(index_dir)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+class BulkIndexer:
+    """
+    Embeds chunks in batches on a worker pool and hands each finished batch to `write_fn`.
+
+    - Embedding requests go through a requests-per-minute token bucket.
+    - Rate-limit errors are retried with exponential backoff; other errors fail fast.
+    - Writes happen on the calling thread (vector stores are not thread-safe), in completion order.
+    - Every `flush_every` batches `flush_fn` makes the writes durable and the checkpoint is updated,
+      so after a quota error or crash only unflushed batches are embedded again.
+    """
+
+    def __init__(self, embed_fn: Callable[[List[str]], List[List[float]]],
+                 write_fn: Callable[[List[str], List[Any], List[List[float]]], None],
+                 batch_size: int = 64, workers: int = 4, requests_per_minute: float = 0,
+                 max_retries: int = 5, backoff: float = 2.0,
+                 flush_fn: Optional[Callable[[], None]] = None, flush_every: int = 8,
+                 index_dir: Optional[str] = None, checkpoint: Optional[Dict[str, Any]] = None,
+                 sleep: Optional[Callable[[float], None]] = None):
+        self.embed_fn = embed_fn
+        self.write_fn = write_fn
+        self.batch_size = max(1, batch_size)
+        self.workers = max(1, workers)
+        self.bucket = TokenBucket(requests_per_minute, sleep=sleep or time.sleep)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.flush_fn = flush_fn
+        self.flush_every = max(1, flush_every)
+        self.index_dir = index_dir
+        self.checkpoint = dict(checkpoint or {})
+        self._sleep = sleep or time.sleep
+        self._lock = threading.Lock()
+        self.stats = {"total": 0, "embedded": 0, "batches": 0, "retries": 0,
+                      "throttled_seconds": 0.0, "seconds": 0.0, "chunks_per_sec": 0.0}
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        for attempt in range(self.max_retries + 1):
+            waited = self.bucket.acquire()
+            with self._lock:
+                self.stats["throttled_seconds"] += waited
+            try:
+                vectors = self.embed_fn(texts)
+                if len(vectors) != len(texts):
+                    raise ValueError(f"Expected {len(texts)} embeddings, got {len(vectors)}")
+                return vectors
+            except Exception as e:
+                if attempt >= self.max_retries or not is_rate_limit_error(e):
+                    raise
+                delay = self.backoff * (2 ** attempt)
+                with self._lock:
+                    self.stats["retries"] += 1
+                print(f"[WARN] Embedding rate limited ({e}). Retrying in {delay:.1f}s...")
+                self._sleep(delay)
+
+    def _save_progress(self, flush: bool = True) -> None:
+        if flush and self.flush_fn:
+            self.flush_fn()
+        if self.index_dir:
+            save_checkpoint(self.index_dir, dict(
+                self.checkpoint, total=self.stats["total"], completed=self.stats["embedded"], updated=time.time()
+            ))
+
+    def run(self, ids: List[str], documents: List[Any]) -> Dict[str, Any]:
+        """
+        Embeds and writes every (id, document) pair. On failure, finished batches are
+        written and checkpointed before the error is re-raised.
+        """
+        start = time.perf_counter()
+        self.stats["total"] = len(ids)
+        batches = [(ids[i:i + self.batch_size], documents[i:i + self.batch_size])
+                   for i in range(0, len(ids), self.batch_size)]
+        # Mark the build as in progress before anything is written
+        self._save_progress(flush=False)
+
+        error = None
+        unflushed = 0
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="lore-index")
+        try:
+            pending = {}
+            queue = iter(batches)
+            while True:
+                # Keep a bounded number of batches in flight
+                while error is None and len(pending) < self.workers * 2:
+                    batch = next(queue, None)
+                    if batch is None:
+                        break
+                    future = executor.submit(self._embed_batch, [doc.page_content for doc in batch[1]])
+                    pending[future] = batch
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch_ids, batch_docs = pending.pop(future)
+                    try:
+                        vectors = future.result()
+                    except Exception as e:
+                        error = error or e
+                        continue
+                    self.write_fn(batch_ids, batch_docs, vectors)
+                    self.stats["embedded"] += len(batch_ids)
+                    self.stats["batches"] += 1
+                    unflushed += 1
+                    if unflushed >= self.flush_every:
+                        self._save_progress()
+                        unflushed = 0
+        finally:
+            executor.shutdown(wait=True)
+            if unflushed or error is not None:
+                self._save_progress()
+            self.stats["seconds"] = time.perf_counter() - start
+            self.stats["chunks_per_sec"] = self.stats["embedded"] / self.stats["seconds"] if self.stats["seconds"] > 0 else 0.0
+
+        if error is not None:
+            print(f"[ERR] Bulk indexing stopped after {self.stats['embedded']}/{self.stats['total']} chunks: {error}")
+            raise error
+        print(f"[OK] Embedded {self.stats['embedded']} chunks in {self.stats['seconds']:.1f}s "
+              f"({self.stats['chunks_per_sec']:.1f} chunks/s, {self.stats['batches']} batches, "
+              f"{self.stats['retries']} rate-limit retries)")
+        return self.stats
@@ -0,0 +1,67 @@
+import re
+from typing import Iterable, List, Tuple, Union
+
+# '## 제3장: 불가능한 과제' -> 3
+CHAPTER_HEADING_RE = re.compile(r"^##\s*제\s*(\d+)\s*장", re.MULTILINE)
+SECTION_HEADING_RE = re.compile(r"^##\s", re.MULTILINE)
+# GameState scene ids are game stages, not book chapters: each one maps to the
+# '## 제N장' sections of data/story.txt (콩쥐팥쥐) that the scene plays out.
+SCENE_CHAPTERS = {
+    "chapter_1_house": (1, 2, 3, 4),  # 불행한 시작 ~ 마법 같은 도움 (집안일과 과제)
+    "chapter_2_road": (5, 6),         # 잔치로 가는 길, 잃어버린 꽃신
+}
+
+
+def split_chapters(text: str) -> List[Tuple[int, int, str]]:
+    """
+    Splits a book at its '## ' section headings.
+    Returns [(chapter, offset, section_text)]; chapter is N for '## 제N장' sections and
+    0 for everything else (appendix sections like '## 등장인물 소개'). Text before the first
+    section (the '# 제목' title block) stays with that first section.
+    """
+    starts = [m.start() for m in SECTION_HEADING_RE.finditer(text)]
+    if starts:
+        starts[0] = 0
+    else:
+        starts = [0]
+    sections = []
+    for start, end in zip(starts, starts[1:] + [len(text)]):
+        section = text[start:end]
+        if not section.strip():
+            continue
+        match = CHAPTER_HEADING_RE.search(section)
+        if match and match.start() != SECTION_HEADING_RE.search(section).start():
+            match = None  # the heading of this section is not a chapter heading
+        sections.append((int(match.group(1)) if match else 0, start, section))
+    return sections
+
+
+def scene_chapters(chapter: Union[str, int, None]) -> Tuple[int, ...]:
+    """
+    Book chapters for a chapter reference: a scene id ('chapter_2_road' -> (5, 6),
+    see SCENE_CHAPTERS) or a chapter number ('3', 3 -> (3,)). Empty when unknown.
+    """
+    if chapter is None or isinstance(chapter, bool):
+        return ()
+    if isinstance(chapter, int):
+        return (chapter,)
+    chapter = str(chapter).strip()
+    if chapter.isdigit():
+        return (int(chapter),)
+    return tuple(SCENE_CHAPTERS.get(chapter, ()))
+
+
+def chapter_scopes(chapters: Iterable[int], available: Iterable[int]) -> List[List[int]]:
+    """
+    Chapter windows to search, narrowest first: the scene's chapters, then those plus the
+    chapter on either side. Empty when none of them is in the book (search the whole book instead).
+    """
+    available = set(available)
+    core = sorted(c for c in set(chapters or ()) if c in available)
+    if not core:
+        return []
+    scopes = [core]
+    window = sorted(set(core) | {c for c in (core[0] - 1, core[-1] + 1) if c in available})
+    if len(window) > len(core):
+        scopes.append(window)
+    return scopes
@@ -0,0 +1,27 @@
+import re
+from typing import List
+
+# '1. 밑 빠진 독에 물을 채우기 시작한다.' / '2) **운다**'
+CHOICE_LINE_RE = re.compile(r"^\s*(\d)\s*[.)]\s*(.+?)\s*$", re.MULTILINE)
+# Player picked a choice by number: '1', '2번', '3.'
+NUMBERED_INPUT_RE = re.compile(r"^\s*(\d)\s*(?:번|[.)])?\s*$")
+
+
+def extract_choices(text: str) -> List[str]:
+    """The last numbered choice list (1, 2, 3, ...) in a story segment, markdown stripped."""
+    choices = []
+    for match in CHOICE_LINE_RE.finditer(text or ""):
+        number, choice = int(match.group(1)), match.group(2).replace("**", "").strip()
+        if number == 1:
+            choices = []  # a new list starts; only the last one is offered to the player
+        if number == len(choices) + 1 and choice:
+            choices.append(choice)
+    return choices
+
+
+def resolve_choice(user_input: str, choices: List[str]) -> str:
+    """Maps a bare choice number to the choice text (a better search query); other input is unchanged."""
+    match = NUMBERED_INPUT_RE.match(user_input or "")
+    if match and 1 <= int(match.group(1)) <= len(choices):
+        return choices[int(match.group(1)) - 1]
+    return user_input
@@ -0,0 +1,115 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Set
+
+from src.impl.embedding_cache import QueryEmbeddingCache
+
+
+def _shingles(text: str) -> Set[str]:
+    compact = QueryEmbeddingCache.normalize(text).replace(" ", "")
+    return set(compact) | {compact[i:i + 2] for i in range(len(compact) - 1)}
+
+
+def choice_similarity(a: str, b: str) -> float:
+    """
+    Dice coefficient over syllables + syllable bigrams, ignoring spacing and case.
+    Syllables keep conjugated paraphrases close ('독을 고친다' / '독을 고쳐 본다' ~ 0.6).
+    """
+    x, y = _shingles(a), _shingles(b)
+    if not x or not y:
+        return 0.0
+    return 2 * len(x & y) / (len(x) + len(y))
+
+
+class ChoicePrefetcher:
+    """
+    Per-session speculative retrieval for the choices offered at the end of a story segment.
+
+    prefetch() starts one background retrieval per choice while the player reads;
+    lookup() returns those results when the next input is one of the choices, or a
+    paraphrase of one (choice_similarity >= min_similarity), and awaits a retrieval that
+    is still in flight instead of starting a second one. Entries expire after ttl_seconds
+    and are only valid for the scope (e.g. chapter) they were fetched for.
+    """
+
+    def __init__(self, retrieve: Callable[[str, Hashable], Awaitable[List[str]]], ttl_seconds: float = 120.0,
+                 min_similarity: float = 0.5, clock: Callable[[], float] = time.monotonic):
+        self._retrieve = retrieve
+        self.ttl_seconds = ttl_seconds
+        self.min_similarity = min_similarity
+        self._clock = clock
+        self._entries: Dict[str, asyncio.Task] = {}
+        self._scope = None
+        self._created_at = 0.0
+        self.prefetched = 0
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def prefetch(self, choices: List[str], scope: Hashable = None) -> int:
+        """Replaces the previous choices' entries and starts retrieving the new ones. Needs a running loop."""
+        self.cancel()
+        self._scope = scope
+        self._created_at = self._clock()
+        for choice in dict.fromkeys(c for c in choices if c and c.strip()):
+            self._entries[choice] = asyncio.create_task(self._safe_retrieve(choice, scope))
+        self.prefetched += len(self._entries)
+        return len(self._entries)
+
+    async def _safe_retrieve(self, choice: str, scope: Hashable) -> Optional[List[str]]:
+        try:
+            return await self._retrieve(choice, scope)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[WARN] Prefetch failed for '{choice}': {e}")
+            return None
+
+    def match(self, query: str) -> Optional[str]:
+        """The offered choice the query picks or paraphrases, if any."""
+        best, best_score = None, self.min_similarity
+        for choice in self._entries:
+            score = choice_similarity(query, choice)
+            if score >= best_score:
+                best, best_score = choice, score
+        return best
+
+    async def lookup(self, query: str, scope: Hashable = None) -> Optional[List[str]]:
+        """Prefetched results for this query, or None (miss: retrieve normally)."""
+        if not self._entries:
+            self.misses += 1
+            return None
+        if self._clock() - self._created_at > self.ttl_seconds:
+            self.expired += 1
+            self.misses += 1
+            self.cancel()
+            return None
+        choice = self.match(query) if scope == self._scope else None
+        if choice is None:
+            self.misses += 1
+            return None
+        task = self._entries[choice]
+        # shield: a caller timing out must not cancel the shared prefetch
+        results = None if task.cancelled() else await asyncio.shield(task)
+        if not results:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return list(results)
+
+    def cancel(self) -> None:
+        for task in self._entries.values():
+            if not task.done():
+                task.cancel()
+        self._entries = {}
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "pending": sum(1 for task in self._entries.values() if not task.done()),
+            "prefetched": self.prefetched,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "expired": self.expired,
+        }
@@ -0,0 +1,100 @@
+import threading
+import time
+from typing import Callable, Optional
+
+from src.impl.bulk_indexer import is_rate_limit_error
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker for a remote dependency (the query embedding provider).
+
+      closed:    calls go through; `failure_threshold` consecutive failures open the circuit
+                 (a rate-limit / 429 error counts `rate_limit_weight` failures at once).
+      open:      allow_request() is False until `cooldown_seconds` have passed.
+      half_open: exactly one probe call is let through; its success closes the circuit,
+                 its failure re-opens it for another cooldown. A probe that never reports
+                 back is given up after one cooldown and a new probe is allowed.
+    """
+
+    def __init__(self, failure_threshold: int = 3, cooldown_seconds: float = 30.0,
+                 rate_limit_weight: Optional[int] = None, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown_seconds = cooldown_seconds
+        # Quota errors will not clear up within a few turns: trip on the first one by default
+        self.rate_limit_weight = self.failure_threshold if rate_limit_weight is None else rate_limit_weight
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_started = None
+        self.failures = 0
+        self.rate_limited = 0
+        self.rejected = 0
+        self.probes = 0
+        self.transitions = {}  # "closed->open" -> count
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        name = f"{self.state}->{state}"
+        self.transitions[name] = self.transitions.get(name, 0) + 1
+        print(f"[WARN] Embedding circuit breaker: {name}" if state == OPEN
+              else f"[INFO] Embedding circuit breaker: {name}")
+        self.state = state
+        if state == OPEN:
+            self._opened_at = self._clock()
+        self._probe_started = None
+
+    def allow_request(self) -> bool:
+        """True if the caller may call the provider now (False: short-circuit to the fallback)."""
+        with self._lock:
+            now = self._clock()
+            if self.state == OPEN and now - self._opened_at >= self.cooldown_seconds:
+                self._transition(HALF_OPEN)
+            if self.state == HALF_OPEN and (self._probe_started is None
+                                            or now - self._probe_started >= self.cooldown_seconds):
+                self._probe_started = now
+                self.probes += 1
+                return True
+            if self.state == CLOSED:
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.consecutive_failures = 0
+            self._transition(CLOSED)
+
+    def record_failure(self, error: Optional[Exception] = None) -> None:
+        with self._lock:
+            self.failures += 1
+            weight = 1
+            if error is not None and is_rate_limit_error(error):
+                self.rate_limited += 1
+                weight = max(1, self.rate_limit_weight)
+            self.consecutive_failures += weight
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self._transition(OPEN)
+
+    def stats(self) -> dict:
+        with self._lock:
+            retry_in = 0.0
+            if self.state == OPEN:
+                retry_in = max(0.0, self.cooldown_seconds - (self._clock() - self._opened_at))
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "failures": self.failures,
+                "rate_limited": self.rate_limited,
+                "rejected": self.rejected,
+                "probes": self.probes,
+                "transitions": dict(self.transitions),
+                "retry_in_seconds": retry_in,
+            }
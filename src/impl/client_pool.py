@@ -0,0 +1,98 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+
+class KeyedClientPool:
+    """
+    Bounded LRU pool of per-API-key clients with idle expiry.
+    Entries are keyed by a SHA-256 of the key, so raw keys are never used as dict keys
+    or logged. Each key gets its own client; nothing is shared with the global singleton.
+    """
+
+    def __init__(self, factory: Callable[[str], Any], max_size: int = 32, idle_ttl: float = 600.0,
+                 on_evict: Optional[Callable[[Any], None]] = None):
+        self.factory = factory
+        self.max_size = max(1, max_size)
+        self.idle_ttl = idle_ttl
+        self.on_evict = on_evict
+        self._entries: "OrderedDict[str, list]" = OrderedDict()  # key_hash -> [client, last_used]
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def key_hash(api_key: str) -> str:
+        return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+    def get(self, api_key: str) -> Any:
+        key = self.key_hash(api_key)
+        now = time.monotonic()
+        with self._lock:
+            self._purge_idle(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[1] = now
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Build outside the lock: client construction may be slow
+        client = self.factory(api_key)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                # Another thread won the race; keep its client
+                entry[1] = now
+                return entry[0]
+            self._entries[key] = [client, now]
+            while len(self._entries) > self.max_size:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self.evictions += 1
+                self._close(evicted)
+            return client
+
+    def purge_idle(self) -> None:
+        with self._lock:
+            self._purge_idle(time.monotonic())
+
+    def _purge_idle(self, now: float) -> None:
+        # Caller holds the lock. LRU order means idle entries are at the front.
+        if not self.idle_ttl or self.idle_ttl <= 0:
+            return
+        while self._entries:
+            key, (client, last_used) = next(iter(self._entries.items()))
+            if now - last_used <= self.idle_ttl:
+                break
+            del self._entries[key]
+            self.expirations += 1
+            self._close(client)
+
+    def _close(self, client: Any) -> None:
+        if self.on_evict:
+            try:
+                self.on_evict(client)
+            except Exception as e:
+                print(f"[WARN] Failed to close pooled client: {e}")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
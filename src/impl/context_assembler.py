@@ -0,0 +1,110 @@
+import math
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Gemini / Qwen tokenizers spend roughly one token per Hangul syllable and ~4 ASCII chars per token
+_HANGUL_RE = re.compile(r"[가-힣ㄱ-ㆎ]")
+_SENTENCE_END_RE = re.compile(r"(?:[.!?]|다\.|요\.)[\"'”’)]*\s|\n")
+
+# locate(chunk_text) -> (source, start_index) or None when the chunk is unknown
+Locator = Callable[[str], Optional[Tuple[str, int]]]
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap prompt-token estimate (no tokenizer call): Hangul ~1 token, other chars ~1/4."""
+    if not text:
+        return 0
+    hangul = len(_HANGUL_RE.findall(text))
+    return math.ceil(hangul + (len(text) - hangul) / 4)
+
+
+def merge_spans(spans: List[Tuple[str, int, str, int]], max_gap: int = 2) -> List[Tuple[str, int, str, int]]:
+    """
+    Merges overlapping or adjacent spans of the same source.
+    spans: [(source, start, text, rank)] -> merged spans, each with the best (lowest) rank
+    of its parts, in source order. Spans up to `max_gap` chars apart count as adjacent
+    (the splitter strips the separator whitespace between consecutive chunks).
+    """
+    merged = []  # [source, start, end offset in the source, text, rank]
+    for source, start, text, rank in sorted(spans, key=lambda s: (s[0], s[1])):
+        end = start + len(text)
+        if merged and merged[-1][0] == source and start <= merged[-1][2] + max_gap:
+            last = merged[-1]
+            if end > last[2]:
+                if start <= last[2]:
+                    last[3] += text[last[2] - start:]  # overlap: only the part past the last span
+                else:
+                    last[3] += ("\n" if start - last[2] > 1 else " ") + text  # stripped separator
+                last[2] = end
+            last[4] = min(last[4], rank)
+            continue
+        merged.append([source, start, end, text, rank])
+    return [(source, start, text, rank) for source, start, _, text, rank in merged]
+
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    """Longest prefix within `budget` tokens, cut back to a sentence end when one is close."""
+    if estimate_tokens(text) <= budget:
+        return text
+    used, cut = 0.0, 0
+    for cut, char in enumerate(text):
+        used += 1.0 if _HANGUL_RE.match(char) else 0.25
+        if used > budget:
+            break
+    prefix = text[:cut]
+    ends = [m.end() for m in _SENTENCE_END_RE.finditer(prefix)]
+    if ends and ends[-1] >= len(prefix) // 2:
+        prefix = prefix[:ends[-1]]
+    return prefix.rstrip()
+
+
+class ContextAssembler:
+    """
+    Turns retrieved chunks into prompt context: chunks are mapped back to their source
+    offsets, overlapping/adjacent chunks are merged into one span (chunk_overlap would
+    otherwise repeat the same sentences), and the result is trimmed to a token budget,
+    dropping the lowest-ranked spans first.
+    """
+
+    def __init__(self, token_budget: int = 1500, locate: Optional[Locator] = None, min_tail_tokens: int = 50):
+        self.token_budget = token_budget  # 0 = unlimited
+        self.locate = locate
+        self.min_tail_tokens = min_tail_tokens
+
+    def assemble(self, chunks: List[str]) -> Tuple[List[str], Dict[str, int]]:
+        """Returns (context blocks best-first, stats with tokens_in/tokens_out/tokens_saved)."""
+        tokens_in = sum(estimate_tokens(chunk) for chunk in chunks)
+
+        located, unlocated, seen = [], [], set()
+        for rank, chunk in enumerate(chunks):
+            if chunk in seen:
+                continue
+            seen.add(chunk)
+            position = self.locate(chunk) if self.locate else None
+            if position is None:
+                unlocated.append((rank, chunk))
+            else:
+                located.append((position[0], position[1], chunk, rank))
+
+        blocks = [(rank, text) for _, _, text, rank in merge_spans(located)] + unlocated
+        blocks.sort(key=lambda block: block[0])
+
+        context, used = [], 0
+        for _, text in blocks:
+            cost = estimate_tokens(text)
+            if self.token_budget and used + cost > self.token_budget:
+                remaining = self.token_budget - used
+                if remaining >= self.min_tail_tokens:
+                    context.append(truncate_to_tokens(text, remaining))
+                break
+            context.append(text)
+            used += cost
+
+        tokens_out = sum(estimate_tokens(text) for text in context)
+        return context, {
+            "chunks": len(chunks),
+            "blocks": len(context),
+            "tokens_in": tokens_in,
+            "tokens_out": tokens_out,
+            "tokens_saved": tokens_in - tokens_out,
+        }
@@ -1,5 +1,6 @@
 import os
-from typing import List, Optional
+import time
+from typing import AsyncIterator, List, Optional
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_ollama import ChatOllama
 from langchain_core.prompts import ChatPromptTemplate
@@ -8,10 +9,57 @@ from langchain_google_genai import ChatGoogleGenerativeAI, HarmBlockThreshold, H
 from src.core.dungeon_master import DungeonMaster
 from src.core.game_state import GameState
 from src.impl.persona_variants import get_persona_manager
+from src.impl.context_assembler import ContextAssembler
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Fixed opening scene shown to every new session (its numbered choices are the likeliest first inputs)
+PROLOGUE_TEXT = """[전래동화 리부트: 콩쥐의 선택]
+
+옛날 어느 마을에 마음씨 착한 콩쥐가 살고 있었습니다. 하지만 콩쥐의 어머니가 돌아가시고, 아버지가 새어머니를 맞이하면서 콩쥐의 고된 나날이 시작되었습니다. 새어머니에게는 심술궂은 딸 팥쥐가 있었는데, 두 모녀는 콩쥐를 미워하며 온갖 구박을 일삼았습니다.
+
+어느 날, 마을 원님 댁에서 큰 잔치가 열린다는 소식이 들려왔습니다. 곱게 차려입은 새어머니와 팥쥐는 잔치에 갈 채비를 마쳤습니다. 콩쥐도 잔치에 가고 싶은 마음에 조심스럽게 물었지만, 새어머니는 코웃음을 치며 말했습니다.
+
+"너도 잔치에 가고 싶으냐? 좋다, 하지만 내가 시키는 일을 다 끝내야만 갈 수 있다."
+
+새어머니는 마당에 놓인 큰 독과 쌓여있는 일감을 가리켰습니다.
+
+"첫째, 저 밑 빠진 독에 물을 가득 채워라.
+둘째, 저 겨와 쌀을 섞어 놓은 것을 모두 골라내어라.
+셋째, 저 삼 한 바구니를 모두 삼아서 베를 짜거라.
+우리가 돌아올 때까지 이 일을 다 끝내면, 그때 잔치에 오거라."
+
+새어머니와 팥쥐는 깔깔거리며 대문을 나섰고, 텅 빈 마당에는 절망적인 표정의 콩쥐만 홀로 남겨졌습니다. 눈앞에는 깨진 독과 산더미 같은 일감이 놓여 있습니다.
+
+이때, 콩쥐는 어떻게 해야 할까요?
+
+1. 밑 빠진 독에 물을 채우기 시작한다.
+2. 너무 힘들어 포기하고 주저앉아 운다.
+3. 새어머니가 시킨 일을 무시하고 몰래 잔치로 향한다."""
+
+# Appended by the model when the current chapter's conflict is resolved; never shown to the player
+SCENE_RESOLVED_TAG = "[SCENE_RESOLVED]"
+EMPTY_RESPONSE_MESSAGE = "⚠️ AI가 답변을 거부했습니다. (안전 필터에 걸렸거나 응답이 비어있습니다.) 다른 행동을 시도해보세요."
+
+
+def _chunk_text(chunk) -> str:
+    """Text of a streamed message chunk (content may be a string or a list of parts)."""
+    content = getattr(chunk, "content", chunk)
+    if isinstance(content, list):
+        return "".join(part if isinstance(part, str) else part.get("text", "") for part in content
+                       if isinstance(part, (str, dict)))
+    return content or ""
+
+
+def _safe_prefix_length(text: str, tag: str) -> int:
+    """Length of the prefix of `text` that can be shown now: a trailing partial `tag` is held back."""
+    start = text.rfind(tag[0])
+    if start != -1 and tag.startswith(text[start:]):
+        return start
+    return len(text)
+
+
 class DungeonMasterImpl(DungeonMaster):
     def __init__(self, model_name: str = None, game_state: Optional[GameState] = None, persona_type: str = "radical"):
         self.provider = os.getenv("AI_PROVIDER", "google").lower()
@@ -56,8 +104,19 @@ class DungeonMasterImpl(DungeonMaster):
         self.long_term_memory: str = "아직 기록된 역사가 없습니다." # Long-term memory (Summary)
         self.log_callback = None
 
+        # Retrieved chunks are merged and trimmed to this many (estimated) tokens before prompting
+        self.context_assembler = ContextAssembler(token_budget=int(os.getenv("LORE_CONTEXT_TOKEN_BUDGET", "1500")))
+        self.last_context_stats = None
+        # Streaming: the final story of the last astream_story() and its timings (ttft_ms, total_ms, ...)
+        self.last_story = None
+        self.last_generation_stats = None
+
     def set_log_callback(self, callback) -> None:
         self.log_callback = callback
+
+    def set_chunk_locator(self, locate) -> None:
+        """Lets the context assembler map retrieved chunks back to source offsets (e.g. LoreKeeperImpl.locate_chunk)."""
+        self.context_assembler.locate = locate
     
     def log(self, message: str):
         print(message)
@@ -139,6 +198,91 @@ class DungeonMasterImpl(DungeonMaster):
         if len(self.conversation_history) > 5:
             self._summarize_old_memories()
 
+        messages = self._build_messages(user_input, context)
+        print(f"[DEBUG] Invoking LLM with model: {self.llm.model}")
+        try:
+            response = self.llm.invoke(messages)
+            print(f"[DEBUG] LLM Response received. Content length: {len(response.content)}")
+            content = response.content
+        except Exception as e:
+            print(f"[ERR] LLM Invoke Failed: {e}")
+            # Re-raise explicitely for web_server.py to catch (e.g. 429 Quota Error)
+            raise e
+
+        return self._finish_story(user_input, content)
+
+    async def agenerate_story(self, user_input: str, context: List[str]) -> str:
+        """
+        Async generate_story() on the model's native ainvoke (no worker thread).
+        Cancelling the awaiting task aborts the upstream request; a cancelled turn is not recorded.
+        """
+        self.log(f"[DungeonMaster] Processing user input: '{user_input}'")
+        self.log(f"[DungeonMaster] Context retrieved: {len(context)} chunks")
+
+        if len(self.conversation_history) > 5:
+            await self._asummarize_old_memories()
+
+        messages = self._build_messages(user_input, context)
+        print(f"[DEBUG] Invoking LLM (async) with model: {self.llm.model}")
+        try:
+            response = await self.llm.ainvoke(messages)
+            print(f"[DEBUG] LLM Response received. Content length: {len(response.content)}")
+            content = response.content
+        except Exception as e:
+            print(f"[ERR] LLM Invoke Failed: {e}")
+            raise
+
+        return self._finish_story(user_input, content)
+
+    async def astream_story(self, user_input: str, context: List[str]) -> AsyncIterator[str]:
+        """
+        Streaming generate_story(): yields text deltas as the model produces them.
+        The scene tag is filtered out of the deltas; once the stream ends, the final story
+        (tag removed, system notes appended, recorded in history) is in self.last_story and
+        the timings (ttft_ms, total_ms, deltas, chars) in self.last_generation_stats.
+        """
+        self.log(f"[DungeonMaster] Processing user input: '{user_input}' (streaming)")
+        self.log(f"[DungeonMaster] Context retrieved: {len(context)} chunks")
+        self.last_story = None
+
+        if len(self.conversation_history) > 5:
+            await self._asummarize_old_memories()
+
+        messages = self._build_messages(user_input, context)
+        started = time.perf_counter()
+        first_token_at = None
+        parts = []
+        pending = ""
+        try:
+            async for chunk in self.llm.astream(messages):
+                delta = _chunk_text(chunk)
+                if not delta:
+                    continue
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                    self.log(f"[LLM] First token in {(first_token_at - started) * 1000:.0f}ms")
+                parts.append(delta)
+                pending = (pending + delta).replace(SCENE_RESOLVED_TAG, "")
+                cut = _safe_prefix_length(pending, SCENE_RESOLVED_TAG)
+                if cut:
+                    yield pending[:cut]
+                    pending = pending[cut:]
+        except Exception as e:
+            print(f"[ERR] LLM Stream Failed: {e}")
+            raise
+        if pending:
+            yield pending
+
+        content = "".join(parts)
+        self.last_generation_stats = {
+            "ttft_ms": (first_token_at - started) * 1000 if first_token_at is not None else None,
+            "total_ms": (time.perf_counter() - started) * 1000,
+            "deltas": len(parts),
+            "chars": len(content),
+        }
+        self.last_story = self._finish_story(user_input, content)
+
+    def _build_messages(self, user_input: str, context: List[str]) -> list:
         # Add game state information if available
         state_info = ""
         scene_info = ""
@@ -154,6 +298,11 @@ class DungeonMasterImpl(DungeonMaster):
             scene_info = f"\n[현재 챕터 상황]: {current_chapter}\n이 챕터의 갈등(과제)을 해결하면 다음 챕터로 진행됩니다."
 
         # RAG Context Logic (Loose constraint for radical mode)
+        if context:
+            context, stats = self.context_assembler.assemble(context)
+            self.last_context_stats = stats
+            self.log(f"[Context] {stats['chunks']} chunks -> {stats['blocks']} blocks, "
+                     f"{stats['tokens_in']} -> {stats['tokens_out']} tokens (saved {stats['tokens_saved']})")
         context_str = "\n".join(context) if context else "원작 콩쥐팥쥐 이야기를 참고하세요."
         rag_instruction = "배경 지식:\n" + context_str
         
@@ -201,27 +350,19 @@ class DungeonMasterImpl(DungeonMaster):
 
 답변은 한국어로 하고, 생동감 있게 서술하세요.""")
         ]
-        
-        print(f"[DEBUG] Invoking LLM with model: {self.llm.model}")
-        try:
-            response = self.llm.invoke(messages)
-            print(f"[DEBUG] LLM Response received. Content length: {len(response.content)}")
-            content = response.content
-            
-            if not content:
-                print("[WARN] LLM returned empty content (Likely Safety Filter).")
-                return "⚠️ AI가 답변을 거부했습니다. (안전 필터에 걸렸거나 응답이 비어있습니다.) 다른 행동을 시도해보세요."
+        return messages
 
-        except Exception as e:
-            print(f"[ERR] LLM Invoke Failed: {e}")
-            # Re-raise explicitely for web_server.py to catch (e.g. 429 Quota Error)
-            raise e
+    def _finish_story(self, user_input: str, content: str) -> str:
+        """Applies the scene tag (chapter transition) and records the turn; returns the text to show."""
+        if not content:
+            print("[WARN] LLM returned empty content (Likely Safety Filter).")
+            return EMPTY_RESPONSE_MESSAGE
         
         # Check for Scene Resolution Tag
-        if "[SCENE_RESOLVED]" in content:
+        if SCENE_RESOLVED_TAG in content:
             self.log(f"[DungeonMaster] Scene Resolution Detected!")
             # Remove tag from display
-            content = content.replace("[SCENE_RESOLVED]", "").strip()
+            content = content.replace(SCENE_RESOLVED_TAG, "").strip()
             
             # Update State (Transitions)
             if self.game_state:
@@ -241,6 +382,24 @@ class DungeonMasterImpl(DungeonMaster):
 
     def _summarize_old_memories(self):
         """오래된 대화 내용을 요약하여 장기 기억으로 이관"""
+        summary_prompt = self._summary_prompt()
+        try:
+            summary_response = self.llm.invoke([HumanMessage(content=summary_prompt)])
+            self._apply_summary(summary_response.content)
+        except Exception as e:
+            self.log(f"[Memory] Summarization Failed: {e}")
+            # 실패 시 리스트를 건드리지 않음 (다음 턴에 다시 시도됨)
+
+    async def _asummarize_old_memories(self):
+        """_summarize_old_memories 의 async 버전 (ainvoke, 취소 시 기억은 그대로 유지)"""
+        summary_prompt = self._summary_prompt()
+        try:
+            summary_response = await self.llm.ainvoke([HumanMessage(content=summary_prompt)])
+            self._apply_summary(summary_response.content)
+        except Exception as e:
+            self.log(f"[Memory] Summarization Failed: {e}")
+
+    def _summary_prompt(self) -> str:
         # 가장 오래된 2개의 턴을 추출 (아직 삭제하지 않음)
         old_turns = self.conversation_history[:2]
         
@@ -250,7 +409,7 @@ class DungeonMasterImpl(DungeonMaster):
             
         self.log(f"[Memory] Summarizing {len(old_turns)} old turns...")
         
-        summary_prompt = f"""
+        return f"""
 현재까지의 이야기 요약:
 {self.long_term_memory}
 
@@ -263,43 +422,17 @@ class DungeonMasterImpl(DungeonMaster):
 - 3문장 이내로 작성하세요.
 - 한국어로 작성하세요.
 """
-        try:
-            summary_response = self.llm.invoke([HumanMessage(content=summary_prompt)])
-            self.long_term_memory = summary_response.content
-            
-            # 성공했을 때만 리스트에서 제거 (데이터 보존)
-            self.conversation_history = self.conversation_history[2:]
-            self.log(f"[Memory] Summary Updated: {self.long_term_memory}")
-            
-        except Exception as e:
-            self.log(f"[Memory] Summarization Failed: {e}")
-            # 실패 시 리스트를 건드리지 않음 (다음 턴에 다시 시도됨)
+
+    def _apply_summary(self, summary: str) -> None:
+        self.long_term_memory = summary
+        # 성공했을 때만 리스트에서 제거 (데이터 보존)
+        self.conversation_history = self.conversation_history[2:]
+        self.log(f"[Memory] Summary Updated: {self.long_term_memory}")
 
     def generate_prologue(self, context: List[str]) -> str:
         """게임 시작 시 프롤로그 반환 (고정된 상황)"""
         # 사용자 요청: 매번 생성하는 대신 고정된 상황 사용 (속도 및 일관성)
-        prologue_text = """[전래동화 리부트: 콩쥐의 선택]
-
-옛날 어느 마을에 마음씨 착한 콩쥐가 살고 있었습니다. 하지만 콩쥐의 어머니가 돌아가시고, 아버지가 새어머니를 맞이하면서 콩쥐의 고된 나날이 시작되었습니다. 새어머니에게는 심술궂은 딸 팥쥐가 있었는데, 두 모녀는 콩쥐를 미워하며 온갖 구박을 일삼았습니다.
-
-어느 날, 마을 원님 댁에서 큰 잔치가 열린다는 소식이 들려왔습니다. 곱게 차려입은 새어머니와 팥쥐는 잔치에 갈 채비를 마쳤습니다. 콩쥐도 잔치에 가고 싶은 마음에 조심스럽게 물었지만, 새어머니는 코웃음을 치며 말했습니다.
-
-"너도 잔치에 가고 싶으냐? 좋다, 하지만 내가 시키는 일을 다 끝내야만 갈 수 있다."
-
-새어머니는 마당에 놓인 큰 독과 쌓여있는 일감을 가리켰습니다.
-
-"첫째, 저 밑 빠진 독에 물을 가득 채워라.
-둘째, 저 겨와 쌀을 섞어 놓은 것을 모두 골라내어라.
-셋째, 저 삼 한 바구니를 모두 삼아서 베를 짜거라.
-우리가 돌아올 때까지 이 일을 다 끝내면, 그때 잔치에 오거라."
-
-새어머니와 팥쥐는 깔깔거리며 대문을 나섰고, 텅 빈 마당에는 절망적인 표정의 콩쥐만 홀로 남겨졌습니다. 눈앞에는 깨진 독과 산더미 같은 일감이 놓여 있습니다.
-
-이때, 콩쥐는 어떻게 해야 할까요?
-
-1. 밑 빠진 독에 물을 채우기 시작한다.
-2. 너무 힘들어 포기하고 주저앉아 운다.
-3. 새어머니가 시킨 일을 무시하고 몰래 잔치로 향한다."""
+        prologue_text = PROLOGUE_TEXT
 
         # Record prologue in history
         self.conversation_history.append({
@@ -0,0 +1,269 @@
+import asyncio
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Awaitable, Callable, List, Optional
+from langchain_core.embeddings import Embeddings
+
+
+class _BatchMetrics:
+    """Batch-size distribution and queueing delay, shared by the thread and asyncio batchers."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.batch_sizes = Counter()
+        self.queue_delays_ms = deque(maxlen=2048)
+        self.total_queries = 0
+        self.total_batches = 0
+
+    def record(self, batch, dispatched_at: float) -> None:
+        with self._lock:
+            self.total_batches += 1
+            self.total_queries += len(batch)
+            self.batch_sizes[len(batch)] += 1
+            self.queue_delays_ms.extend((dispatched_at - enqueued) * 1000 for _, _, enqueued in batch)
+
+    def stats(self) -> dict:
+        with self._lock:
+            delays = sorted(self.queue_delays_ms)
+            return {
+                "batches": self.total_batches,
+                "queries": self.total_queries,
+                "avg_batch_size": (self.total_queries / self.total_batches) if self.total_batches else 0.0,
+                "batch_size_histogram": dict(sorted(self.batch_sizes.items())),
+                "queue_delay_ms_avg": (sum(delays) / len(delays)) if delays else 0.0,
+                "queue_delay_ms_p50": delays[len(delays) // 2] if delays else 0.0,
+                "queue_delay_ms_p99": delays[min(len(delays) - 1, int(len(delays) * 0.99))] if delays else 0.0,
+            }
+
+
+class EmbeddingBatcher:
+    """
+    Micro-batcher for query embeddings.
+    Queries arriving within `max_wait_ms` of the first queued query (or until
+    `max_batch_size` is reached) are sent as a single batch call, and each
+    caller receives its own vector through a Future.
+    Works for both threads (embed) and coroutines (aembed), but every batch runs
+    the sync batch_fn on a pool thread; AsyncEmbeddingBatcher is the event-loop version.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[str]], List[List[float]]],
+                 max_batch_size: int = 16, max_wait_ms: float = 5.0, max_concurrent_batches: int = 4):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._pending = deque()  # (text, future, enqueued_at)
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent_batches, thread_name_prefix="embed-batch")
+        self._worker = None
+        self._closed = False
+
+        self.metrics = _BatchMetrics()
+
+    def submit(self, text: str) -> Future:
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("EmbeddingBatcher is closed")
+            self._pending.append((text, future, time.perf_counter()))
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._collect_loop, name="embed-batcher", daemon=True)
+                self._worker.start()
+            self._cond.notify()
+        return future
+
+    def embed(self, text: str) -> List[float]:
+        return self.submit(text).result()
+
+    async def aembed(self, text: str) -> List[float]:
+        return await asyncio.wrap_future(self.submit(text))
+
+    def _collect_loop(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed and not self._pending:
+                    return
+                # Wait for the window (anchored at the oldest request) or a full batch
+                deadline = self._pending[0][2] + self.max_wait
+                while len(self._pending) < self.max_batch_size and not self._closed:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = [self._pending.popleft() for _ in range(min(self.max_batch_size, len(self._pending)))]
+            self._executor.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch):
+        self.metrics.record(batch, time.perf_counter())
+        # Identical queries in one window share a single slot
+        unique_texts = list(dict.fromkeys(text for text, _, _ in batch))
+        try:
+            vectors = self.batch_fn(unique_texts)
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        by_text = dict(zip(unique_texts, vectors))
+        for text, future, _ in batch:
+            # A cancelled caller (hybrid deadline, prefetch, turn) must not fail the rest of the batch
+            if future.done():
+                continue
+            future.set_result(list(by_text[text]))
+
+    def stats(self) -> dict:
+        """Batch-size distribution and queueing delay added by the batch window."""
+        return self.metrics.stats()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._worker is not None:
+            self._worker.join(timeout=1.0)
+        self._executor.shutdown(wait=True)
+
+
+class AsyncEmbeddingBatcher:
+    """
+    asyncio micro-batcher for query embeddings (aretrieve on the server's event loop).
+    Callers queue on an asyncio.Queue; a collector task waits up to `max_wait_ms` after
+    the first query (or until `max_batch_size` are queued) and awaits one async batch call
+    (aembed_documents) for the window, so concurrent sessions share a request without
+    holding threads. A cancelled caller simply drops out of its batch.
+    The queue belongs to the event loop of the first caller; another loop gets a fresh one.
+    """
+
+    def __init__(self, abatch_fn: Callable[[List[str]], Awaitable[List[List[float]]]],
+                 max_batch_size: int = 16, max_wait_ms: float = 5.0, max_concurrent_batches: int = 4):
+        self.abatch_fn = abatch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.max_concurrent_batches = max(1, max_concurrent_batches)
+        self._loop = None
+        self._queue = None
+        self._full = None
+        self._slots = None
+        self._collector = None
+        self._batches = set()
+        self.metrics = _BatchMetrics()
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._collector is not None and not self._collector.done():
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._full = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+        self._batches = set()
+        self._collector = loop.create_task(self._collect_loop())
+
+    async def aembed(self, text: str) -> List[float]:
+        self._ensure_started()
+        future = self._loop.create_future()
+        self._queue.put_nowait((text, future, time.perf_counter()))
+        # The collector already holds the window's first query
+        if self._queue.qsize() + 1 >= self.max_batch_size:
+            self._full.set()
+        return await future
+
+    async def _collect_loop(self):
+        while True:
+            batch = [await self._queue.get()]
+            # Wait for the window (anchored at the oldest query) unless a full batch is already queued
+            remaining = batch[0][2] + self.max_wait - time.perf_counter()
+            if remaining > 0 and self._queue.qsize() + 1 < self.max_batch_size:
+                self._full.clear()
+                try:
+                    await asyncio.wait_for(self._full.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            # Callers cancelled while queued (hybrid deadline, prefetch, turn) are not embedded
+            batch = [item for item in batch if not item[1].done()]
+            if not batch:
+                continue
+            await self._slots.acquire()
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, batch):
+        try:
+            self.metrics.record(batch, time.perf_counter())
+            unique_texts = list(dict.fromkeys(text for text, _, _ in batch))
+            try:
+                vectors = await self.abatch_fn(unique_texts)
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            by_text = dict(zip(unique_texts, vectors))
+            for text, future, _ in batch:
+                if not future.done():
+                    future.set_result(list(by_text[text]))
+        finally:
+            self._slots.release()
+
+    def stats(self) -> dict:
+        """Batch-size distribution and queueing delay added by the batch window."""
+        return self.metrics.stats()
+
+    def close(self):
+        """Stops the collector and in-flight batches (call from the loop that uses the batcher)."""
+        for task in [self._collector, *self._batches]:
+            if task is not None and not task.done():
+                task.cancel()
+
+
+class BatchedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that routes embed_query through an EmbeddingBatcher and
+    aembed_query through an AsyncEmbeddingBatcher. Without an async batcher,
+    aembed_query stays on the provider's native async client (not batched) rather
+    than parking coroutines on the thread batcher's pool.
+    """
+
+    def __init__(self, embeddings: Embeddings, batcher: EmbeddingBatcher,
+                 async_batcher: Optional[AsyncEmbeddingBatcher] = None):
+        self.embeddings = embeddings
+        self.batcher = batcher
+        self.async_batcher = async_batcher
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.batcher.embed(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.embeddings.aembed_documents(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        if self.async_batcher is not None:
+            return await self.async_batcher.aembed(text)
+        return await self.embeddings.aembed_query(text)
+
+
+def query_batch_fn(embeddings: Embeddings, task_type: Optional[str] = None) -> Callable[[List[str]], List[List[float]]]:
+    """
+    Batch function for queries. Providers that embed queries and documents
+    differently (Gemini task_type) get the query task type passed explicitly.
+    """
+    if task_type:
+        return lambda texts: embeddings.embed_documents(texts, task_type=task_type)
+    return embeddings.embed_documents
+
+
+def async_query_batch_fn(embeddings: Embeddings,
+                         task_type: Optional[str] = None) -> Callable[[List[str]], Awaitable[List[List[float]]]]:
+    """Async counterpart of query_batch_fn (aembed_documents)."""
+    if task_type:
+        return lambda texts: embeddings.aembed_documents(texts, task_type=task_type)
+    return embeddings.aembed_documents
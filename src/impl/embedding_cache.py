@@ -0,0 +1,247 @@
+import array
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import List, Optional
+from langchain_core.embeddings import Embeddings
+
+
+class QueryEmbeddingCache:
+    """
+    Two-tier cache for query embeddings.
+    - Memory tier: bounded LRU with TTL.
+    - Disk tier (optional): SQLite file, survives restarts.
+    - Pinned entries (startup warmup) skip TTL and LRU eviction.
+    Keys are (normalized query, embedding model) so different API keys share hits.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 24 * 3600, db_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (created_at, vector)
+        self._pinned = {}  # key -> vector
+        self._lock = threading.Lock()
+        self._conn = None
+
+        # Counters
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.miss_latency_total = 0.0
+
+        if db_path:
+            self._open_disk_tier(db_path)
+
+    @classmethod
+    def from_env(cls) -> "QueryEmbeddingCache":
+        """Builds a cache from LORE_QUERY_CACHE_* environment variables."""
+        return cls(
+            max_entries=int(os.getenv("LORE_QUERY_CACHE_SIZE", "1024")),
+            ttl_seconds=float(os.getenv("LORE_QUERY_CACHE_TTL", str(24 * 3600))),
+            db_path=os.getenv("LORE_QUERY_CACHE_DB") or None,
+        )
+
+    def _open_disk_tier(self, db_path: str):
+        try:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS query_embeddings ("
+                "key TEXT PRIMARY KEY, created_at REAL NOT NULL, vector BLOB NOT NULL)"
+            )
+            self._conn.commit()
+        except Exception as e:
+            print(f"[WARN] Query embedding disk cache disabled ({db_path}): {e}")
+            self._conn = None
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """NFC, lowercase, collapsed whitespace. '두꺼비를  도와준다 ' == '두꺼비를 도와준다'"""
+        return " ".join(unicodedata.normalize("NFC", text).lower().split())
+
+    def make_key(self, text: str, model_name: str) -> str:
+        raw = f"{model_name}\x00{self.normalize(text)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and self.ttl_seconds > 0 and now - created_at > self.ttl_seconds
+
+    @property
+    def persistent(self) -> bool:
+        """True when lookup misses and puts touch the SQLite disk tier."""
+        return self._conn is not None
+
+    def _memory_get(self, key: str, now: float) -> Optional[List[float]]:
+        # Caller holds the lock
+        pinned = self._pinned.get(key)
+        if pinned is not None:
+            self.hits += 1
+            return list(pinned)
+        entry = self._entries.get(key)
+        if entry is not None:
+            created_at, vector = entry
+            if not self._expired(created_at, now):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return list(vector)
+            del self._entries[key]
+        return None
+
+    def get_memory(self, text: str, model_name: str) -> Optional[List[float]]:
+        """Memory-tier lookup only (no disk I/O). A None here is not counted as a miss."""
+        with self._lock:
+            return self._memory_get(self.make_key(text, model_name), time.time())
+
+    def get(self, text: str, model_name: str) -> Optional[List[float]]:
+        key = self.make_key(text, model_name)
+        now = time.time()
+        with self._lock:
+            vector = self._memory_get(key, now)
+            if vector is not None:
+                return vector
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT created_at, vector FROM query_embeddings WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    created_at, blob = row
+                    if not self._expired(created_at, now):
+                        vector = array.array('d')
+                        vector.frombytes(blob)
+                        self._store_memory(key, created_at, vector.tolist())
+                        self.hits += 1
+                        self.disk_hits += 1
+                        return vector.tolist()
+                    self._conn.execute("DELETE FROM query_embeddings WHERE key = ?", (key,))
+                    self._conn.commit()
+
+            self.misses += 1
+            return None
+
+    def put(self, text: str, model_name: str, vector: List[float], latency: float = 0.0) -> None:
+        key = self.make_key(text, model_name)
+        now = time.time()
+        with self._lock:
+            self.miss_latency_total += latency
+            self._store_memory(key, now, list(vector))
+            if self._conn is not None:
+                try:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO query_embeddings (key, created_at, vector) VALUES (?, ?, ?)",
+                        (key, now, array.array('d', vector).tobytes())
+                    )
+                    self._conn.commit()
+                except Exception as e:
+                    print(f"[WARN] Failed to persist query embedding: {e}")
+
+    def _store_memory(self, key: str, created_at: float, vector: List[float]):
+        # Caller holds the lock
+        self._entries[key] = (created_at, tuple(vector))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def pin(self, text: str, model_name: str) -> bool:
+        """Keeps an already cached query vector in memory for good. False if it is not cached."""
+        key = self.make_key(text, model_name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._pinned[key] = entry[1]
+            return key in self._pinned
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._pinned.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM query_embeddings")
+                self._conn.commit()
+
+    def stats(self) -> dict:
+        """Hit/miss counters plus an estimate of embedding time saved by hits."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            avg_miss_ms = (self.miss_latency_total / self.misses * 1000) if self.misses else 0.0
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "size": len(self._entries),
+                "pinned": len(self._pinned),
+                "evictions": self.evictions,
+                "avg_miss_latency_ms": avg_miss_ms,
+                "estimated_saved_ms": avg_miss_ms * self.hits,
+            }
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that answers embed_query from a QueryEmbeddingCache.
+    Document embeddings (index building) pass straight through.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache: QueryEmbeddingCache, model_name: str):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model_name = model_name
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        cached = self.lookup(text)
+        if cached is not None:
+            return cached
+        return self.embed_uncached(text)
+
+    def lookup(self, text: str) -> Optional[List[float]]:
+        """Cached vector for the query, or None (miss) - never calls the provider."""
+        return self.cache.get(text, self.model_name)
+
+    def embed_uncached(self, text: str) -> List[float]:
+        """Embeds with the provider and stores the vector (callers that already missed the cache)."""
+        start = time.perf_counter()
+        vector = self.embeddings.embed_query(text)
+        self.cache.put(text, self.model_name, vector, latency=time.perf_counter() - start)
+        return vector
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.embeddings.aembed_documents(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        cached = await self.alookup(text)
+        if cached is not None:
+            return cached
+        return await self.aembed_uncached(text)
+
+    async def alookup(self, text: str) -> Optional[List[float]]:
+        # Memory hits are answered inline; SQLite reads/writes run in a worker thread
+        cached = self.cache.get_memory(text, self.model_name)
+        if cached is not None:
+            return cached
+        if self.cache.persistent:
+            return await asyncio.to_thread(self.cache.get, text, self.model_name)
+        return self.cache.get(text, self.model_name)
+
+    async def aembed_uncached(self, text: str) -> List[float]:
+        start = time.perf_counter()
+        vector = await self.embeddings.aembed_query(text)
+        latency = time.perf_counter() - start
+        if self.cache.persistent:
+            await asyncio.to_thread(self.cache.put, text, self.model_name, vector, latency)
+        else:
+            self.cache.put(text, self.model_name, vector, latency=latency)
+        return vector
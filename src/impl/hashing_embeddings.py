@@ -0,0 +1,102 @@
+import re
+import unicodedata
+from typing import List, Tuple
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+_SPACE_RE = re.compile(r"\s+")
+_MASK64 = (1 << 64) - 1
+_ROLL = np.uint64(1_000_003)
+_MIX1 = np.uint64(0xFF51AFD7ED558CCD)
+_MIX2 = np.uint64(0xC4CEB9FE1A85EC53)
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Fully in-process embedder: feature hashing of character n-grams into a fixed-size vector.
+
+    - No network, no model files, no randomness: the same text always gives the same vector
+      (across processes and machines), so indexes built offline are reusable.
+    - Works on Hangul syllables directly (NFC), so '두꺼비를' and '두꺼비가' share n-grams.
+    - All n-grams of a text are hashed at once with vectorized uint64 arithmetic and
+      accumulated with np.bincount (thousands of 1000-char chunks per second on one core).
+    Vectors are L2-normalized (signed hashing keeps collisions unbiased).
+    """
+
+    def __init__(self, dimension: int = 768, ngram_range: Tuple[int, int] = (1, 3), seed: int = 0):
+        if dimension <= 0:
+            raise ValueError("dimension must be positive")
+        self.dimension = dimension
+        self.ngram_range = ngram_range
+        self._seed = np.uint64((seed * 0x9E3779B97F4A7C15) & _MASK64)
+
+    @property
+    def model_name(self) -> str:
+        """Identifies the vector space (changes invalidate stored vectors)."""
+        low, high = self.ngram_range
+        return f"hashing-ngram{low}-{high}-d{self.dimension}"
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return _SPACE_RE.sub(" ", unicodedata.normalize("NFC", text).lower()).strip()
+
+    def _mix(self, h: np.ndarray) -> np.ndarray:
+        # murmur3 finalizer: spreads rolling-hash bits before taking the bucket
+        h = h ^ self._seed
+        h ^= h >> np.uint64(33)
+        h *= _MIX1
+        h ^= h >> np.uint64(33)
+        h *= _MIX2
+        h ^= h >> np.uint64(33)
+        return h
+
+    def _vector(self, text: str) -> np.ndarray:
+        text = self.normalize(text)
+        vector = np.zeros(self.dimension, dtype=np.float64)
+        if not text:
+            return vector.astype(np.float32)
+
+        codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        low, high = self.ngram_range
+        grams = []
+        rolling = codes
+        with np.errstate(over="ignore"):
+            for n in range(1, high + 1):
+                if n > 1:
+                    if len(rolling) < 2:
+                        break
+                    rolling = rolling[:-1] * _ROLL + codes[n - 1:]
+                if n >= low:
+                    grams.append(rolling + np.uint64(n))
+            if not grams:
+                return vector.astype(np.float32)
+            # One mix + one bincount for every n-gram of the text
+            h = self._mix(np.concatenate(grams))
+        buckets = (h % np.uint64(self.dimension)).astype(np.intp)
+        signs = 1.0 - 2.0 * (h >> np.uint64(63)).astype(np.float64)
+        vector = np.bincount(buckets, weights=signs, minlength=self.dimension)
+
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector.astype(np.float32)
+
+    def embed_array(self, texts: List[str]) -> np.ndarray:
+        """(n, dimension) float32 matrix; avoids list conversion for NumPy consumers."""
+        matrix = np.empty((len(texts), self.dimension), dtype=np.float32)
+        for i, text in enumerate(texts):
+            matrix[i] = self._vector(text)
+        return matrix
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_array(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._vector(text).tolist()
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        # CPU-only and fast: no thread hop needed
+        return self.embed_documents(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return self.embed_query(text)
@@ -0,0 +1,69 @@
+import hashlib
+import json
+import os
+from typing import Optional, Dict, Any
+
+MANIFEST_FILENAME = "lore_index_manifest.json"
+MANIFEST_VERSION = 1
+
+
+def hash_text(text: str) -> str:
+    """Stable SHA-256 hex digest of a text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def config_fingerprint(model_name: str, chunk_size: int, chunk_overlap: int, collection_name: str,
+                       chunker: str = "recursive") -> str:
+    """
+    Fingerprint of everything (besides the text itself) that changes the stored vectors
+    or their metadata. If this changes, previously embedded chunks cannot be reused.
+    """
+    payload = json.dumps({
+        "model": model_name,
+        "chunk_size": chunk_size,
+        "chunk_overlap": chunk_overlap,
+        "collection": collection_name,
+        "chunker": chunker,
+    }, sort_keys=True)
+    return hash_text(payload)
+
+
+def chunk_id(content: str, config_fp: str, namespace: str = "") -> str:
+    """
+    Content-addressed chunk id: same text under the same config -> same id.
+    `namespace` (the book id) keeps identical passages in different books apart.
+    """
+    if namespace:
+        return hash_text(config_fp + "\x00" + namespace + "\x00" + content)
+    return hash_text(config_fp + "\x00" + content)
+
+
+def manifest_path(db_path: str) -> str:
+    return os.path.join(db_path, MANIFEST_FILENAME)
+
+
+def load_manifest(db_path: str) -> Optional[Dict[str, Any]]:
+    """Returns the stored manifest, or None if missing/unreadable/outdated."""
+    path = manifest_path(db_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except Exception as e:
+        print(f"[WARN] Could not read index manifest ({path}): {e}")
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def save_manifest(db_path: str, manifest: Dict[str, Any]) -> None:
+    """Writes the manifest atomically so a crash never leaves a half-written file."""
+    os.makedirs(db_path, exist_ok=True)
+    path = manifest_path(db_path)
+    tmp_path = path + ".tmp"
+    manifest = dict(manifest, version=MANIFEST_VERSION)
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
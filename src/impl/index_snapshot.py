@@ -0,0 +1,116 @@
+import json
+import os
+import time
+import zipfile
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+SNAPSHOT_FORMAT = "lore-index-snapshot"
+SNAPSHOT_VERSION = 1
+_VECTORS_MEMBER = "vectors.npy"
+
+
+def _json_array(value) -> np.ndarray:
+    return np.frombuffer(json.dumps(value, ensure_ascii=False).encode("utf-8"), dtype=np.uint8)
+
+
+def _read_json(archive, name: str):
+    return json.loads(bytes(archive[name]).decode("utf-8"))
+
+
+def write_snapshot(path: str, manifest: Dict[str, Any], ids: List[str], texts: List[str],
+                   metadatas: List[dict], matrix, ivf=None) -> Dict[str, Any]:
+    """
+    Writes the whole index into one uncompressed .npz:
+      manifest (JSON: format, version, model, config ...), chunks (JSON: ids/texts/metadatas),
+      vectors (float32 matrix), sq_norms (row norms, so loading never reads the matrix)
+      and, optionally, the IVF lists.
+    Members are stored, not deflated, so the matrix can be memory-mapped in place.
+    The file is written to <path>.tmp and renamed, so a reader never sees a partial snapshot.
+    """
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    manifest = dict(manifest, format=SNAPSHOT_FORMAT, version=SNAPSHOT_VERSION, chunk_count=len(ids),
+                    dimension=int(matrix.shape[1]) if matrix.ndim == 2 and len(ids) else 0,
+                    created_at=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()))
+    arrays = {
+        "manifest": _json_array(manifest),
+        "chunks": _json_array({"ids": ids, "texts": texts, "metadatas": metadatas}),
+        "vectors": matrix,
+        "sq_norms": np.einsum('ij,ij->i', matrix, matrix).astype(np.float32) if len(ids) else np.zeros(0, np.float32),
+    }
+    if ivf is not None:
+        arrays["ivf_centroids"] = ivf.centroids
+        arrays["ivf_assignments"] = ivf.assignments
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path + ".tmp", 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(path + ".tmp", path)
+    return manifest
+
+
+def read_manifest(path: str) -> Dict[str, Any]:
+    """Reads only the manifest (cheap: no chunks, no vectors). Raises ValueError if it is not a snapshot."""
+    with np.load(path) as archive:
+        manifest = _read_json(archive, "manifest")
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"{path} is not a lore index snapshot")
+    if manifest.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {manifest.get('version')} (expected {SNAPSHOT_VERSION})")
+    return manifest
+
+
+def _memmap_member(path: str, member: str) -> Optional[np.ndarray]:
+    """Memory-maps a stored (uncompressed) .npy member of a zip archive; None if it is compressed."""
+    with zipfile.ZipFile(path) as archive:
+        info = archive.getinfo(member)
+    if info.compress_type != zipfile.ZIP_STORED:
+        return None
+    with open(path, 'rb') as f:
+        # Local file header: 30 fixed bytes, then the file name and extra field
+        f.seek(info.header_offset)
+        header = f.read(30)
+        name_length = int.from_bytes(header[26:28], "little")
+        extra_length = int.from_bytes(header[28:30], "little")
+        f.seek(info.header_offset + 30 + name_length + extra_length)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        elif version == (2, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        else:
+            return None
+        offset = f.tell()
+    if fortran_order or dtype.hasobject:
+        return None
+    if not shape or 0 in shape:
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape)
+
+
+def read_snapshot(path: str, mmap: bool = True) -> Dict[str, Any]:
+    """
+    Loads a snapshot: {"manifest", "ids", "texts", "metadatas", "matrix", "sq_norms",
+    "ivf": (centroids, assignments) | None}.
+    With mmap the matrix pages are read from disk on first use instead of at load time.
+    """
+    manifest = read_manifest(path)
+    with np.load(path) as archive:
+        chunks = _read_json(archive, "chunks")
+        matrix = _memmap_member(path, _VECTORS_MEMBER) if mmap else None
+        if matrix is None:
+            matrix = archive["vectors"]
+        sq_norms = archive["sq_norms"]
+        ivf = None
+        if "ivf_centroids" in archive.files:
+            ivf = (archive["ivf_centroids"], archive["ivf_assignments"])
+    return {
+        "manifest": manifest,
+        "ids": chunks["ids"],
+        "texts": chunks["texts"],
+        "metadatas": chunks["metadatas"],
+        "matrix": matrix,
+        "sq_norms": sq_norms,
+        "ivf": ivf,
+    }
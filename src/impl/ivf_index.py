@@ -0,0 +1,90 @@
+import math
+from typing import Optional
+import numpy as np
+
+_BLOCK_ROWS = 4096
+
+
+def nearest_centroids(data, centroids: np.ndarray, c_sq_norms: Optional[np.ndarray] = None) -> np.ndarray:
+    """Index of the closest centroid (squared L2) for every row, computed block by block."""
+    if c_sq_norms is None:
+        c_sq_norms = np.einsum('ij,ij->i', centroids, centroids)
+    assignments = np.empty(data.shape[0], dtype=np.int32)
+    for start in range(0, data.shape[0], _BLOCK_ROWS):
+        block = np.asarray(data[start:start + _BLOCK_ROWS], dtype=np.float32)
+        assignments[start:start + len(block)] = np.argmax(2.0 * (block @ centroids.T) - c_sq_norms, axis=1)
+    return assignments
+
+
+def kmeans(data, n_clusters: int, iterations: int = 10, sample_size: Optional[int] = None,
+           seed: int = 0) -> np.ndarray:
+    """
+    Lloyd's k-means on a random sample of the rows (64 per cluster by default).
+    Empty clusters are re-seeded from random sample points. Returns float32 centroids.
+    """
+    rng = np.random.default_rng(seed)
+    n = data.shape[0]
+    sample_size = min(n, sample_size or n_clusters * 64)
+    sample = np.asarray(data[np.sort(rng.choice(n, sample_size, replace=False))], dtype=np.float32)
+    centroids = sample[rng.choice(sample_size, n_clusters, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignments = nearest_centroids(sample, centroids)
+        order = np.argsort(assignments, kind='stable')
+        counts = np.bincount(assignments, minlength=n_clusters)
+        present = np.flatnonzero(counts)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[present]
+        centroids[present] = np.add.reduceat(sample[order], starts, axis=0) / counts[present, None]
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            centroids[empty] = sample[rng.choice(sample_size, len(empty), replace=False)]
+    return centroids
+
+
+class IVFIndex:
+    """
+    Inverted-file index (coarse quantizer) over the rows of a vector matrix.
+
+    Rows are clustered with k-means; a query only scans the rows of its `nprobe`
+    closest clusters. Larger nprobe -> higher recall, higher latency.
+    Rows are stored grouped by cluster (CSR layout), so a probe is a few contiguous slices.
+    """
+
+    def __init__(self, centroids: np.ndarray, assignments: np.ndarray):
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self._c_sq_norms = np.einsum('ij,ij->i', self.centroids, self.centroids)
+        self.assignments = np.asarray(assignments, dtype=np.int32)
+        self._build_lists()
+
+    @classmethod
+    def build(cls, matrix, n_lists: Optional[int] = None, iterations: int = 10, seed: int = 0) -> "IVFIndex":
+        """Clusters `matrix` into n_lists lists (default: sqrt(rows))."""
+        n = matrix.shape[0]
+        n_lists = max(1, min(n, n_lists or int(math.sqrt(n))))
+        centroids = kmeans(matrix, n_lists, iterations=iterations, seed=seed)
+        return cls(centroids, nearest_centroids(matrix, centroids))
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    def _build_lists(self) -> None:
+        self.order = np.argsort(self.assignments, kind='stable').astype(np.int64)
+        counts = np.bincount(self.assignments, minlength=self.n_lists)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+    def add(self, vectors) -> None:
+        """Assigns appended rows to their nearest existing centroid."""
+        new = nearest_centroids(np.asarray(vectors, dtype=np.float32), self.centroids, self._c_sq_norms)
+        self.assignments = np.concatenate([self.assignments, new])
+        self._build_lists()
+
+    def probe(self, query_vector, nprobe: int = 8) -> np.ndarray:
+        """Sorted row indices of the `nprobe` lists closest to the query."""
+        q = np.asarray(query_vector, dtype=np.float32)
+        scores = 2.0 * (self.centroids @ q) - self._c_sq_norms
+        nprobe = min(nprobe, self.n_lists)
+        lists = np.argpartition(-scores, nprobe - 1)[:nprobe] if nprobe < self.n_lists else np.arange(self.n_lists)
+        rows = np.concatenate([self.order[self.offsets[i]:self.offsets[i + 1]] for i in lists])
+        rows.sort()
+        return rows
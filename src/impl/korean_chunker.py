@@ -0,0 +1,108 @@
+import re
+from typing import List, Tuple
+from langchain_core.documents import Document
+from src.impl.chapters import split_chapters
+
+# Paragraphs are separated by blank lines
+PARAGRAPH_BREAK_RE = re.compile(r"\n[ \t]*\n\s*")
+# Korean sentence endings (다. / 요. / 까? / 죠! ...), plus closing quotes/brackets
+SENTENCE_END_RE = re.compile(r"[.?!…]+[\"'”’)\]]*(?=\s|$)")
+
+# (start, end, paragraph_index) with offsets into the whole text
+Unit = Tuple[int, int, int]
+
+
+def paragraph_spans(text: str, offset: int = 0) -> List[Tuple[int, int]]:
+    """(start, end) of every non-blank paragraph, whitespace trimmed."""
+    spans, start = [], 0
+    for match in list(PARAGRAPH_BREAK_RE.finditer(text)) + [None]:
+        end = match.start() if match else len(text)
+        chunk = text[start:end]
+        stripped = chunk.strip()
+        if stripped:
+            lead = len(chunk) - len(chunk.lstrip())
+            spans.append((offset + start + lead, offset + start + lead + len(stripped)))
+        if match:
+            start = match.end()
+    return spans
+
+
+def sentence_spans(text: str, start: int, end: int) -> List[Tuple[int, int]]:
+    """(start, end) of the sentences in text[start:end]; the remainder is one last sentence."""
+    spans, cursor = [], start
+    for match in SENTENCE_END_RE.finditer(text, start, end):
+        sentence_end = match.end()
+        if text[cursor:sentence_end].strip():
+            lead = len(text[cursor:sentence_end]) - len(text[cursor:sentence_end].lstrip())
+            spans.append((cursor + lead, sentence_end))
+        cursor = sentence_end
+    if text[cursor:end].strip():
+        lead = len(text[cursor:end]) - len(text[cursor:end].lstrip())
+        spans.append((cursor + lead, end))
+    return spans
+
+
+class KoreanStructureChunker:
+    """
+    Splits a book along its structure instead of at fixed character counts:
+    '## ' sections are never crossed, chunks are packed from whole paragraphs, and a
+    paragraph longer than chunk_size is packed sentence by sentence (Korean endings
+    like 다. / 요. / 까?). Only a single sentence longer than chunk_size is cut mid-text.
+
+    Overlap is whole trailing sentences/paragraphs up to chunk_overlap chars.
+    Every chunk is an exact slice of the source and carries chapter, paragraph
+    range and character offsets (start_index/end_index) as metadata.
+    """
+
+    name = "structure"
+
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+        if chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+
+    def _units(self, text: str, start: int, end: int, paragraph_index: int) -> List[Unit]:
+        if end - start <= self.chunk_size:
+            return [(start, end, paragraph_index)]
+        units = []
+        for s_start, s_end in sentence_spans(text, start, end):
+            # A single overlong sentence: hard cut (nothing better left to respect)
+            for cut in range(s_start, s_end, self.chunk_size):
+                units.append((cut, min(cut + self.chunk_size, s_end), paragraph_index))
+        return units
+
+    def _pack(self, units: List[Unit]) -> List[List[Unit]]:
+        chunks, current = [], []
+        for unit in units:
+            if current and unit[1] - current[0][0] > self.chunk_size:
+                chunks.append(current)
+                carry = []
+                for previous in reversed(current[1:]):  # never carry the whole chunk
+                    if current[-1][1] - previous[0] > self.chunk_overlap:
+                        break
+                    carry.insert(0, previous)
+                current = carry if carry and unit[1] - carry[0][0] <= self.chunk_size else []
+            current.append(unit)
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def split_text(self, text: str, metadata: dict = None) -> List[Document]:
+        documents, paragraph_index = [], 0
+        for chapter, offset, section in split_chapters(text):
+            units = []
+            for start, end in paragraph_spans(section, offset):
+                units.extend(self._units(text, start, end, paragraph_index))
+                paragraph_index += 1
+            for chunk in self._pack(units):
+                start, end = chunk[0][0], chunk[-1][1]
+                documents.append(Document(page_content=text[start:end], metadata=dict(
+                    metadata or {},
+                    chapter=chapter,
+                    paragraph=chunk[0][2],
+                    paragraph_end=chunk[-1][2],
+                    start_index=start,
+                    end_index=end,
+                )))
+        return documents
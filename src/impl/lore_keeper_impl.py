@@ -1,25 +1,126 @@
-from typing import List
+from typing import List, Tuple
+import asyncio
 import time
 import os
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from langchain_community.document_loaders import TextLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain_ollama import OllamaEmbeddings
 from langchain_chroma import Chroma
+from langchain_core.documents import Document
+import numpy as np
 from src.core.lore_keeper import LoreKeeper
+from src.impl.vector_store import NumpyVectorStore
+from src.impl.ivf_index import IVFIndex
+from src.impl.index_snapshot import read_snapshot, write_snapshot
+from src.impl.hashing_embeddings import HashingEmbeddings
+from src.impl.bm25_index import BM25Index
+from src.impl.rank_fusion import reciprocal_rank_fusion
+from src.impl.embedding_cache import QueryEmbeddingCache, CachedEmbeddings
+from src.impl.retrieval_cache import RetrievalResultCache
+from src.impl.retrieval_metrics import RetrievalMetrics
+from src.impl.circuit_breaker import CircuitBreaker
+from src.impl.client_pool import KeyedClientPool
+from src.impl.embedding_batcher import (
+    EmbeddingBatcher, AsyncEmbeddingBatcher, BatchedEmbeddings, query_batch_fn, async_query_batch_fn
+)
+from src.impl.bulk_indexer import BulkIndexer, load_checkpoint, clear_checkpoint
+from src.impl.chapters import split_chapters, scene_chapters, chapter_scopes
+from src.impl.korean_chunker import KoreanStructureChunker
+from src.impl.streaming_loader import iter_text_blocks, iter_chunks, iter_batches
+from src.impl.lore_library import (
+    ChunkCache, book_id_for, discover_books, hash_file, read_book_metadata
+)
+from src.impl.index_manifest import (
+    hash_text, config_fingerprint, chunk_id, load_manifest, save_manifest
+)
 from dotenv import load_dotenv
 
 load_dotenv()
 
+CHUNKERS = ("chapters", "structure")
+
+
 class LoreKeeperImpl(LoreKeeper):
     def __init__(self, model_name: str = None, max_retries: int = 3):
         self.provider = os.getenv("AI_PROVIDER", "google").lower()
         self.model_name = model_name
         self.max_retries = max_retries
         self.documents = []
+        self.books = {}  # book_id -> {"title", "path", "hash", "chunks"}
+        self.library_stats = {}
+        self.lexical_index = None
+        self._book_rows = {}
         self.vector_store = None
         self.embeddings = None
         self.fallback_mode = False
+        # True while build_index() runs (e.g. on a background thread); retrieve() stays lexical meanwhile
+        self._index_building = False
+        self.collection_name = os.getenv("LORE_COLLECTION", "kongjwi_story")
+        self.chunk_size = 1000
+        self.chunk_overlap = 200
+        # Books are split at '## ' sections first; chunks carry a "chapter" tag (0 = no chapter).
+        # "chapters": RecursiveCharacterTextSplitter per section, "structure": KoreanStructureChunker
+        self.chunker = os.getenv("LORE_CHUNKER", "chapters").lower()
+        if self.chunker not in CHUNKERS:
+            print(f"[WARN] Unknown LORE_CHUNKER '{self.chunker}', using 'chapters'")
+            self.chunker = "chapters"
+        self._chapter_rows = {}  # (book or None, chapter) -> rows in self.documents
+        self._chunk_positions = {}  # chunk text -> (book or source, start_index), for context assembly
+        # Chapter-first retrieval widens to neighbouring chapters when the best hit is farther than this
+        self.chapter_max_distance = float(os.getenv("LORE_CHAPTER_MAX_DISTANCE", "1.0"))
+        # Same for BM25 (fallback / lexical search): widen when the best score is below this
+        self.chapter_min_bm25 = float(os.getenv("LORE_CHAPTER_MIN_BM25", "1.0"))
+        self.source_hash = None
+        self.index_stats = {"reused": 0, "embedded": 0, "deleted": 0}
+        # Bulk indexing: batched, rate-limited, resumable embedding of new chunks
+        self.index_batch_size = int(os.getenv("LORE_INDEX_BATCH_SIZE", "64"))
+        self.index_workers = int(os.getenv("LORE_INDEX_WORKERS", "4"))
+        self.index_rpm = float(os.getenv("LORE_EMBED_RPM", "0"))
+        self.bulk_stats = {}
+        # Shared across global and BYOK embedding clients (keyed by query + model, not API key)
+        self.query_cache = QueryEmbeddingCache.from_env()
+        # retrieve() results for the vector path; cleared whenever the index or the chunks change
+        self.result_cache = RetrievalResultCache(int(os.getenv("LORE_RESULT_CACHE_SIZE", "1024")))
+        # Per-stage latency histograms and per-path retrieve() counts (see get_retrieval_metrics)
+        self.metrics = RetrievalMetrics()
+        # Global query-embedding provider: after LORE_BREAKER_FAILURES consecutive failures (or one 429)
+        # retrieve() goes straight to BM25 for LORE_BREAKER_COOLDOWN_SECONDS, then probes with one request
+        self.embedding_breaker = CircuitBreaker(
+            failure_threshold=int(os.getenv("LORE_BREAKER_FAILURES", "3")),
+            cooldown_seconds=float(os.getenv("LORE_BREAKER_COOLDOWN_SECONDS", "30"))
+        )
+        # Vector store backend: "chroma" (default) or "numpy" (in-process matrix, mmap-able)
+        self.vector_backend = os.getenv("LORE_VECTOR_BACKEND", "chroma").lower()
+        self.vector_mmap = os.getenv("LORE_VECTOR_MMAP", "1") != "0"
+        # NumPy backend only: "int8" / "float16" keeps a compressed matrix in RAM and
+        # rescores k * LORE_RESCORE_FACTOR candidates at full precision
+        quantization = os.getenv("LORE_VECTOR_QUANTIZATION", "none").lower()
+        self.vector_quantization = None if quantization in ("", "none", "float32") else quantization
+        self.rescore_factor = int(os.getenv("LORE_RESCORE_FACTOR", "4"))
+        # NumPy backend only: "ivf" scans the LORE_ANN_NPROBE closest of LORE_ANN_LISTS k-means lists
+        # (0 lists = sqrt(chunks)); collections below LORE_ANN_MIN_ROWS are searched exactly
+        ann = os.getenv("LORE_VECTOR_ANN", "none").lower()
+        self.vector_ann = None if ann in ("", "none") else ann
+        self.ann_nprobe = int(os.getenv("LORE_ANN_NPROBE", "16"))
+        self.ann_lists = int(os.getenv("LORE_ANN_LISTS", "0")) or None
+        self.ann_min_rows = int(os.getenv("LORE_ANN_MIN_ROWS", "4096"))
+        # Retrieval mode: "vector" (default) or "hybrid" (BM25 + vector, fused with RRF)
+        self.retrieval_mode = os.getenv("LORE_RETRIEVAL_MODE", "vector").lower()
+        self.vector_deadline = float(os.getenv("LORE_VECTOR_DEADLINE_MS", "1500")) / 1000
+        self._search_executor = None
+        # Cross-session micro-batching of query embeddings (global client only; 0ms window disables)
+        self.batch_window_ms = float(os.getenv("LORE_EMBED_BATCH_WINDOW_MS", "5"))
+        self.batch_max_size = int(os.getenv("LORE_EMBED_BATCH_SIZE", "16"))
+        self.query_batcher = None
+        self.async_query_batcher = None
+        # BYOK: per-key embedding clients / store handles reused across turns
+        self.byok_pool = KeyedClientPool(
+            self._create_user_search_target,
+            max_size=int(os.getenv("LORE_BYOK_POOL_SIZE", "32")),
+            idle_ttl=float(os.getenv("LORE_BYOK_POOL_IDLE_SECONDS", "600"))
+        )
         
         self.api_key = os.getenv("GOOGLE_API_KEY")
         
@@ -27,6 +128,11 @@ class LoreKeeperImpl(LoreKeeper):
         if self.provider == "local":
              self.db_path = "./chroma_db_local"
              self.model_name = self.model_name or "nomic-embed-text"
+        elif self.provider == "offline":
+             # In-process hashing embedder: no network, no model server (CI / benchmarks)
+             self.db_path = "./chroma_db_offline"
+             self.hash_dimension = int(os.getenv("LORE_HASH_DIM", "768"))
+             self.model_name = self.model_name or HashingEmbeddings(self.hash_dimension).model_name
         else:
              self.db_path = "./chroma_db"
              self.model_name = self.model_name or "models/text-embedding-004"
@@ -37,20 +143,42 @@ class LoreKeeperImpl(LoreKeeper):
         """Initialize embeddings with retry logic"""
         if self.embeddings is not None:
             return
-        
+        with self.metrics.span("init_embeddings"):
+            self._create_embeddings()
+
+    def _create_embeddings(self):
         for attempt in range(self.max_retries):
             try:
                 if self.provider == "local":
                     print(f"[INFO] Initializing Local Embeddings ({self.model_name})...")
-                    self.embeddings = OllamaEmbeddings(
+                    embeddings = OllamaEmbeddings(
                         model=self.model_name
                     )
+                elif self.provider == "offline":
+                    print(f"[INFO] Initializing Offline Hashing Embeddings ({self.model_name})...")
+                    embeddings = HashingEmbeddings(self.hash_dimension)
                 else:
                     print(f"[INFO] Initializing Google Embeddings ({self.model_name})...")
-                    self.embeddings = GoogleGenerativeAIEmbeddings(
+                    embeddings = GoogleGenerativeAIEmbeddings(
                         model=self.model_name,
                         google_api_key=self.api_key
                     )
+                # Batching only pays off for remote / model-server embedders
+                if self.batch_window_ms > 0 and self.provider != "offline":
+                    task_type = None if self.provider == "local" else "RETRIEVAL_QUERY"
+                    self.query_batcher = EmbeddingBatcher(
+                        query_batch_fn(embeddings, task_type),
+                        max_batch_size=self.batch_max_size,
+                        max_wait_ms=self.batch_window_ms
+                    )
+                    # aretrieve (the web server) batches on the event loop via aembed_documents
+                    self.async_query_batcher = AsyncEmbeddingBatcher(
+                        async_query_batch_fn(embeddings, task_type),
+                        max_batch_size=self.batch_max_size,
+                        max_wait_ms=self.batch_window_ms
+                    )
+                    embeddings = BatchedEmbeddings(embeddings, self.query_batcher, self.async_query_batcher)
+                self.embeddings = CachedEmbeddings(embeddings, self.query_cache, self.model_name)
                 
                 print(f"[OK] Embeddings initialized successfully.")
                 return
@@ -65,6 +193,69 @@ class LoreKeeperImpl(LoreKeeper):
                     self.fallback_mode = True
                     raise
 
+    @property
+    def vector_ready(self) -> bool:
+        """Whether retrieve() uses the vector index (False: BM25 only, until build_index() completes)."""
+        return self.vector_store is not None and not self.fallback_mode and not self._index_building
+
+    @property
+    def search_mode(self) -> str:
+        """The retrieval mode currently served: "lexical" until the vector index is ready, then retrieval_mode."""
+        return self.retrieval_mode if self.vector_ready else "lexical"
+
+    def get_cache_stats(self) -> dict:
+        """Query-embedding cache counters (hits, misses, estimated time saved)."""
+        return self.query_cache.stats()
+
+    def get_result_cache_stats(self) -> dict:
+        """Retrieval result cache counters (hits, misses, pinned warmup entries)."""
+        return self.result_cache.stats()
+
+    def warmup(self, queries: List[str], top_k: int = 3, book: str = None, chapter=None) -> dict:
+        """
+        Runs retrieve() once for each query and pins the query embedding and the results,
+        so those inputs never wait on the embedding API (e.g. the prologue's fixed choices).
+        Call again after the index changes (building the index clears the result cache).
+        """
+        started = time.perf_counter()
+        warmed = 0
+        for query in dict.fromkeys(q.strip() for q in queries if q and q.strip()):
+            try:
+                self.retrieve(query, top_k, book=book, chapter=chapter)
+            except Exception as e:
+                print(f"[WARN] Warmup failed for '{query}': {e}")
+                continue
+            if self.embeddings is not None:
+                self.query_cache.pin(query, self.model_name)
+            warmed += self.result_cache.pin(self._result_key(query, top_k, book, chapter))
+        stats = {"queries": warmed, "seconds": time.perf_counter() - started}
+        print(f"[OK] Warmed {warmed} retrieval queries in {stats['seconds']:.2f}s")
+        return stats
+
+    def _result_key(self, query: str, top_k: int, book: str = None, chapter=None) -> tuple:
+        return (QueryEmbeddingCache.normalize(query), top_k, book or None, scene_chapters(chapter))
+
+    def get_retrieval_metrics(self) -> dict:
+        """
+        Latency histograms: "paths" per retrieve() outcome (vector, byok, cached, fallback, breaker, error)
+        and "stages" per timed span (init_embeddings, build_index, byok_client, embed_query,
+        similarity_search, fallback_search), plus the embedding circuit breaker's state and transitions.
+        """
+        return dict(self.metrics.snapshot(), breaker=self.embedding_breaker.stats())
+
+    def get_batcher_stats(self) -> dict:
+        """
+        Query-embedding micro-batch metrics (batch sizes, added queueing delay):
+        "sync" for retrieve() callers, "async" for aretrieve() (the web server).
+        """
+        if self.query_batcher is None:
+            return {}
+        return {"sync": self.query_batcher.stats(), "async": self.async_query_batcher.stats()}
+
+    def get_byok_pool_stats(self) -> dict:
+        """BYOK client pool counters (size, hits, evictions, idle expirations)."""
+        return self.byok_pool.stats()
+
     def update_api_key(self, new_api_key: str) -> bool:
         """BYOK: Validate API Key (Stateless Check)"""
         # NOTE: We do NOT update self.api_key or self.embeddings here anymore.
@@ -73,9 +264,9 @@ class LoreKeeperImpl(LoreKeeper):
         try:
             print(f"[INFO] LoreKeeper: Verifying User API Key...")
             
-            # Temporary test instance
+            # Temporary test instance (offline model names are not Gemini models)
             test_embeddings = GoogleGenerativeAIEmbeddings(
-                model=self.model_name or "models/text-embedding-004",
+                model="models/text-embedding-004" if self.provider == "offline" else (self.model_name or "models/text-embedding-004"),
                 google_api_key=new_api_key
             )
             
@@ -102,116 +293,857 @@ class LoreKeeperImpl(LoreKeeper):
             raise FileNotFoundError(f"Story file not found: {file_path}")
         except Exception as e:
             raise Exception(f"Error reading file: {e}")
-            
+
+        metadata = read_book_metadata(file_path)
+        self.documents = self._split_text(text, metadata)
+        self.source_hash = hash_text(text)
+        self.books = {metadata["book"]: {
+            "title": metadata["title"], "path": file_path,
+            "hash": self.source_hash, "chunks": len(self.documents)
+        }}
+        self._build_lexical_index()
+        print(f"Loaded {len(self.documents)} chunks from {file_path}")
+
+    def load_library(self, directory: str) -> None:
+        """
+        Loads every book (*.txt, *.md) in a directory.
+        Books whose file hash is unchanged since the last run are restored from the
+        chunk cache instead of being re-read and re-chunked; chunks of deleted books
+        are dropped here and purged from the vector store by build_index().
+        """
+        if not directory or not os.path.isdir(directory):
+            raise FileNotFoundError(f"Library directory not found: {directory}")
+
+        chunk_cache = ChunkCache(os.path.join(self._index_dir(), "chunk_cache"))
+        chunk_params = {"chunk_size": self.chunk_size, "chunk_overlap": self.chunk_overlap, "chunker": self.chunker}
+        known_books = set(((load_manifest(self._index_dir()) or {}).get("files") or {}).keys())
+        known_books |= set(chunk_cache.cached_books())
+
+        documents = []
+        books = {}
+        stats = {"added": [], "modified": [], "unchanged": [], "deleted": []}
+        for path in discover_books(directory):
+            book_id = book_id_for(path)
+            file_hash = hash_file(path)
+            docs = chunk_cache.load(book_id, file_hash, chunk_params)
+            if docs is not None:
+                stats["unchanged"].append(book_id)
+            else:
+                with open(path, 'r', encoding='utf-8') as f:
+                    text = f.read()
+                docs = self._split_text(text, read_book_metadata(path))
+                chunk_cache.save(book_id, file_hash, chunk_params, docs)
+                stats["modified" if book_id in known_books else "added"].append(book_id)
+
+            title = docs[0].metadata.get("title", book_id) if docs else book_id
+            books[book_id] = {"title": title, "path": path, "hash": file_hash, "chunks": len(docs)}
+            documents.extend(docs)
+
+        for book_id in sorted(known_books - set(books)):
+            chunk_cache.remove(book_id)
+            stats["deleted"].append(book_id)
+
+        self.documents = documents
+        self.books = books
+        self.library_stats = stats
+        self.source_hash = hash_text("".join(f"{b}:{info['hash']};" for b, info in sorted(books.items())))
+        self._build_lexical_index()
+        print(f"Loaded {len(documents)} chunks from {len(books)} books in {directory} "
+              f"(added {len(stats['added'])}, modified {len(stats['modified'])}, "
+              f"unchanged {len(stats['unchanged'])}, deleted {len(stats['deleted'])})")
+
+    def ingest_book_streaming(self, file_path: str, batch_size: int = 64, block_chars: int = 1 << 20) -> dict:
+        """
+        Streams a (very large) book straight into a Chroma collection of its own.
+        The file is read block by block, chunked incrementally and embedded in batches,
+        so peak text memory is ~one block plus one batch of chunks regardless of file size.
+        Only chunk ids are kept across batches (to skip already-embedded chunks and purge
+        stale ones).
+
+        Streamed chunks are not the library's chunks: they are cut by the streaming splitter
+        (no '## 제N장' chapter tags) and never loaded into self.documents, so there is no BM25
+        index for them and chapter scoping does not apply. They therefore live in
+        "<collection>_stream" with their own config fingerprint and manifest, which build_index()
+        never touches; retrieval serves that collection until build_index() / load_snapshot()
+        switches back to the library.
+        Chroma only: the NumPy backend keeps every vector in memory.
+        Returns {"reused", "embedded", "deleted", "chunks"}.
+        """
+        if not file_path:
+            raise ValueError("File path cannot be empty")
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Story file not found: {file_path}")
+        if self.vector_backend != "chroma":
+            raise ValueError("Streaming ingest needs LORE_VECTOR_BACKEND=chroma "
+                             "(the NumPy store holds the whole corpus in memory)")
+
+        self._initialize_embeddings()
+        config_fp = self._stream_config_fingerprint()
+        metadata = read_book_metadata(file_path)
+        book_id = metadata["book"]
+
+        manifest_dir = self._stream_index_dir()
+        manifest = load_manifest(manifest_dir) or {}
+        store = self._open_stream_store()
+        if manifest.get("config") not in (None, config_fp):
+            # Model/chunking changed: stored vectors are incompatible
+            store.delete_collection()
+            store = self._open_stream_store()
+            manifest = {}
+        existing_ids = set(store.get(where={"book": book_id}, include=[])["ids"])
+
+        seen_ids = set()
+        stats = {"reused": 0, "embedded": 0, "deleted": 0, "chunks": 0}
+        chunks = iter_chunks(iter_text_blocks(file_path, block_chars), self.chunk_size, self.chunk_overlap, metadata)
+        for batch in iter_batches(chunks, batch_size):
+            new_ids, new_docs = [], []
+            for doc in batch:
+                doc_id = chunk_id(doc.page_content, config_fp, book_id)
+                stats["chunks"] += 1
+                if doc_id in seen_ids:
+                    continue
+                seen_ids.add(doc_id)
+                if doc_id in existing_ids:
+                    stats["reused"] += 1
+                else:
+                    new_ids.append(doc_id)
+                    new_docs.append(doc)
+            if new_docs:
+                store.add_documents(new_docs, ids=new_ids)
+                stats["embedded"] += len(new_docs)
+
+        stale_ids = list(existing_ids - seen_ids)
+        if stale_ids:
+            store.delete(ids=stale_ids)
+        stats["deleted"] = len(stale_ids)
+
+        self.vector_store = store
+        self.fallback_mode = False
+        self.result_cache.clear()
+        self.books[book_id] = {"title": metadata["title"], "path": file_path,
+                               "hash": hash_file(file_path), "chunks": stats["chunks"], "streamed": True}
+        files = dict(manifest.get("files") or {})
+        files[book_id] = {"hash": self.books[book_id]["hash"], "chunks": stats["chunks"]}
+        save_manifest(manifest_dir, dict(
+            manifest, config=config_fp, model=self.model_name, chunk_size=self.chunk_size,
+            chunk_overlap=self.chunk_overlap, collection=self._stream_collection_name(), files=files
+        ))
+        self.index_stats = {k: stats[k] for k in ("reused", "embedded", "deleted")}
+        print(f"Streamed {stats['chunks']} chunks from {file_path} "
+              f"(reused {stats['reused']}, embedded {stats['embedded']}, deleted {stats['deleted']})")
+        return stats
+
+    def _stream_collection_name(self) -> str:
+        return f"{self.collection_name}_stream"
+
+    def _stream_config_fingerprint(self) -> str:
+        # "stream": the streaming splitter cuts differently from _split_text (see ingest_book_streaming)
+        return config_fingerprint(
+            self.model_name, self.chunk_size, self.chunk_overlap, self._stream_collection_name(), "stream"
+        )
+
+    def _stream_index_dir(self) -> str:
+        """Manifest directory of the streamed collection (build_index() owns the one in db_path)."""
+        return os.path.join(self.db_path, "stream_index")
+
+    def _open_stream_store(self):
+        return Chroma(
+            persist_directory=self.db_path,
+            embedding_function=self.embeddings,
+            collection_name=self._stream_collection_name()
+        )
+
+    def _split_text(self, text: str, metadata: dict) -> list:
+        """
+        Chunks each '## ' section separately so no chunk straddles two chapters.
+        Every chunk gets metadata["chapter"] and its character offset in the book (start_index).
+        """
+        if self.chunker == "structure":
+            return KoreanStructureChunker(self.chunk_size, self.chunk_overlap).split_text(text, metadata)
         text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
+            chunk_size=self.chunk_size,
+            chunk_overlap=self.chunk_overlap,
             length_function=len,
+            add_start_index=True,
         )
-        self.documents = text_splitter.create_documents([text])
-        print(f"Loaded {len(self.documents)} chunks from {file_path}")
+        documents = []
+        for chapter, offset, section in split_chapters(text):
+            for doc in text_splitter.create_documents([section], metadatas=[dict(metadata, chapter=chapter)]):
+                doc.metadata["start_index"] = doc.metadata.get("start_index", 0) + offset
+                documents.append(doc)
+        return documents
+
+    def _build_lexical_index(self) -> None:
+        self.result_cache.clear()
+        self.lexical_index = BM25Index().build([doc.page_content for doc in self.documents])
+        self._book_rows = {}
+        self._chapter_rows = {}
+        self._chunk_positions = {}
+        for row, doc in enumerate(self.documents):
+            metadata = getattr(doc, "metadata", None) or {}
+            book = metadata.get("book")
+            if metadata.get("start_index") is not None:
+                source = book or metadata.get("source") or ""
+                self._chunk_positions.setdefault(doc.page_content, (source, metadata["start_index"]))
+            if book:
+                self._book_rows.setdefault(book, set()).add(row)
+            chapter = metadata.get("chapter")
+            if chapter:
+                self._chapter_rows.setdefault((None, chapter), set()).add(row)
+                if book:
+                    self._chapter_rows.setdefault((book, chapter), set()).add(row)
+
+    def _ensure_lexical_index(self) -> None:
+        # documents may have been replaced after load_book (e.g. set directly)
+        if self.lexical_index is None or len(self.lexical_index) != len(self.documents):
+            self._build_lexical_index()
+
+    def locate_chunk(self, text: str):
+        """(book or source, start offset) of a retrieved chunk, or None if it is not a loaded chunk."""
+        if not self.documents:
+            return None
+        self._ensure_lexical_index()
+        return self._chunk_positions.get(text)
+
+    def _chapter_scopes(self, chapter, book: str = None) -> List[List[int]]:
+        """Chapter windows to try for this scene (empty = search the whole book)."""
+        chapters = scene_chapters(chapter)
+        if not chapters or not self.documents:
+            return []
+        self._ensure_lexical_index()
+        return chapter_scopes(chapters, [c for b, c in self._chapter_rows if b == (book or None)])
 
     def build_index(self) -> None:
         """
         Builds the ChromaDB index with error handling.
+        Reuses the persisted collection when the source text, chunking parameters
+        and embedding model are unchanged, and embeds only new or changed chunks.
+        New chunks go through BulkIndexer; an interrupted build leaves a checkpoint
+        and the next call resumes from the chunks already stored.
         """
         if not self.documents:
             print("No documents to index. Call load_book() first.")
             return
 
+        self.result_cache.clear()
+        self._index_building = True
+        started = time.perf_counter()
         try:
             # Initialize embeddings if not already done
             self._initialize_embeddings()
-            
-            # Persist directory could be made configurable
-            self.vector_store = Chroma.from_documents(
-                documents=self.documents,
-                embedding=self.embeddings,
-                collection_name="kongjwi_story",
-                persist_directory=self.db_path
-            )
-            print("Index built successfully.")
+
+            config_fp = self._config_fingerprint()
+            # Content-addressed ids (duplicate chunks collapse into one entry)
+            docs_by_id = {}
+            for doc in self.documents:
+                namespace = (doc.metadata or {}).get("book", "")
+                docs_by_id.setdefault(chunk_id(doc.page_content, config_fp, namespace), doc)
+            ids = list(docs_by_id.keys())
+            fingerprint = hash_text(config_fp + "".join(ids))
+
+            manifest = load_manifest(self._index_dir())
+            checkpoint = load_checkpoint(self._index_dir())
+            if manifest and manifest.get("config") == config_fp:
+                self.vector_store = self._sync_collection(docs_by_id, manifest, fingerprint, config_fp)
+            elif checkpoint and checkpoint.get("config") == config_fp:
+                print(f"[INFO] Resuming interrupted index build "
+                      f"({checkpoint.get('completed', 0)}/{checkpoint.get('total', '?')} chunks embedded).")
+                self.vector_store = self._sync_collection(docs_by_id, {}, fingerprint, config_fp)
+            else:
+                self.vector_store = self._rebuild_collection(docs_by_id, config_fp)
+
+            save_manifest(self._index_dir(), {
+                "config": config_fp,
+                "fingerprint": fingerprint,
+                "source": self.source_hash,
+                "model": self.model_name,
+                "chunk_size": self.chunk_size,
+                "chunk_overlap": self.chunk_overlap,
+                "collection": self.collection_name,
+                "chunk_count": len(ids),
+                "files": {b: {"hash": info["hash"], "chunks": info["chunks"]} for b, info in self.books.items()},
+            })
+            clear_checkpoint(self._index_dir())
+            print(f"Index built successfully. (reused {self.index_stats['reused']} chunks, "
+                  f"embedded {self.index_stats['embedded']} chunks)")
         except Exception as e:
             print(f"[ERR] Failed to build index: {e}")
             print("[WARN] Entering fallback mode (in-memory search only)")
             self.fallback_mode = True
+        finally:
+            self._index_building = False
+            self.metrics.observe("build_index", time.perf_counter() - started)
+
+    def _config_fingerprint(self) -> str:
+        return config_fingerprint(
+            self.model_name, self.chunk_size, self.chunk_overlap, self.collection_name, self.chunker
+        )
+
+    def save_snapshot(self, path: str) -> dict:
+        """
+        Writes the built index (chunks, metadata, embedding matrix, book list) into one
+        snapshot file that load_snapshot() can serve from. Meant for deploy-time builds.
+        """
+        if self.vector_store is None or self.fallback_mode:
+            raise ValueError("No vector index to snapshot. Call build_index() first.")
+        ivf = None
+        if isinstance(self.vector_store, NumpyVectorStore):
+            store = self.vector_store
+            ids, texts, metadatas, matrix, ivf = store.ids, store.texts, store.metadatas, store.matrix, store._ivf
+        else:
+            data = self.vector_store._collection.get(include=["documents", "metadatas", "embeddings"])
+            ids, texts = data["ids"], data["documents"]
+            metadatas = [dict(meta or {}) for meta in data["metadatas"]]
+            matrix = np.asarray(data["embeddings"], dtype=np.float32)
+        manifest = write_snapshot(path, {
+            "config": self._config_fingerprint(),
+            "provider": self.provider,
+            "model": self.model_name,
+            "chunker": self.chunker,
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+            "source": self.source_hash,
+            "books": {b: {"title": info.get("title"), "hash": info.get("hash"), "chunks": info.get("chunks")}
+                      for b, info in self.books.items()},
+        }, ids, texts, metadatas, matrix, ivf)
+        print(f"[OK] Wrote index snapshot {path} ({len(ids)} chunks, {os.path.getsize(path) / 1e6:.1f} MB)")
+        return manifest
+
+    def load_snapshot(self, path: str) -> bool:
+        """
+        Serves retrieval from a snapshot file instead of build_index(): the matrix is
+        memory-mapped (LORE_VECTOR_MMAP) and nothing is embedded or chunked.
+        Returns False (and changes nothing) if the file is missing, unreadable or was
+        built with a different embedding model / chunking config.
+        """
+        started = time.perf_counter()
+        try:
+            snapshot = read_snapshot(path, mmap=self.vector_mmap)
+        except Exception as e:
+            print(f"[WARN] Could not load index snapshot {path}: {e}")
+            return False
+        manifest = snapshot["manifest"]
+        if manifest.get("config") != self._config_fingerprint():
+            print(f"[WARN] Index snapshot {path} was built for model '{manifest.get('model')}' / "
+                  f"chunker '{manifest.get('chunker')}' - ignoring it")
+            return False
+        try:
+            self._initialize_embeddings()  # query embeddings only
+        except Exception as e:
+            print(f"[WARN] Index snapshot not loaded, embeddings unavailable: {e}")
+            return False
+
+        ivf = IVFIndex(*snapshot["ivf"]) if snapshot["ivf"] is not None else None
+        self.vector_store = NumpyVectorStore.from_arrays(
+            snapshot["ids"], snapshot["texts"], snapshot["metadatas"], snapshot["matrix"],
+            embedding_function=self.embeddings, sq_norms=snapshot["sq_norms"], ivf=ivf, **self._numpy_options()
+        )
+        # The snapshot is always served by the in-process matrix (BYOK views rely on this)
+        self.vector_backend = "numpy"
+        self.fallback_mode = False
+        self.documents = [Document(page_content=text, metadata=dict(meta or {}))
+                          for text, meta in zip(snapshot["texts"], snapshot["metadatas"])]
+        self.books = {book: dict(info) for book, info in (manifest.get("books") or {}).items()}
+        self.source_hash = manifest.get("source")
+        self.index_stats = {"reused": len(snapshot["ids"]), "embedded": 0, "deleted": 0}
+        self._build_lexical_index()
+        print(f"[OK] Loaded index snapshot {path} ({len(snapshot['ids'])} chunks, built "
+              f"{manifest.get('created_at')}) in {(time.perf_counter() - started) * 1000:.0f}ms")
+        return True
+
+    def _index_dir(self) -> str:
+        """Directory holding the persisted vectors and manifest for the active backend."""
+        if self.vector_backend == "numpy":
+            return os.path.join(self.db_path, "numpy_index")
+        return self.db_path
+
+    def _numpy_options(self) -> dict:
+        """Quantization / ANN settings for NumpyVectorStore."""
+        return {
+            "quantization": self.vector_quantization,
+            "rescore_factor": self.rescore_factor,
+            "ann": self.vector_ann,
+            "nprobe": self.ann_nprobe,
+            "ann_lists": self.ann_lists,
+            "ann_min_rows": self.ann_min_rows,
+        }
+
+    def _open_store(self, embedding_function):
+        """Opens the persisted store of the active backend (empty if nothing is stored yet)."""
+        if self.vector_backend == "numpy":
+            return NumpyVectorStore.load(self._index_dir(), embedding_function, mmap=self.vector_mmap,
+                                         **self._numpy_options())
+        return Chroma(
+            persist_directory=self.db_path,
+            embedding_function=embedding_function,
+            collection_name=self.collection_name
+        )
+
+    def _rebuild_collection(self, docs_by_id: dict, config_fp: str):
+        """Drops any stale collection and embeds every chunk from scratch."""
+        if self.vector_backend == "numpy":
+            store = NumpyVectorStore(embedding_function=self.embeddings, persist_directory=self._index_dir(),
+                                     **self._numpy_options())
+        else:
+            try:
+                self._open_store(self.embeddings).delete_collection()
+            except Exception as e:
+                print(f"[WARN] Could not reset existing collection: {e}")
+            store = self._open_store(self.embeddings)
+
+        self._embed_chunks(store, docs_by_id, list(docs_by_id.keys()), config_fp)
+        self.index_stats = {"reused": 0, "embedded": len(docs_by_id), "deleted": 0}
+        return store
+
+    def _embed_chunks(self, store, docs_by_id: dict, ids: list, config_fp: str) -> None:
+        """Embeds the given chunks in rate-limited, checkpointed batches and writes them to the store."""
+        indexer = BulkIndexer(
+            self.embeddings.embed_documents,
+            lambda batch_ids, docs, vectors: self._write_vectors(store, batch_ids, docs, vectors),
+            batch_size=self.index_batch_size,
+            workers=self.index_workers,
+            requests_per_minute=self.index_rpm,
+            flush_fn=store.persist if self.vector_backend == "numpy" else None,
+            index_dir=self._index_dir(),
+            checkpoint={"config": config_fp, "model": self.model_name},
+        )
+        try:
+            indexer.run(ids, [docs_by_id[i] for i in ids])
+        finally:
+            self.bulk_stats = indexer.stats
+
+    def _write_vectors(self, store, ids: list, docs: list, vectors) -> None:
+        """Stores pre-computed embeddings (upsert) in the active backend."""
+        texts = [doc.page_content for doc in docs]
+        if self.vector_backend == "numpy":
+            store.add_embeddings(ids, texts, vectors, [dict(doc.metadata or {}) for doc in docs])
+        else:
+            # Chroma rejects empty metadata dicts
+            store._collection.upsert(
+                ids=ids, embeddings=[list(map(float, v)) for v in vectors], documents=texts,
+                metadatas=[dict(doc.metadata) if doc.metadata else None for doc in docs]
+            )
+
+    def _sync_collection(self, docs_by_id: dict, manifest: dict, fingerprint: str, config_fp: str):
+        """Reuses the persisted collection, embedding only missing chunks and purging stale ones."""
+        store = self._open_store(self.embeddings)
+        existing_ids = set(store.get(include=[])["ids"])
+        missing_ids = [i for i in docs_by_id if i not in existing_ids]
+        stale_ids = list(existing_ids - set(docs_by_id))
+
+        if manifest.get("fingerprint") == fingerprint and not missing_ids and not stale_ids:
+            print("[INFO] Index fingerprint unchanged. Reusing persisted collection.")
+
+        if missing_ids:
+            self._embed_chunks(store, docs_by_id, missing_ids, config_fp)
+        if stale_ids:
+            store.delete(ids=stale_ids)
+            if self.vector_backend == "numpy":
+                store.persist()
 
-    def retrieve(self, query: str, top_k: int = 3, api_key: str = None) -> List[str]:
+        self.index_stats = {
+            "reused": len(docs_by_id) - len(missing_ids),
+            "embedded": len(missing_ids),
+            "deleted": len(stale_ids),
+        }
+        return store
+
+    def retrieve(self, query: str, top_k: int = 3, api_key: str = None, book: str = None,
+                 chapter=None) -> List[str]:
         """
         Retrieves relevant contexts.
+        BM25 keyword search answers until the vector index is ready (see vector_ready).
         Args:
             query: The search query
             top_k: Number of results to return
             api_key: Optional user-provided API key for this specific request. 
                      If provided, creates an isolated search context.
+            book: Optional book id (file name without extension) to search only that tale.
+            chapter: Optional current scene id (like 'chapter_2_road', see SCENE_CHAPTERS) or chapter number.
+                     The scene's chapters are searched first, then their neighbours, then the whole book.
         """
-        
-        # 0. Handle Fallback (No DB at all)
-        if self.fallback_mode:
-            print("[WARN] Using fallback search (no vector DB)")
-            return self._fallback_search(query, top_k)
-        
-        target_store = self.vector_store
+        started = time.perf_counter()
+        results, path = self._retrieve(query, top_k, api_key, book, chapter)
+        self.metrics.record_path(path, time.perf_counter() - started)
+        return results
+
+    def _retrieve(self, query: str, top_k: int, api_key: str, book: str, chapter) -> Tuple[List[str], str]:
+        """retrieve() body: (results, path), path being one of vector / byok / cached / fallback / breaker / error."""
+        scopes = self._chapter_scopes(chapter, book)
+        path = self._search_path(api_key)
 
+        # 0. Handle Fallback (No DB at all, or the index is still being built)
+        if not self.vector_ready:
+            if self.fallback_mode:
+                print("[WARN] Using fallback search (no vector DB)")
+            return self._fallback_search(query, top_k, book, scopes), "fallback"
+        
         # 1. Handle User API Key (Isolation Logic)
-        if api_key:
-            # If user provided a key, we must NOT use the global vector_store (which uses global key)
-            # We create a lightweight temporary Chroma client pointing to the SAME data,
-            # but using the user's key for the embedding function.
-            try:
-                user_embeddings = GoogleGenerativeAIEmbeddings(
-                    model=self.model_name or "models/text-embedding-004",
-                    google_api_key=api_key
-                )
-                
-                target_store = Chroma(
-                    persist_directory=self.db_path,
-                    embedding_function=user_embeddings,
-                    collection_name="kongjwi_story"
-                )
-            except Exception as e:
-                print(f"[ERR] Failed to create user-specific vector store: {e}")
-                # If key was bad, it would fail here. Failsafe to fallback search.
-                return self._fallback_search(query, top_k)
+        try:
+            target_store, embeddings = self._resolve_search_target(api_key)
+        except Exception as e:
+            print(f"[ERR] Failed to create user-specific vector store: {e}")
+            # If key was bad, it would fail here. Failsafe to fallback search.
+            return self._fallback_search(query, top_k, book, scopes), "error"
 
         # 2. Perform Search
         if not target_store:
-             return self._fallback_search(query, top_k)
+             return self._fallback_search(query, top_k, book, scopes), "fallback"
+
+        # BYOK keys have their own quota, so only the global client feeds the breaker
+        breaker = self.embedding_breaker if path == "vector" else None
+
+        # Results depend on the index only, so every API key shares them
+        key = self._result_key(query, top_k, book, chapter)
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            return cached, "cached"
+
+        # Provider known to be failing: skip the doomed embedding call (and its timeout).
+        # Query-cache hits never reach the provider, so they are served (and not reported) either way.
+        query_vector = self._cached_query_vector(embeddings, query)
+        if query_vector is None and breaker and not breaker.allow_request():
+            return self._fallback_search(query, top_k, book, scopes), "breaker"
+
+        if self.retrieval_mode == "hybrid":
+            results, fused = self._hybrid_search(target_store, embeddings, query, top_k, book, scopes,
+                                                 breaker, query_vector)
+            # A lexical-only answer (vector deadline missed) is not cached over the fused one
+            if fused:
+                self.result_cache.put(key, results)
+            return results, path
 
         try:
-            results = target_store.similarity_search(query, k=top_k)
-            return [doc.page_content for doc in results]
+            if embeddings is not None:
+                if query_vector is None:
+                    query_vector = self._embed_query(embeddings, query, breaker)
+                results = self._vector_search(target_store, query_vector, top_k, book, scopes)
+            else:
+                with self.metrics.span("similarity_search"):
+                    results = [doc.page_content for doc in
+                               target_store.similarity_search(query, k=top_k, **self._search_filter(book))]
+            self.result_cache.put(key, results)
+            return results, path
         except Exception as e:
             print(f"[WARN] Vector search failed: {e}, using fallback")
-            return self._fallback_search(query, top_k)
+            return self._fallback_search(query, top_k, book, scopes), "error"
     
-    def _fallback_search(self, query: str, top_k: int = 3) -> List[str]:
+    async def aretrieve(self, query: str, top_k: int = 3, api_key: str = None, book: str = None,
+                        chapter=None) -> List[str]:
+        """
+        Async retrieve(): the query is embedded with the client's native async API,
+        so concurrent sessions wait on coroutines instead of holding worker threads.
+        The similarity search itself is in-process (NumPy matrix / local Chroma) and runs inline.
+        """
+        started = time.perf_counter()
+        results, path = await self._aretrieve(query, top_k, api_key, book, chapter)
+        self.metrics.record_path(path, time.perf_counter() - started)
+        return results
+
+    async def _aretrieve(self, query: str, top_k: int, api_key: str, book: str, chapter) -> Tuple[List[str], str]:
+        scopes = self._chapter_scopes(chapter, book)
+        path = self._search_path(api_key)
+
+        if not self.vector_ready:
+            if self.fallback_mode:
+                print("[WARN] Using fallback search (no vector DB)")
+            return self._fallback_search(query, top_k, book, scopes), "fallback"
+
+        try:
+            target_store, embeddings = self._resolve_search_target(api_key)
+        except Exception as e:
+            print(f"[ERR] Failed to create user-specific vector store: {e}")
+            return self._fallback_search(query, top_k, book, scopes), "error"
+
+        if not target_store or embeddings is None:
+            return self._fallback_search(query, top_k, book, scopes), "fallback"
+
+        breaker = self.embedding_breaker if path == "vector" else None
+        key = self._result_key(query, top_k, book, chapter)
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            return cached, "cached"
+
+        query_vector = await self._acached_query_vector(embeddings, query)
+        if query_vector is None and breaker and not breaker.allow_request():
+            return self._fallback_search(query, top_k, book, scopes), "breaker"
+
+        if self.retrieval_mode == "hybrid":
+            results, fused = await self._ahybrid_search(target_store, embeddings, query, top_k, book, scopes,
+                                                        breaker, query_vector)
+            if fused:
+                self.result_cache.put(key, results)
+            return results, path
+
+        try:
+            if query_vector is None:
+                query_vector = await self._aembed_query(embeddings, query, breaker)
+            results = self._vector_search(target_store, query_vector, top_k, book, scopes)
+            self.result_cache.put(key, results)
+            return results, path
+        except Exception as e:
+            print(f"[WARN] Vector search failed: {e}, using fallback")
+            return self._fallback_search(query, top_k, book, scopes), "error"
+
+    @staticmethod
+    def _cached_query_vector(embeddings, query: str):
+        """The query's vector from the embedding cache, or None. Never calls the provider."""
+        return embeddings.lookup(query) if isinstance(embeddings, CachedEmbeddings) else None
+
+    @staticmethod
+    async def _acached_query_vector(embeddings, query: str):
+        return await embeddings.alookup(query) if isinstance(embeddings, CachedEmbeddings) else None
+
+    def _embed_query(self, embeddings, query: str, breaker: CircuitBreaker = None):
+        """
+        Timed provider call for a query that missed the embedding cache; the outcome is
+        reported to the breaker (if any). Cache hits must not reach here: they say nothing
+        about the provider, and a half-open probe answered from cache would close the breaker.
+        """
+        embed = embeddings.embed_uncached if isinstance(embeddings, CachedEmbeddings) else embeddings.embed_query
+        with self.metrics.span("embed_query"):
+            try:
+                vector = embed(query)
+            except Exception as e:
+                if breaker:
+                    breaker.record_failure(e)
+                raise
+        if breaker:
+            breaker.record_success()
+        return vector
+
+    async def _aembed_query(self, embeddings, query: str, breaker: CircuitBreaker = None):
+        embed = embeddings.aembed_uncached if isinstance(embeddings, CachedEmbeddings) else embeddings.aembed_query
+        with self.metrics.span("embed_query"):
+            try:
+                vector = await embed(query)
+            except Exception as e:
+                if breaker:
+                    breaker.record_failure(e)
+                raise
+        if breaker:
+            breaker.record_success()
+        return vector
+
+    def _search_path(self, api_key: str = None) -> str:
+        # Offline vectors ignore the user key (see _resolve_search_target)
+        return "byok" if api_key and self.provider != "offline" else "vector"
+
+    def _vector_search(self, target_store, query_vector, top_k: int, book: str,
+                       scopes: List[List[int]], min_hits: int = None) -> List[str]:
+        with self.metrics.span("similarity_search"):
+            if scopes:
+                return self._scoped_vector_search(target_store, query_vector, top_k, book, scopes, min_hits)
+            return [doc.page_content for doc in target_store.similarity_search_by_vector(
+                query_vector, k=top_k, **self._search_filter(book))]
+
+    def _scoped_vector_search(self, target_store, query_vector, top_k: int, book: str,
+                              scopes: List[List[int]], min_hits: int = None) -> List[str]:
         """
-        Simple keyword-based search as fallback when vector DB is unavailable.
+        Searches each chapter window in turn and stops at the first one with a strong match
+        (min_hits hits, default top_k, best distance <= chapter_max_distance); otherwise the whole book.
+        The query is embedded once for all attempts.
         """
+        min_hits = min_hits or top_k
+        for chapters in scopes:
+            scored = target_store.similarity_search_by_vector_with_relevance_scores(
+                query_vector, k=top_k, **self._search_filter(book, chapters)
+            )
+            if len(scored) >= min_hits and min(distance for _, distance in scored) <= self.chapter_max_distance:
+                return [doc.page_content for doc, _ in scored]
+        results = target_store.similarity_search_by_vector(query_vector, k=top_k, **self._search_filter(book))
+        return [doc.page_content for doc in results]
+
+    @staticmethod
+    def _search_filter(book: str = None, chapters: List[int] = None) -> dict:
+        """
+        Vector store kwargs restricting a search to one book and/or some chapters
+        (empty = whole library). Uses Chroma `where` syntax, which NumpyVectorStore also understands.
+        """
+        conditions = []
+        if book:
+            conditions.append({"book": book})
+        if chapters:
+            conditions.append({"chapter": chapters[0]} if len(chapters) == 1 else {"chapter": {"$in": list(chapters)}})
+        if not conditions:
+            return {}
+        return {"filter": conditions[0] if len(conditions) == 1 else {"$and": conditions}}
+
+    def _resolve_search_target(self, api_key: str = None):
+        """
+        Returns (vector_store, embeddings) for this request.
+        If the user provided a key, we must NOT use the global vector_store (which uses global key).
+        Each key gets its own pooled client pointing at the SAME data, using the user's key
+        for query embeddings.
+        """
+        if not api_key or self.provider == "offline":
+            # Offline vectors are not Gemini vectors: the user key is only used for generation
+            return self.vector_store, self.embeddings
+
+        with self.metrics.span("byok_client"):
+            target = self.byok_pool.get(api_key)
+        if self.vector_backend == "numpy":
+            # Same in-memory matrix, only the query embedding client differs.
+            # The view is rebuilt per call so it always sees the current index.
+            if self.vector_store is None:
+                return None, target["embeddings"]
+            return self.vector_store.with_embedding(target["embeddings"]), target["embeddings"]
+        return target["store"], target["embeddings"]
+
+    def _create_user_search_target(self, api_key: str) -> dict:
+        """Pool factory: an isolated embedding client (and Chroma handle) for one user key."""
+        user_embeddings = CachedEmbeddings(
+            GoogleGenerativeAIEmbeddings(
+                model=self.model_name or "models/text-embedding-004",
+                google_api_key=api_key
+            ),
+            self.query_cache,
+            self.model_name or "models/text-embedding-004"
+        )
+        store = None if self.vector_backend == "numpy" else self._open_store(user_embeddings)
+        return {"embeddings": user_embeddings, "store": store}
+
+    def _hybrid_search(self, target_store, embeddings, query: str, top_k: int, book: str = None,
+                       scopes: List[List[int]] = None, breaker: CircuitBreaker = None,
+                       query_vector=None) -> Tuple[List[str], bool]:
+        """
+        Runs vector search on a worker thread while BM25 runs on the caller thread,
+        then fuses both rankings with RRF. Both sides search the chapter scopes first.
+        If the vector side misses the deadline (slow embedding API), the lexical result
+        is returned alone. Returns (results, fused): only fused results may be cached.
+        Deadline misses and errors count as breaker failures, unless the query vector
+        came from the embedding cache (query_vector): then the provider is not involved.
+        """
+        if self._search_executor is None:
+            workers = int(os.getenv("LORE_RETRIEVAL_WORKERS", "8"))
+            self._search_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="lore-vector")
+
+        started = time.perf_counter()
+        candidates = top_k * 2
+        if query_vector is not None:
+            breaker = None
+        vector_future = self._search_executor.submit(
+            self._hybrid_vector_search, target_store, embeddings, query, query_vector, top_k, book, scopes
+        )
+        lexical = self._scoped_lexical_search(query, candidates, book, scopes, min_hits=top_k)
+
+        try:
+            remaining = max(0.0, self.vector_deadline - (time.perf_counter() - started))
+            vector = vector_future.result(timeout=remaining)
+        except FutureTimeoutError as e:
+            print(f"[WARN] Vector search missed {self.vector_deadline * 1000:.0f}ms deadline, using lexical results")
+            if breaker:
+                breaker.record_failure(e)
+            return lexical[:top_k] or self._fallback_search(query, top_k, book, scopes), False
+        except Exception as e:
+            print(f"[WARN] Vector search failed: {e}, using lexical results")
+            if breaker:
+                breaker.record_failure(e)
+            return lexical[:top_k] or self._fallback_search(query, top_k, book, scopes), False
+
+        if breaker:
+            breaker.record_success()
+        return reciprocal_rank_fusion([vector, lexical], top_k=top_k), True
+
+    def _hybrid_vector_search(self, target_store, embeddings, query: str, query_vector, top_k: int,
+                              book: str, scopes: List[List[int]]) -> List[str]:
+        """Vector side of _hybrid_search (worker thread); the caller reports the outcome to the breaker."""
+        candidates = top_k * 2
+        if query_vector is None:
+            if embeddings is None:
+                return [doc.page_content for doc in
+                        target_store.similarity_search(query, k=candidates, **self._search_filter(book))]
+            query_vector = self._embed_query(embeddings, query)
+        return self._vector_search(target_store, query_vector, candidates, book, scopes, min_hits=top_k)
+
+    async def _ahybrid_search(self, target_store, embeddings, query: str, top_k: int, book: str = None,
+                              scopes: List[List[int]] = None, breaker: CircuitBreaker = None,
+                              query_vector=None) -> Tuple[List[str], bool]:
+        """Async twin of _hybrid_search: a slow embedding call is cancelled at the deadline."""
+        started = time.perf_counter()
+        candidates = top_k * 2
+        if query_vector is not None:
+            # Answered from the embedding cache: no provider call, nothing to report to the breaker
+            breaker = None
+            embed_task = asyncio.ensure_future(asyncio.sleep(0, result=query_vector))
+        elif isinstance(embeddings, CachedEmbeddings):
+            embed_task = asyncio.ensure_future(embeddings.aembed_uncached(query))
+        else:
+            embed_task = asyncio.ensure_future(embeddings.aembed_query(query))
+        # Let the embedding request go out before the (CPU-bound) BM25 pass
+        await asyncio.sleep(0)
+        lexical = self._scoped_lexical_search(query, candidates, book, scopes, min_hits=top_k)
+
+        try:
+            remaining = max(0.0, self.vector_deadline - (time.perf_counter() - started))
+            query_vector = await asyncio.wait_for(embed_task, timeout=remaining)
+            vector = self._vector_search(target_store, query_vector, candidates, book, scopes, min_hits=top_k)
+        except asyncio.TimeoutError as e:
+            print(f"[WARN] Vector search missed {self.vector_deadline * 1000:.0f}ms deadline, using lexical results")
+            if breaker:
+                breaker.record_failure(e)
+            return lexical[:top_k] or self._fallback_search(query, top_k, book, scopes), False
+        except Exception as e:
+            print(f"[WARN] Vector search failed: {e}, using lexical results")
+            if breaker:
+                breaker.record_failure(e)
+            return lexical[:top_k] or self._fallback_search(query, top_k, book, scopes), False
+
+        if breaker:
+            breaker.record_success()
+        return reciprocal_rank_fusion([vector, lexical], top_k=top_k), True
+
+    def _lexical_search(self, query: str, top_k: int = 3, book: str = None, chapters: List[int] = None) -> List[str]:
+        """BM25 ranking over the loaded chunks (may be empty), optionally within some chapters."""
+        return [self.documents[doc_id].page_content for doc_id, _ in self._lexical_hits(query, top_k, book, chapters)]
+
+    def _scoped_lexical_search(self, query: str, top_k: int, book: str = None,
+                               scopes: List[List[int]] = None, min_hits: int = None) -> List[str]:
+        """
+        BM25 within the first chapter window with min_hits matches (default top_k) and a best
+        score >= chapter_min_bm25 (the BM25 twin of _scoped_vector_search); otherwise the whole book.
+        """
+        min_hits = min_hits or top_k
+        for chapters in scopes or []:
+            scored = self._lexical_hits(query, top_k, book, chapters)
+            if len(scored) >= min_hits and scored[0][1] >= self.chapter_min_bm25:
+                return [self.documents[row].page_content for row, _ in scored]
+        return self._lexical_search(query, top_k, book)
+
+    def _lexical_hits(self, query: str, top_k: int, book: str = None, chapters: List[int] = None) -> list:
+        """[(row in self.documents, BM25 score)], best first."""
+        if not self.documents:
+            return []
+
+        self._ensure_lexical_index()
+
+        allowed = self._book_rows.get(book, set()) if book else None
+        if chapters:
+            in_chapters = set().union(*(self._chapter_rows.get((book or None, c), set()) for c in chapters))
+            allowed = in_chapters if allowed is None else allowed & in_chapters
+        return self.lexical_index.search(query, top_k, allowed=allowed)
+
+    def _fallback_search(self, query: str, top_k: int = 3, book: str = None,
+                         scopes: List[List[int]] = None) -> List[str]:
+        """
+        BM25 keyword search as fallback when vector DB is unavailable.
+        With chapter scopes, the first window with top_k keyword matches and a best
+        score >= chapter_min_bm25 wins (the BM25 twin of _scoped_vector_search).
+        """
+        with self.metrics.span("fallback_search"):
+            return self._fallback_hits(query, top_k, book, scopes)
+
+    def _fallback_hits(self, query: str, top_k: int, book: str, scopes: List[List[int]]) -> List[str]:
         if not self.documents:
             return ["콩쥐팥쥐 이야기를 참고하세요."]
-        
-        # Simple keyword matching
-        query_lower = query.lower()
-        scored_docs = []
-        
-        for doc in self.documents:
-            content_lower = doc.page_content.lower()
-            # Count keyword matches
-            score = sum(1 for word in query_lower.split() if word in content_lower)
-            if score > 0:
-                scored_docs.append((score, doc.page_content))
-        
-        # Sort by score and return top_k
-        scored_docs.sort(reverse=True, key=lambda x: x[0])
-        
+
+        hits = self._scoped_lexical_search(query, top_k, book, scopes)
+
         # If no matches found or specific 'start' query, return the first chunk (Chapter 1)
         # This prevents empty context which leads to hallucinations
-        if not scored_docs:
+        if not hits:
             print("[INFO] Fallback search found no matches. Returning Chapter 1 context.")
-            return [self.documents[0].page_content]
-            
-        results = [content for _, content in scored_docs[:top_k]]
-        return results
+            rows = sorted(self._book_rows.get(book, ())) if book else []
+            return [self.documents[rows[0] if rows else 0].page_content]
 
+        return hits
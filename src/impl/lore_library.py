@@ -0,0 +1,112 @@
+import glob
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Any
+from langchain_core.documents import Document
+
+BOOK_EXTENSIONS = (".txt", ".md")
+
+
+def book_id_for(path: str) -> str:
+    """'data/story.txt' -> 'story'"""
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def discover_books(directory: str) -> List[str]:
+    """Sorted list of book files directly under `directory`."""
+    paths = []
+    for ext in BOOK_EXTENSIONS:
+        paths.extend(glob.glob(os.path.join(directory, f"*{ext}")))
+    return sorted(paths)
+
+
+def hash_file(path: str, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file, read in blocks (never holds the whole file)."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_book_metadata(path: str) -> Dict[str, Any]:
+    """
+    Per-book metadata attached to every chunk.
+    Title comes from an optional sidecar '<book>.json' ({"title": ..., ...}),
+    otherwise from the first '# ' heading, otherwise the file name.
+    Only scalar values are kept (vector stores reject nested metadata).
+    """
+    book_id = book_id_for(path)
+    metadata = {"book": book_id, "source": os.path.basename(path), "title": book_id}
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for _ in range(20):
+                line = f.readline()
+                if not line:
+                    break
+                if line.startswith("# "):
+                    metadata["title"] = line[2:].strip()
+                    break
+    except OSError:
+        pass
+
+    sidecar = os.path.splitext(path)[0] + ".json"
+    if os.path.exists(sidecar):
+        try:
+            with open(sidecar, 'r', encoding='utf-8') as f:
+                extra = json.load(f)
+            metadata.update({k: v for k, v in extra.items()
+                             if isinstance(v, (str, int, float, bool)) and k not in ("book", "source")})
+        except Exception as e:
+            print(f"[WARN] Ignoring unreadable book metadata {sidecar}: {e}")
+    return metadata
+
+
+class ChunkCache:
+    """
+    Per-book cache of chunked documents, keyed by file hash and chunking parameters.
+    Lets a restart skip re-reading and re-chunking books that did not change.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, book_id: str) -> str:
+        return os.path.join(self.directory, f"{book_id}.json")
+
+    def load(self, book_id: str, file_hash: str, chunk_params: Dict[str, Any]) -> Optional[List[Document]]:
+        path = self._path(book_id)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except Exception:
+            return None
+        if cached.get("hash") != file_hash or cached.get("params") != chunk_params:
+            return None
+        return [Document(page_content=c["text"], metadata=c["metadata"]) for c in cached["chunks"]]
+
+    def save(self, book_id: str, file_hash: str, chunk_params: Dict[str, Any], documents: List[Document]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(book_id)
+        with open(path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump({
+                "hash": file_hash,
+                "params": chunk_params,
+                "chunks": [{"text": d.page_content, "metadata": d.metadata} for d in documents],
+            }, f, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+
+    def remove(self, book_id: str) -> None:
+        try:
+            os.remove(self._path(book_id))
+        except FileNotFoundError:
+            pass
+
+    def cached_books(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(book_id_for(p) for p in glob.glob(os.path.join(self.directory, "*.json")))
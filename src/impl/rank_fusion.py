@@ -0,0 +1,19 @@
+from collections import defaultdict
+from typing import Hashable, List, Sequence
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Hashable]], k: int = 60, top_k: int = None) -> List[Hashable]:
+    """
+    Merges several ranked lists with Reciprocal Rank Fusion.
+    score(d) = sum over lists of 1 / (k + rank(d)), rank starting at 1.
+    Ties keep the order in which items were first seen (earlier lists first).
+    """
+    scores = defaultdict(float)
+    first_seen = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] += 1.0 / (k + rank)
+            first_seen.setdefault(item, len(first_seen))
+
+    fused = sorted(scores, key=lambda item: (-scores[item], first_seen[item]))
+    return fused[:top_k] if top_k is not None else fused
@@ -0,0 +1,68 @@
+import threading
+from collections import OrderedDict
+from typing import Hashable, List, Optional
+
+
+class RetrievalResultCache:
+    """
+    Bounded LRU of retrieve() results keyed by (normalized query, top_k, book, chapter).
+
+    Results depend only on the index, not on the API key that embedded the query,
+    so BYOK sessions share hits. Pinned entries (startup warmup) are never evicted.
+    Must be cleared whenever the index changes.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._pinned = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[List[str]]:
+        with self._lock:
+            results = self._pinned.get(key)
+            if results is None and key in self._entries:
+                self._entries.move_to_end(key)
+                results = self._entries[key]
+            if results is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return list(results)
+
+    def put(self, key: Hashable, results: List[str]) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if key in self._pinned:
+                self._pinned[key] = tuple(results)
+                return
+            self._entries[key] = tuple(results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pin(self, key: Hashable) -> bool:
+        """Keeps an already cached entry forever (until clear()). False if it is not cached."""
+        with self._lock:
+            if key in self._entries:
+                self._pinned[key] = self._entries.pop(key)
+            return key in self._pinned
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._pinned.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "size": len(self._entries),
+                "pinned": len(self._pinned),
+            }
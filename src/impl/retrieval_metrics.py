@@ -0,0 +1,114 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+# Bucket upper bounds in milliseconds; slower observations land in the "+inf" bucket
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (constant memory; percentiles interpolated within a bucket)."""
+
+    def __init__(self, bounds_ms: Tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.bounds_ms = tuple(bounds_ms)
+        self.counts = [0] * (len(self.bounds_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds_ms, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= target:
+                lower = self.bounds_ms[i - 1] if i else 0.0
+                upper = min(self.bounds_ms[i], self.max_ms) if i < len(self.bounds_ms) else self.max_ms
+                return lower + (max(upper, lower) - lower) * (target - seen) / n
+            seen += n
+        return self.max_ms
+
+    def snapshot(self) -> dict:
+        labels = [f"<={b:g}ms" for b in self.bounds_ms] + ["+inf"]
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.max_ms,
+            "buckets": {label: n for label, n in zip(labels, self.counts) if n},
+        }
+
+
+class RetrievalMetrics:
+    """
+    In-process retrieval instrumentation, safe to share across threads:
+      stages: one histogram per timed span (init_embeddings, build_index, byok_client,
+              embed_query, similarity_search, fallback_search, ...)
+      paths:  one histogram per retrieve() outcome (vector, byok, cached, fallback, error),
+              so its count is the number of calls that took that path
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, LatencyHistogram] = {}
+        self._paths: Dict[str, LatencyHistogram] = {}
+
+    @staticmethod
+    def _observe(histograms: Dict[str, LatencyHistogram], name: str, seconds: float) -> None:
+        histogram = histograms.get(name)
+        if histogram is None:
+            histogram = histograms[name] = LatencyHistogram()
+        histogram.observe(seconds * 1000)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self._observe(self._stages, stage, seconds)
+
+    def record_path(self, path: str, seconds: float) -> None:
+        with self._lock:
+            self._observe(self._paths, path, seconds)
+
+    @contextmanager
+    def span(self, stage: str):
+        """Times the enclosed block as one observation of `stage` (also when it raises)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def snapshot(self, stage: Optional[str] = None) -> dict:
+        with self._lock:
+            if stage is not None:
+                histogram = self._stages.get(stage)
+                return histogram.snapshot() if histogram else LatencyHistogram().snapshot()
+            return {
+                "paths": {name: h.snapshot() for name, h in sorted(self._paths.items())},
+                "stages": {name: h.snapshot() for name, h in sorted(self._stages.items())},
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+            self._paths.clear()
+
+
+def format_metrics(snapshot: dict) -> str:
+    """Text table of a RetrievalMetrics.snapshot() (for benchmark scripts and logs)."""
+    lines = [f"{'':<26}{'count':>7}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}  (ms)"]
+    for group in ("paths", "stages"):
+        for name, h in snapshot.get(group, {}).items():
+            lines.append(f"{group[:-1] + ':' + name:<26}{h['count']:>7}{h['mean_ms']:>10.2f}{h['p50_ms']:>10.2f}"
+                         f"{h['p95_ms']:>10.2f}{h['p99_ms']:>10.2f}{h['max_ms']:>10.2f}")
+    return "\n".join(lines)
@@ -0,0 +1,88 @@
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+from langchain_core.documents import Document
+
+# Preferred cut points, best first (paragraph > line > Korean sentence end > word)
+SEPARATORS = ["\n\n", "\n", "다. ", "요. ", ". ", "? ", "! ", " "]
+
+
+def iter_text_blocks(file_path: str, block_chars: int = 1 << 20) -> Iterator[str]:
+    """Yields the file as text blocks of at most `block_chars` characters (UTF-8 safe)."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        while True:
+            block = f.read(block_chars)
+            if not block:
+                return
+            yield block
+
+
+def _find_cut(buffer: str, start: int, limit: int) -> int:
+    """Best separator end position in buffer[start:limit], preferring cuts in the second half."""
+    floor = start + (limit - start) // 2
+    for sep in SEPARATORS:
+        pos = buffer.rfind(sep, floor, limit)
+        if pos != -1:
+            return pos + len(sep)
+    return limit
+
+
+def _find_overlap_start(buffer: str, start: int, cut: int, overlap: int) -> int:
+    """Start of the next chunk: ~`overlap` chars before the cut, moved forward to a word boundary."""
+    if overlap <= 0:
+        return cut
+    begin = max(start, cut - overlap)
+    candidates = [p + 1 for p in (buffer.find(" ", begin, cut), buffer.find("\n", begin, cut)) if p != -1]
+    begin = min(candidates) if candidates else begin
+    # Always make progress, even if the overlap would cover the whole chunk
+    return begin if begin > start else cut
+
+
+def iter_chunks(blocks: Iterable[str], chunk_size: int = 1000, chunk_overlap: int = 200,
+                metadata: Optional[Dict[str, Any]] = None) -> Iterator[Document]:
+    """
+    Incremental splitter. Holds at most one block plus a chunk-sized tail of text;
+    a chunk is only cut once more than chunk_size characters are buffered, so chunks
+    and overlaps that straddle block boundaries come out the same as with one big block.
+    Every chunk records its character offset in the source as metadata["start_index"].
+    """
+    if chunk_overlap >= chunk_size:
+        raise ValueError("chunk_overlap must be smaller than chunk_size")
+    metadata = metadata or {}
+    buffer = ""
+    base = 0  # source offset of buffer[0]
+
+    def make(start: int, end: int) -> Optional[Document]:
+        text = buffer[start:end]
+        stripped = text.strip()
+        if not stripped:
+            return None
+        lead = len(text) - len(text.lstrip())
+        return Document(page_content=stripped, metadata=dict(metadata, start_index=base + start + lead))
+
+    for block in blocks:
+        buffer += block
+        pos = 0
+        # Scan with an offset instead of re-slicing the buffer for every chunk
+        while len(buffer) - pos > chunk_size:
+            cut = _find_cut(buffer, pos, pos + chunk_size)
+            doc = make(pos, cut)
+            if doc:
+                yield doc
+            pos = _find_overlap_start(buffer, pos, cut, chunk_overlap)
+        buffer = buffer[pos:]
+        base += pos
+
+    doc = make(0, len(buffer))
+    if doc:
+        yield doc
+
+
+def iter_batches(items: Iterable, batch_size: int) -> Iterator[List]:
+    """Groups an iterable into lists of at most batch_size items."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
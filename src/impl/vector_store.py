@@ -0,0 +1,438 @@
+import hashlib
+import json
+import os
+from typing import List, Optional, Dict, Any, Tuple
+import numpy as np
+from langchain_core.documents import Document
+from src.impl.ivf_index import IVFIndex
+
+VECTORS_FILENAME = "vectors.npy"
+CHUNKS_FILENAME = "chunks.json"
+QUANTIZED_FILENAME = "quantized.npz"
+IVF_FILENAME = "ivf.npz"
+QUANTIZATION_MODES = ("float16", "int8")
+_BLOCK_ROWS = 4096  # rows quantized per step, bounds temporary float32 memory
+_SCAN_ROWS = 256  # rows decoded per search step (decoded block stays in CPU cache)
+
+
+def quantize(matrix, mode: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Compresses a float32 matrix. Returns (codes, scales):
+    - float16: codes are the half-precision rows, no scales
+    - int8: symmetric per-row scale, row ~= codes * scale
+    Works block by block so a memory-mapped matrix is never copied whole.
+    """
+    n = matrix.shape[0]
+    if mode == "float16":
+        codes = np.empty(matrix.shape, dtype=np.float16)
+        for start in range(0, n, _BLOCK_ROWS):
+            codes[start:start + _BLOCK_ROWS] = matrix[start:start + _BLOCK_ROWS]
+        return codes, None
+    if mode == "int8":
+        codes = np.empty(matrix.shape, dtype=np.int8)
+        scales = np.empty(n, dtype=np.float32)
+        for start in range(0, n, _BLOCK_ROWS):
+            block = np.asarray(matrix[start:start + _BLOCK_ROWS], dtype=np.float32)
+            block_scales = np.abs(block).max(axis=1) / 127.0
+            block_scales[block_scales == 0] = 1.0
+            codes[start:start + len(block)] = np.rint(block / block_scales[:, None])
+            scales[start:start + len(block)] = block_scales
+        return codes, scales
+    raise ValueError(f"Unknown quantization mode: {mode}")
+
+
+def _matches(metadata: Dict[str, Any], where: Dict[str, Any]) -> bool:
+    """Evaluates a Chroma `where` clause against one metadata dict."""
+    for field, condition in where.items():
+        if field == "$and":
+            if not all(_matches(metadata, clause) for clause in condition):
+                return False
+        elif field == "$or":
+            if not any(_matches(metadata, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(field)
+            for op, operand in condition.items():
+                if op == "$in":
+                    ok = value in operand
+                elif op == "$nin":
+                    ok = value not in operand
+                elif op == "$eq":
+                    ok = value == operand
+                elif op == "$ne":
+                    ok = value != operand
+                else:
+                    raise ValueError(f"Unsupported filter operator: {op}")
+                if not ok:
+                    return False
+        elif metadata.get(field) != condition:
+            return False
+    return True
+
+
+def _ids_digest(ids: List[str]) -> str:
+    return hashlib.sha256("\n".join(ids).encode("utf-8")).hexdigest()
+
+
+class NumpyVectorStore:
+    """
+    In-process vector store: all chunk embeddings live in one contiguous float32 matrix.
+    Top-k is a single matrix-vector product plus argpartition.
+
+    Ranking uses squared L2 distance (Chroma's default space), rewritten as
+    ||q-d||^2 = ||q||^2 + ||d||^2 - 2 q.d, so only q.d has to be computed per query.
+
+    With `quantization` ("int8" / "float16") a compressed copy of the matrix is kept in RAM
+    and scanned first; only a shortlist of k * rescore_factor rows is rescored with the
+    full-precision vectors, which stay memory-mapped on disk once persisted.
+    int8 is 4x smaller and scans about as fast as float32; float16 halves memory but NumPy
+    decodes half floats slowly, so its scan is an order of magnitude slower.
+
+    With `ann="ivf"` an inverted-file index (k-means lists) restricts each search to the
+    rows of the `nprobe` closest lists. It is built on persist() (or build_ann()) once the
+    store has at least `ann_min_rows` rows, and saved next to the vectors.
+
+    Exposes the subset of the Chroma API that LoreKeeperImpl uses
+    (get / add_documents / delete / similarity_search / delete_collection).
+    """
+
+    def __init__(self, embedding_function=None, persist_directory: Optional[str] = None,
+                 quantization: Optional[str] = None, rescore_factor: int = 4,
+                 ann: Optional[str] = None, nprobe: int = 16, ann_lists: Optional[int] = None,
+                 ann_min_rows: int = 4096):
+        if quantization not in (None,) + QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization mode: {quantization}")
+        if ann not in (None, "ivf"):
+            raise ValueError(f"Unknown ANN index: {ann}")
+        self.embedding_function = embedding_function
+        self.persist_directory = persist_directory
+        self.quantization = quantization
+        self.rescore_factor = max(1, rescore_factor)
+        self._codes = None  # quantized matrix (lazily rebuilt after writes)
+        self._scales = None
+        self.ann = ann
+        self.nprobe = max(1, nprobe)
+        self.ann_lists = ann_lists
+        self.ann_min_rows = ann_min_rows
+        self._ivf: Optional[IVFIndex] = None
+        self.ids: List[str] = []
+        self.texts: List[str] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self._sq_norms = np.zeros(0, dtype=np.float32)
+        self._filter_rows: Dict[tuple, np.ndarray] = {}
+        self._buffer = None  # over-allocated backing array; matrix is a view of its first rows
+
+    # ---- Persistence ----
+    @classmethod
+    def load(cls, persist_directory: str, embedding_function=None, mmap: bool = True,
+             **options) -> "NumpyVectorStore":
+        """
+        Loads a saved store (memory-mapped by default). Missing files -> empty store.
+        `options` are the quantization / ANN constructor arguments.
+        """
+        store = cls(embedding_function=embedding_function, persist_directory=persist_directory, **options)
+        vectors_path = os.path.join(persist_directory, VECTORS_FILENAME)
+        chunks_path = os.path.join(persist_directory, CHUNKS_FILENAME)
+        if not (os.path.exists(vectors_path) and os.path.exists(chunks_path)):
+            return store
+
+        with open(chunks_path, 'r', encoding='utf-8') as f:
+            chunks = json.load(f)
+        matrix = np.load(vectors_path, mmap_mode='r' if mmap else None)
+        quantized = store._load_quantized(chunks["ids"]) if store.quantization else None
+        if quantized:
+            # Norms and codes come from the sidecar: the float32 pages are not touched
+            store._set_rows(chunks["ids"], chunks["texts"], chunks["metadatas"], matrix, **quantized)
+        else:
+            store._set_rows(chunks["ids"], chunks["texts"], chunks["metadatas"], matrix)
+        if store.ann:
+            store._ivf = store._load_ivf()
+        return store
+
+    @classmethod
+    def from_arrays(cls, ids: List[str], texts: List[str], metadatas: List[dict], matrix,
+                    embedding_function=None, sq_norms=None, ivf: Optional[IVFIndex] = None,
+                    **options) -> "NumpyVectorStore":
+        """
+        Wraps already loaded rows (e.g. a memory-mapped snapshot) without copying the matrix.
+        With precomputed sq_norms the matrix pages are not read until the first search.
+        """
+        store = cls(embedding_function=embedding_function, **options)
+        store._set_rows(ids, texts, metadatas, matrix, sq_norms=sq_norms)
+        if store.ann:
+            store._ivf = ivf if ivf is not None and len(ivf.assignments) == len(ids) else store.build_ann()
+        return store
+
+    def _load_ivf(self) -> Optional[IVFIndex]:
+        """Reads the persisted IVF lists if they were built for exactly the stored rows."""
+        path = os.path.join(self.persist_directory, IVF_FILENAME)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                if str(data["ids_digest"]) != _ids_digest(self.ids):
+                    return None
+                return IVFIndex(data["centroids"], data["assignments"])
+        except Exception as e:
+            print(f"[WARN] Could not read IVF index ({path}): {e}")
+            return None
+
+    def build_ann(self, force: bool = False) -> Optional[IVFIndex]:
+        """(Re)builds the IVF lists; no-op below ann_min_rows (exact search is fast enough there)."""
+        if not self.ann or len(self.ids) < self.ann_min_rows:
+            self._ivf = None
+        elif force or self._ivf is None:
+            self._ivf = IVFIndex.build(self.matrix, n_lists=self.ann_lists)
+        return self._ivf
+
+    def _load_quantized(self, ids: List[str]) -> Optional[Dict[str, Any]]:
+        """Reads the persisted quantized sidecar if it matches the mode and the stored rows."""
+        path = os.path.join(self.persist_directory, QUANTIZED_FILENAME)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                if str(data["mode"]) != self.quantization or str(data["ids_digest"]) != _ids_digest(ids):
+                    return None
+                return {
+                    "sq_norms": data["sq_norms"],
+                    "codes": data["codes"],
+                    "scales": data["scales"] if self.quantization == "int8" else None,
+                }
+        except Exception as e:
+            print(f"[WARN] Could not read quantized vectors ({path}): {e}")
+            return None
+
+    def persist(self) -> None:
+        """Writes vectors.npy + chunks.json atomically into persist_directory."""
+        if not self.persist_directory:
+            return
+        os.makedirs(self.persist_directory, exist_ok=True)
+        vectors_path = os.path.join(self.persist_directory, VECTORS_FILENAME)
+        chunks_path = os.path.join(self.persist_directory, CHUNKS_FILENAME)
+
+        with open(vectors_path + ".tmp", 'wb') as f:
+            np.save(f, np.ascontiguousarray(self.matrix, dtype=np.float32))
+        with open(chunks_path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump({"ids": self.ids, "texts": self.texts, "metadatas": self.metadatas}, f, ensure_ascii=False)
+        os.replace(vectors_path + ".tmp", vectors_path)
+        os.replace(chunks_path + ".tmp", chunks_path)
+
+        if self.quantization and len(self.ids):
+            self._ensure_codes()
+            quantized_path = os.path.join(self.persist_directory, QUANTIZED_FILENAME)
+            with open(quantized_path + ".tmp", 'wb') as f:
+                np.savez(f, mode=np.array(self.quantization), ids_digest=np.array(_ids_digest(self.ids)),
+                         codes=self._codes, sq_norms=self._sq_norms,
+                         scales=self._scales if self._scales is not None else np.zeros(0, dtype=np.float32))
+            os.replace(quantized_path + ".tmp", quantized_path)
+            # Serve full precision from disk from now on; only the codes stay resident
+            self.matrix = np.load(vectors_path, mmap_mode='r')
+            self._buffer = None
+
+        if self.build_ann() is not None:
+            ivf_path = os.path.join(self.persist_directory, IVF_FILENAME)
+            with open(ivf_path + ".tmp", 'wb') as f:
+                np.savez(f, ids_digest=np.array(_ids_digest(self.ids)),
+                         centroids=self._ivf.centroids, assignments=self._ivf.assignments)
+            os.replace(ivf_path + ".tmp", ivf_path)
+
+    def with_embedding(self, embedding_function) -> "NumpyVectorStore":
+        """Shallow view sharing the same matrix but embedding queries with another client (BYOK)."""
+        view = NumpyVectorStore(embedding_function=embedding_function, persist_directory=self.persist_directory)
+        view.ids, view.texts, view.metadatas = self.ids, self.texts, self.metadatas
+        view.matrix, view._sq_norms = self.matrix, self._sq_norms
+        view._filter_rows = self._filter_rows
+        view.quantization, view.rescore_factor = self.quantization, self.rescore_factor
+        self._ensure_codes()
+        view._codes, view._scales = self._codes, self._scales
+        view.ann, view.nprobe, view._ivf = self.ann, self.nprobe, self._ivf
+        return view
+
+    def _set_rows(self, ids, texts, metadatas, matrix, sq_norms=None, codes=None, scales=None):
+        self.ids = list(ids)
+        self.texts = list(texts)
+        self.metadatas = [m or {} for m in metadatas]
+        self.matrix = matrix
+        self._filter_rows = {}
+        self._buffer = None
+        self._codes, self._scales = codes, scales
+        self._ivf = None
+        if sq_norms is not None:
+            self._sq_norms = np.asarray(sq_norms, dtype=np.float32)
+        elif len(self.ids):
+            self._sq_norms = np.einsum('ij,ij->i', matrix, matrix).astype(np.float32)
+        else:
+            self._sq_norms = np.zeros(0, dtype=np.float32)
+
+    def _ensure_codes(self) -> None:
+        if self.quantization and self._codes is None and len(self.ids):
+            self._codes, self._scales = quantize(self.matrix, self.quantization)
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Bytes held in RAM by the search structures (a memory-mapped matrix counts as 0)."""
+        matrix_bytes = 0 if isinstance(self.matrix, np.memmap) else int(np.asarray(self.matrix).nbytes)
+        codes_bytes = int(self._codes.nbytes) if self._codes is not None else 0
+        if self._scales is not None:
+            codes_bytes += int(self._scales.nbytes)
+        return {"matrix": matrix_bytes, "quantized": codes_bytes, "norms": int(self._sq_norms.nbytes)}
+
+    # ---- Chroma-compatible write API ----
+    def get(self, where: Optional[Dict[str, Any]] = None, include=None) -> Dict[str, Any]:
+        rows = self._rows_for(where)
+        rows = range(len(self.ids)) if rows is None else rows.tolist()
+        result = {"ids": [self.ids[i] for i in rows]}
+        if include is None or "documents" in include:
+            result["documents"] = [self.texts[i] for i in rows]
+        if include is None or "metadatas" in include:
+            result["metadatas"] = [self.metadatas[i] for i in rows]
+        return result
+
+    def add_documents(self, documents: List[Document], ids: Optional[List[str]] = None) -> List[str]:
+        texts = [doc.page_content for doc in documents]
+        vectors = self.embedding_function.embed_documents(texts)
+        return self.add_embeddings(
+            ids or [str(len(self.ids) + i) for i in range(len(texts))],
+            texts,
+            vectors,
+            [dict(doc.metadata or {}) for doc in documents],
+        )
+
+    def add_embeddings(self, ids: List[str], texts: List[str], vectors, metadatas: Optional[List[dict]] = None) -> List[str]:
+        """Adds pre-computed vectors. Existing ids are replaced."""
+        if not ids:
+            return []
+        metadatas = metadatas or [{} for _ in ids]
+        new = np.asarray(vectors, dtype=np.float32)
+        if new.ndim != 2 or new.shape[0] != len(ids):
+            raise ValueError("vectors must be a 2-D array with one row per id")
+        existing = set(self.ids)
+        self.delete(ids=[i for i in ids if i in existing])
+
+        # Append into an over-allocated buffer (amortized O(1) per row for batched ingestion)
+        n, m = len(self.ids), new.shape[0]
+        if self._buffer is None or self._buffer.shape[0] < n + m or self._buffer.shape[1] != new.shape[1]:
+            capacity = max(n + m, 2 * n, 16)
+            buffer = np.empty((capacity, new.shape[1]), dtype=np.float32)
+            if n:
+                buffer[:n] = self.matrix
+            self._buffer = buffer
+        self._buffer[n:n + m] = new
+
+        self.ids.extend(ids)
+        self.texts.extend(texts)
+        self.metadatas.extend(meta or {} for meta in metadatas)
+        self.matrix = self._buffer[:n + m]
+        self._sq_norms = np.concatenate([self._sq_norms[:n], np.einsum('ij,ij->i', new, new)]).astype(np.float32)
+        self._filter_rows = {}
+        self._codes, self._scales = None, None
+        if self._ivf is not None:
+            self._ivf.add(new)  # new rows join their nearest existing list
+        return list(ids)
+
+    def delete(self, ids: Optional[List[str]] = None) -> None:
+        if not ids:
+            return
+        drop = set(ids)
+        keep = [i for i, chunk_id in enumerate(self.ids) if chunk_id not in drop]
+        if len(keep) == len(self.ids):
+            return
+        matrix = np.ascontiguousarray(np.asarray(self.matrix)[keep], dtype=np.float32)
+        ivf = IVFIndex(self._ivf.centroids, self._ivf.assignments[keep]) if self._ivf is not None else None
+        self._set_rows([self.ids[i] for i in keep], [self.texts[i] for i in keep],
+                       [self.metadatas[i] for i in keep], matrix)
+        self._ivf = ivf
+
+    def delete_collection(self) -> None:
+        self._set_rows([], [], [], np.zeros((0, 0), dtype=np.float32))
+
+    # ---- Search ----
+    def _rows_for(self, filter: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """
+        Row indices matching a Chroma-style `where` filter, cached per filter. Supports
+        equality ({"book": "story"}), {"field": {"$in": [...]}}, "$eq"/"$ne", "$and" and "$or".
+        """
+        if not filter:
+            return None
+        key = json.dumps(filter, sort_keys=True, ensure_ascii=False, default=str)
+        rows = self._filter_rows.get(key)
+        if rows is None:
+            rows = np.array([i for i, meta in enumerate(self.metadatas) if _matches(meta, filter)], dtype=np.int64)
+            self._filter_rows[key] = rows
+        return rows
+
+    def search(self, query_vector, k: int = 3, filter: Optional[Dict[str, Any]] = None) -> List[Tuple[int, float]]:
+        """Returns [(row, squared_l2_distance)] of the k nearest rows, closest first."""
+        if len(self.ids) == 0 or k <= 0:
+            return []
+        q = np.asarray(query_vector, dtype=np.float32)
+        rows = self._rows_for(filter)
+        if rows is not None and len(rows) == 0:
+            return []
+        if self._ivf is not None and self.nprobe < self._ivf.n_lists:
+            # Only scan the rows of the closest lists (still intersected with the filter)
+            probed = self._ivf.probe(q, self.nprobe)
+            if rows is not None:
+                probed = probed[np.isin(probed, rows, assume_unique=True)]
+            if len(probed) >= k:
+                rows = probed
+        n = len(self.ids) if rows is None else len(rows)
+        shortlist = k * self.rescore_factor
+
+        if self.quantization and n > shortlist:
+            # Approximate pass over the compressed matrix, exact rescoring of the shortlist
+            self._ensure_codes()
+            approx = 2.0 * self._approx_dots(q, rows) - (self._sq_norms if rows is None else self._sq_norms[rows])
+            candidates = np.argpartition(-approx, shortlist - 1)[:shortlist]
+            candidates = np.sort(candidates if rows is None else rows[candidates])  # sorted reads from the mmap
+            row_ids = candidates
+            scores = 2.0 * (np.asarray(self.matrix[candidates], dtype=np.float32) @ q) - self._sq_norms[candidates]
+        elif rows is None:
+            # Higher is closer: 2 q.d - ||d||^2  ==  ||q||^2 - ||q-d||^2
+            row_ids = None
+            scores = 2.0 * (self.matrix @ q) - self._sq_norms
+        else:
+            row_ids = rows
+            scores = 2.0 * (self.matrix[rows] @ q) - self._sq_norms[rows]
+
+        n = len(scores)
+        k = min(k, n)
+        top = np.argpartition(-scores, k - 1)[:k] if k < n else np.arange(n)
+        top = top[np.argsort(-scores[top], kind='stable')]
+        q_sq = float(q @ q)
+        row_ids = top if row_ids is None else row_ids[top]
+        return [(int(r), q_sq - float(scores[i])) for r, i in zip(row_ids, top)]
+
+    def _approx_dots(self, q: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+        """q . d for every (selected) row, decoded from the quantized codes block by block."""
+        n = len(self.ids) if rows is None else len(rows)
+        dots = np.empty(n, dtype=np.float32)
+        for start in range(0, n, _SCAN_ROWS):
+            index = slice(start, start + _SCAN_ROWS) if rows is None else rows[start:start + _SCAN_ROWS]
+            block = self._codes[index].astype(np.float32) @ q
+            if self._scales is not None:
+                block *= self._scales[index]
+            dots[start:start + len(block)] = block
+        return dots
+
+    def similarity_search_by_vector_with_score(self, embedding, k: int = 3,
+                                               filter: Optional[Dict[str, Any]] = None) -> List[Tuple[Document, float]]:
+        return [
+            (Document(page_content=self.texts[i], metadata=dict(self.metadatas[i])), distance)
+            for i, distance in self.search(embedding, k, filter)
+        ]
+
+    # Same name as Chroma's (distance, lower is closer) so callers can treat both backends alike
+    similarity_search_by_vector_with_relevance_scores = similarity_search_by_vector_with_score
+
+    def similarity_search_by_vector(self, embedding, k: int = 3, filter: Optional[Dict[str, Any]] = None) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k, filter)]
+
+    def similarity_search(self, query: str, k: int = 3, filter: Optional[Dict[str, Any]] = None) -> List[Document]:
+        if self.embedding_function is None:
+            raise ValueError("NumpyVectorStore has no embedding function for text queries")
+        return self.similarity_search_by_vector(self.embedding_function.embed_query(query), k, filter)
+
+    def __len__(self) -> int:
+        return len(self.ids)
@@ -0,0 +1,52 @@
+import unittest
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.impl.bm25_index import BM25Index, tokenize, strip_particle
+
+
+class TestKoreanTokenizer(unittest.TestCase):
+    def test_strip_particle(self):
+        self.assertEqual(strip_particle("두꺼비를"), "두꺼비")
+        self.assertEqual(strip_particle("마당에서"), "마당")
+        self.assertEqual(strip_particle("콩쥐는"), "콩쥐")
+        self.assertEqual(strip_particle("독"), "독")  # never strips the whole word
+        self.assertEqual(strip_particle("toad"), "toad")
+
+    def test_tokenize_includes_ngrams(self):
+        tokens = tokenize("두꺼비를 도와준다")
+        self.assertIn("두꺼비", tokens)
+        self.assertIn("도와", tokens)
+        self.assertIn("와준", tokens)
+
+
+class TestBM25Index(unittest.TestCase):
+    def setUp(self):
+        self.texts = [
+            "콩쥐는 새벽부터 밤늦게까지 집안일을 했습니다.",
+            "커다란 두꺼비가 나타나 밑 빠진 독의 구멍을 막아 주었습니다.",
+            "참새들이 날아와 겨와 쌀을 골라 주었습니다.",
+        ]
+        self.index = BM25Index().build(self.texts)
+
+    def test_particle_variants_match(self):
+        """'두꺼비를' in the query matches '두꺼비가' in the text"""
+        hits = self.index.search("두꺼비를 도와준다", top_k=3)
+        self.assertEqual(hits[0][0], 1)
+
+    def test_top_k_ordering(self):
+        hits = self.index.search("참새 쌀", top_k=1)
+        self.assertEqual(len(hits), 1)
+        self.assertEqual(hits[0][0], 2)
+
+    def test_no_match(self):
+        self.assertEqual(self.index.search("공룡", top_k=3), [])
+
+    def test_empty_index(self):
+        self.assertEqual(BM25Index().build([]).search("콩쥐"), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.impl.bulk_indexer import TokenBucket, BulkIndexer, is_rate_limit_error, load_checkpoint
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_limits_requests_per_minute(self):
+        clock = FakeClock()
+        bucket = TokenBucket(120, clock=clock, sleep=clock.sleep)  # 2 requests / second
+        for _ in range(10):
+            bucket.acquire()
+        # Burst of 2, then 8 more at 2/s
+        self.assertAlmostEqual(clock.now, 4.0, places=3)
+
+    def test_unlimited(self):
+        clock = FakeClock()
+        bucket = TokenBucket(0, clock=clock, sleep=clock.sleep)
+        for _ in range(100):
+            bucket.acquire()
+        self.assertEqual(clock.now, 0.0)
+
+
+class TestBulkIndexer(unittest.TestCase):
+    def _docs(self, n):
+        return [f"id{i}" for i in range(n)], [Document(page_content=f"chunk {i}") for i in range(n)]
+
+    def test_batches_and_throughput(self):
+        written = []
+        batch_sizes = []
+
+        def embed(texts):
+            batch_sizes.append(len(texts))
+            return [[1.0, 0.0] for _ in texts]
+
+        ids, docs = self._docs(10)
+        stats = BulkIndexer(embed, lambda i, d, v: written.extend(i), batch_size=3, workers=2).run(ids, docs)
+
+        self.assertEqual(sorted(written), sorted(ids))
+        self.assertEqual(sorted(batch_sizes), [1, 3, 3, 3])
+        self.assertEqual(stats["embedded"], 10)
+        self.assertGreater(stats["chunks_per_sec"], 0)
+
+    def test_retries_rate_limit_errors(self):
+        calls = []
+
+        def embed(texts):
+            calls.append(texts)
+            if len(calls) < 3:
+                raise RuntimeError("429 Resource has been exhausted (e.g. check quota).")
+            return [[1.0] for _ in texts]
+
+        sleeps = []
+        ids, docs = self._docs(2)
+        stats = BulkIndexer(embed, lambda *a: None, batch_size=2, workers=1, sleep=sleeps.append).run(ids, docs)
+        self.assertEqual(stats["retries"], 2)
+        self.assertEqual(sleeps, [2.0, 4.0])
+
+    def test_other_errors_fail_fast_and_checkpoint(self):
+        index_dir = tempfile.mkdtemp()
+        written = []
+
+        def embed(texts):
+            if "chunk 4" in texts:
+                raise ValueError("bad input")
+            return [[1.0] for _ in texts]
+
+        ids, docs = self._docs(6)
+        indexer = BulkIndexer(embed, lambda i, d, v: written.extend(i), batch_size=2, workers=1,
+                              index_dir=index_dir, checkpoint={"config": "fp"})
+        with self.assertRaises(ValueError):
+            indexer.run(ids, docs)
+        self.assertEqual(written, ["id0", "id1", "id2", "id3"])
+        self.assertEqual(load_checkpoint(index_dir)["completed"], 4)
+        self.assertEqual(load_checkpoint(index_dir)["config"], "fp")
+
+    def test_rate_limit_detection(self):
+        self.assertTrue(is_rate_limit_error(RuntimeError("429 Too Many Requests")))
+        self.assertFalse(is_rate_limit_error(ValueError("dimension mismatch")))
+
+
+class QuotaLimitedEmbedding(DeterministicFakeEmbedding):
+    """Fails with a quota error once `budget` documents have been embedded."""
+    budget: int = 10 ** 9
+    embedded: int = 0
+
+    def embed_documents(self, texts):
+        if self.embedded + len(texts) > self.budget:
+            raise RuntimeError("429 Quota exceeded")
+        self.embedded += len(texts)
+        return super().embed_documents(texts)
+
+
+@patch.dict(os.environ, {"AI_PROVIDER": "local", "LORE_VECTOR_BACKEND": "numpy",
+                         "LORE_EMBED_BATCH_WINDOW_MS": "0", "LORE_INDEX_BATCH_SIZE": "4",
+                         "LORE_INDEX_WORKERS": "1"})
+class TestResumableBuild(unittest.TestCase):
+    def _keeper(self, db_path, embeddings):
+        from src.impl.lore_keeper_impl import LoreKeeperImpl
+        keeper = LoreKeeperImpl()
+        keeper.db_path = db_path
+        keeper.embeddings = embeddings
+        keeper.documents = [Document(page_content=f"콩쥐 이야기 {i}") for i in range(20)]
+        return keeper
+
+    def test_resumes_after_quota_error(self):
+        db_path = tempfile.mkdtemp()
+        with patch('src.impl.bulk_indexer.time.sleep'):
+            first = self._keeper(db_path, QuotaLimitedEmbedding(size=8, budget=8))
+            first.build_index()
+        self.assertTrue(first.fallback_mode)
+        self.assertEqual(first.bulk_stats["embedded"], 8)
+        self.assertIsNotNone(load_checkpoint(first._index_dir()))
+
+        second = self._keeper(db_path, QuotaLimitedEmbedding(size=8))
+        second.build_index()
+        self.assertFalse(second.fallback_mode)
+        self.assertEqual(second.index_stats, {"reused": 8, "embedded": 12, "deleted": 0})
+        self.assertEqual(len(second.vector_store), 20)
+        self.assertIsNone(load_checkpoint(second._index_dir()))
+
+
+if __name__ == '__main__':
+    unittest.main()
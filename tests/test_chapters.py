@@ -0,0 +1,157 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import os
+import sys
+import tempfile
+from langchain_core.documents import Document
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.impl.chapters import split_chapters, scene_chapters, chapter_scopes
+from src.impl.vector_store import NumpyVectorStore
+
+BOOK = (
+    "# 콩쥐팥쥐\n\n"
+    "## 제1장: 시작\n\n콩쥐는 새어머니와 함께 살았습니다.\n\n"
+    "## 제2장: 과제\n\n밑 빠진 독에 물을 채우라는 과제를 받았습니다.\n\n"
+    "## 제3장: 도움\n\n두꺼비가 나타나 독의 구멍을 막아 주었습니다.\n\n"
+    "## 등장인물 소개\n\n콩쥐, 팥쥐, 새어머니\n"
+)
+STORY_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'story.txt')
+
+
+class TestChapterHelpers(unittest.TestCase):
+    def test_split_chapters(self):
+        sections = split_chapters(BOOK)
+        self.assertEqual([chapter for chapter, _, _ in sections], [1, 2, 3, 0])
+        for _, offset, section in sections:
+            self.assertEqual(BOOK[offset:offset + len(section)], section)
+        self.assertTrue(sections[0][2].startswith("# 콩쥐팥쥐"))  # title block joins chapter 1
+        self.assertTrue(sections[1][2].startswith("## 제2장"))
+        self.assertEqual(split_chapters("제목 없음")[0][0], 0)
+
+    def test_scene_chapters(self):
+        self.assertEqual(scene_chapters("chapter_1_house"), (1, 2, 3, 4))
+        self.assertEqual(scene_chapters("chapter_2_road"), (5, 6))
+        self.assertEqual(scene_chapters("3"), (3,))
+        self.assertEqual(scene_chapters(4), (4,))
+        self.assertEqual(scene_chapters("ending"), ())
+        self.assertEqual(scene_chapters(None), ())
+
+    def test_chapter_scopes(self):
+        self.assertEqual(chapter_scopes([2], [1, 2, 3]), [[2], [1, 2, 3]])
+        self.assertEqual(chapter_scopes([1], [1, 2, 3]), [[1], [1, 2]])
+        self.assertEqual(chapter_scopes((5, 6), range(1, 9)), [[5, 6], [4, 5, 6, 7]])
+        self.assertEqual(chapter_scopes((1, 2), [1, 2]), [[1, 2]])
+        self.assertEqual(chapter_scopes([9], [1, 2, 3]), [])
+        self.assertEqual(chapter_scopes((), [1, 2]), [])
+
+
+class TestNumpyWhereFilter(unittest.TestCase):
+    def test_in_and_and_filters(self):
+        store = NumpyVectorStore()
+        metadatas = [{"book": "a", "chapter": 1}, {"book": "a", "chapter": 2},
+                     {"book": "b", "chapter": 2}, {"book": "a", "chapter": 3}]
+        store.add_embeddings(["0", "1", "2", "3"], ["0", "1", "2", "3"], [[1.0, 0.0]] * 4, metadatas)
+        self.assertEqual(store._rows_for({"chapter": {"$in": [1, 3]}}).tolist(), [0, 3])
+        self.assertEqual(store._rows_for({"$and": [{"book": "a"}, {"chapter": 2}]}).tolist(), [1])
+        self.assertEqual(store._rows_for({"$or": [{"book": "b"}, {"chapter": 1}]}).tolist(), [0, 2])
+        with self.assertRaises(ValueError):
+            store._rows_for({"chapter": {"$gt": 1}})
+
+
+@patch.dict(os.environ, {"AI_PROVIDER": "offline", "LORE_VECTOR_BACKEND": "numpy", "LORE_HASH_DIM": "256"})
+class TestChapterRetrieval(unittest.TestCase):
+    def _keeper(self):
+        from src.impl.lore_keeper_impl import LoreKeeperImpl
+        keeper = LoreKeeperImpl()
+        keeper.db_path = tempfile.mkdtemp()
+        keeper.documents = keeper._split_text(BOOK, {"source": "test", "book": "story"})
+        return keeper
+
+    def test_chunks_are_tagged_with_chapter_and_offset(self):
+        keeper = self._keeper()
+        chapters = [doc.metadata["chapter"] for doc in keeper.documents]
+        self.assertEqual(sorted(set(chapters)), [0, 1, 2, 3])
+        self.assertEqual(keeper.documents[0].metadata["start_index"], 0)
+        for doc in keeper.documents:
+            start = doc.metadata["start_index"]
+            self.assertEqual(BOOK[start:start + len(doc.page_content)], doc.page_content)
+            self.assertLessEqual(doc.page_content.count("## "), 1)  # no chunk spans two sections
+
+    def _story_keeper(self):
+        from src.impl.lore_keeper_impl import LoreKeeperImpl
+        keeper = LoreKeeperImpl()
+        keeper.db_path = tempfile.mkdtemp()
+        keeper.load_book(STORY_PATH)
+        return keeper
+
+    def _chapters_of(self, keeper, results):
+        return [next(doc.metadata["chapter"] for doc in keeper.documents if doc.page_content == text)
+                for text in results]
+
+    def test_scene_searches_its_own_chapters_first(self):
+        """chapter_2_road is 제5장 '잔치로 가는 길' in data/story.txt, not 제2장"""
+        keeper = self._story_keeper()
+        query = "새어머니가 시킨 일을 무시하고 몰래 잔치로 향한다"
+        self.assertEqual(keeper._chapter_scopes("chapter_2_road"), [[5, 6], [4, 5, 6, 7]])
+        self.assertEqual(self._chapters_of(keeper, keeper.retrieve(query, top_k=3, chapter="chapter_2_road"))[0], 5)
+
+        keeper.build_index()
+        keeper.chapter_max_distance = 10.0
+        chapters = self._chapters_of(keeper, keeper.retrieve(query, top_k=3, chapter="chapter_2_road"))
+        self.assertEqual(chapters[0], 5)
+        self.assertTrue(set(chapters) <= {4, 5, 6, 7})
+        chapters = self._chapters_of(keeper, keeper.retrieve("밑 빠진 독", top_k=3, chapter="chapter_1_house"))
+        self.assertTrue(set(chapters) <= {1, 2, 3, 4})
+
+    def test_hybrid_mode_keeps_scopes_and_result_cache(self):
+        keeper = self._story_keeper()
+        keeper.build_index()
+        keeper.retrieval_mode = "hybrid"
+        keeper.chapter_max_distance = 10.0
+        query = "새어머니가 시킨 일을 무시하고 몰래 잔치로 향한다"
+
+        with patch.object(keeper, '_hybrid_search', wraps=keeper._hybrid_search) as hybrid:
+            first = keeper.retrieve(query, top_k=3, chapter="chapter_2_road")
+            second = keeper.retrieve(query, top_k=3, chapter="chapter_2_road")
+        self.assertEqual(hybrid.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertTrue(set(self._chapters_of(keeper, first)) <= {4, 5, 6, 7})
+        self.assertEqual(hybrid.call_args.args[5], [[5, 6], [4, 5, 6, 7]])
+
+    def test_weak_matches_widen_to_neighbours_then_book(self):
+        keeper = self._story_keeper()
+        keeper.build_index()
+        store = MagicMock()
+        store.similarity_search_by_vector_with_relevance_scores.return_value = [(Document(page_content="x"), 5.0)]
+        store.similarity_search_by_vector.return_value = [Document(page_content="book-wide")]
+        keeper.vector_store = store
+        keeper.chapter_max_distance = 1.0
+
+        self.assertEqual(keeper.retrieve("독", top_k=1, book="story", chapter="chapter_2_road"), ["book-wide"])
+        filters = [c.kwargs["filter"] for c in store.similarity_search_by_vector_with_relevance_scores.call_args_list]
+        self.assertEqual(filters, [
+            {"$and": [{"book": "story"}, {"chapter": {"$in": [5, 6]}}]},
+            {"$and": [{"book": "story"}, {"chapter": {"$in": [4, 5, 6, 7]}}]},
+        ])
+        self.assertEqual(store.similarity_search_by_vector.call_args.kwargs["filter"], {"book": "story"})
+
+    def test_weak_keyword_matches_widen_to_the_book(self):
+        """Fallback accepts a chapter window only when its best BM25 score clears chapter_min_bm25"""
+        keeper = self._story_keeper()
+        keeper.fallback_mode = True
+        keeper.chapter_min_bm25 = 0.5
+        self.assertEqual(self._chapters_of(keeper, keeper.retrieve("원님", top_k=1, chapter="chapter_1_house")), [2])
+        keeper.chapter_min_bm25 = 1.0  # 제2장 only mentions 원님 in passing (score ~0.8)
+        self.assertEqual(self._chapters_of(keeper, keeper.retrieve("원님", top_k=1, chapter="chapter_1_house")), [8])
+
+    def test_fallback_prefers_current_chapter(self):
+        keeper = self._keeper()
+        keeper.fallback_mode = True
+        result = keeper.retrieve("콩쥐", top_k=1, chapter=1)
+        self.assertIn("제1장", result[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.impl.choice_prefetch import ChoicePrefetcher, choice_similarity
+
+CHOICES = ["밑 빠진 독에 물을 채우기 시작한다", "두꺼비를 불러 본다", "잔치에 몰래 간다"]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestChoicePrefetcher(unittest.TestCase):
+    def test_similarity(self):
+        self.assertGreaterEqual(choice_similarity("독을 고친다", "독을  고쳐 본다"), 0.5)
+        self.assertLess(choice_similarity("독을 고친다", "잔치에 간다"), 0.5)
+        self.assertEqual(choice_similarity("", "독"), 0.0)
+
+    def test_choice_and_paraphrase_hit_without_new_retrieval(self):
+        async def scenario():
+            retrieve = AsyncMock(side_effect=lambda choice, scope: [f"ctx:{choice}"])
+            prefetcher = ChoicePrefetcher(retrieve)
+            self.assertEqual(prefetcher.prefetch(CHOICES + [CHOICES[0], ""], scope=1), 3)
+            exact = await prefetcher.lookup("두꺼비를 불러 본다", 1)
+            paraphrase = await prefetcher.lookup("두꺼비를 부른다", 1)
+            other_chapter = await prefetcher.lookup("두꺼비를 불러 본다", 2)
+            unrelated = await prefetcher.lookup("팥쥐 엄마에게 따진다", 1)
+            return retrieve, prefetcher, exact, paraphrase, other_chapter, unrelated
+
+        retrieve, prefetcher, exact, paraphrase, other_chapter, unrelated = asyncio.run(scenario())
+        self.assertEqual(retrieve.await_count, 3)
+        self.assertEqual(exact, ["ctx:두꺼비를 불러 본다"])
+        self.assertEqual(paraphrase, exact)
+        self.assertIsNone(other_chapter)
+        self.assertIsNone(unrelated)
+        self.assertEqual((prefetcher.stats()["hits"], prefetcher.stats()["misses"]), (2, 2))
+
+    def test_lookup_awaits_a_retrieval_still_in_flight(self):
+        async def scenario():
+            release = asyncio.Event()
+
+            async def slow_retrieve(choice, scope):
+                await release.wait()
+                return [choice]
+
+            prefetcher = ChoicePrefetcher(slow_retrieve)
+            prefetcher.prefetch(CHOICES)
+            lookup = asyncio.create_task(prefetcher.lookup(CHOICES[2]))
+            await asyncio.sleep(0)
+            self.assertEqual(prefetcher.stats()["pending"], 3)
+            release.set()
+            return await lookup
+
+        self.assertEqual(asyncio.run(scenario()), [CHOICES[2]])
+
+    def test_expired_and_failed_entries_miss(self):
+        async def scenario():
+            clock = FakeClock()
+            failing = ChoicePrefetcher(AsyncMock(side_effect=RuntimeError("429")))
+            failing.prefetch(CHOICES)
+            failed = await failing.lookup(CHOICES[0])
+
+            prefetcher = ChoicePrefetcher(AsyncMock(return_value=["ctx"]), ttl_seconds=60, clock=clock)
+            prefetcher.prefetch(CHOICES)
+            clock.now = 61
+            expired = await prefetcher.lookup(CHOICES[0])
+            return failed, expired, prefetcher.stats()
+
+        failed, expired, stats = asyncio.run(scenario())
+        self.assertIsNone(failed)
+        self.assertIsNone(expired)
+        self.assertEqual((stats["expired"], stats["pending"]), (1, 0))
+
+
+@patch.dict(os.environ, {"AI_PROVIDER": "local"})
+class TestGameSessionPrefetch(unittest.TestCase):
+    def test_picked_choice_uses_prefetched_context(self):
+        import web_server
+
+        async def scenario():
+            keeper = MagicMock()
+            keeper.aretrieve = AsyncMock(side_effect=lambda query, *args, **kwargs: [f"ctx:{query}"])
+            session = web_server.GameSession(keeper)
+            await session.initialize()
+            prologue_choices = list(session.last_choices)
+            story = "이야기\n\n1. 두꺼비를 부른다\n2. 운다\n3. 잔치에 간다"
+            with patch.object(session.dungeon_master, 'agenerate_story', return_value=story) as generate:
+                response = await session.process_input("1")
+            await asyncio.sleep(0)
+            return keeper, prologue_choices, generate, response, session
+
+        keeper, prologue_choices, generate, response, session = asyncio.run(scenario())
+        self.assertEqual(response["type"], "story")
+        self.assertEqual(generate.call_args.args[1], [f"ctx:{prologue_choices[0]}"])
+        queried = [call.args[0] for call in keeper.aretrieve.await_args_list]
+        self.assertEqual(queried, prologue_choices + ["두꺼비를 부른다", "운다", "잔치에 간다"])
+        self.assertEqual(session.prefetcher.stats()["hits"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
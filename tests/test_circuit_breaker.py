@@ -0,0 +1,141 @@
+import unittest
+from unittest.mock import patch
+import asyncio
+import os
+import sys
+import tempfile
+from langchain_core.documents import Document
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.impl.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_after_consecutive_failures_and_probes_once(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=3, cooldown_seconds=30, clock=clock)
+        breaker.record_failure(RuntimeError("timeout"))
+        breaker.record_success()  # resets the streak
+        for _ in range(2):
+            breaker.record_failure(RuntimeError("timeout"))
+        self.assertEqual(breaker.state, CLOSED)
+        breaker.record_failure(RuntimeError("timeout"))
+        self.assertEqual(breaker.state, OPEN)
+        self.assertFalse(breaker.allow_request())
+
+        clock.now = 30
+        self.assertTrue(breaker.allow_request())
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertFalse(breaker.allow_request())  # only one probe in flight
+        breaker.record_failure(RuntimeError("timeout"))
+        self.assertEqual(breaker.state, OPEN)
+
+        clock.now = 60
+        self.assertTrue(breaker.allow_request())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CLOSED)
+        stats = breaker.stats()
+        self.assertEqual(stats["transitions"], {"closed->open": 1, "open->half_open": 2,
+                                                "half_open->open": 1, "half_open->closed": 1})
+        self.assertEqual((stats["rejected"], stats["probes"]), (2, 2))
+
+    def test_rate_limit_trips_immediately(self):
+        breaker = CircuitBreaker(failure_threshold=3, cooldown_seconds=30, clock=FakeClock())
+        breaker.record_failure(RuntimeError("429 ResourceExhausted: quota exceeded"))
+        self.assertEqual(breaker.state, OPEN)
+        self.assertEqual(breaker.stats()["rate_limited"], 1)
+        self.assertEqual(breaker.stats()["retry_in_seconds"], 30)
+
+    def test_lost_probe_is_retried_after_a_cooldown(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 10
+        self.assertTrue(breaker.allow_request())
+        clock.now = 15
+        self.assertFalse(breaker.allow_request())
+        clock.now = 20
+        self.assertTrue(breaker.allow_request())
+
+
+@patch.dict(os.environ, {"AI_PROVIDER": "offline", "LORE_VECTOR_BACKEND": "numpy", "LORE_HASH_DIM": "64"})
+class TestLoreKeeperBreaker(unittest.TestCase):
+    def test_open_breaker_skips_the_embedding_provider(self):
+        from src.impl.lore_keeper_impl import LoreKeeperImpl
+        keeper = LoreKeeperImpl()
+        keeper.db_path = tempfile.mkdtemp()
+        keeper.documents = [
+            Document(page_content="콩쥐가 밑 빠진 독에 물을 붓습니다."),
+            Document(page_content="두꺼비가 구멍을 막아 주었습니다."),
+        ]
+        keeper.build_index()
+        clock = FakeClock()
+        keeper.embedding_breaker = CircuitBreaker(failure_threshold=2, cooldown_seconds=30, clock=clock)
+        inner = type(keeper.embeddings.embeddings)
+
+        with patch.object(inner, 'embed_query', side_effect=RuntimeError("503 unavailable")) as embed:
+            for query in ["두꺼비 1", "두꺼비 2", "두꺼비 3", "두꺼비 4"]:
+                self.assertIn("두꺼비", keeper.retrieve(query, top_k=1)[0])
+            self.assertEqual(embed.call_count, 2)
+        self.assertEqual(keeper.embedding_breaker.state, OPEN)
+
+        clock.now = 30
+        self.assertIn("독", asyncio.run(keeper.aretrieve("밑 빠진 독", top_k=1))[0])
+        self.assertEqual(keeper.embedding_breaker.state, CLOSED)
+
+        metrics = keeper.get_retrieval_metrics()
+        self.assertEqual(metrics["paths"]["error"]["count"], 2)
+        self.assertEqual(metrics["paths"]["breaker"]["count"], 2)
+        self.assertEqual(metrics["breaker"]["transitions"]["half_open->closed"], 1)
+
+    def test_query_cache_hits_do_not_feed_the_breaker(self):
+        """Only real provider calls count: a cached vector neither resets the streak nor closes a half-open breaker"""
+        from src.impl.lore_keeper_impl import LoreKeeperImpl
+        keeper = LoreKeeperImpl()
+        keeper.db_path = tempfile.mkdtemp()
+        keeper.documents = [
+            Document(page_content="콩쥐가 밑 빠진 독에 물을 붓습니다."),
+            Document(page_content="두꺼비가 구멍을 막아 주었습니다."),
+        ]
+        keeper.build_index()
+        clock = FakeClock()
+        keeper.embedding_breaker = CircuitBreaker(failure_threshold=2, cooldown_seconds=30, clock=clock)
+        keeper.retrieve("두꺼비", top_k=1)  # the query vector is now cached
+        inner = type(keeper.embeddings.embeddings)
+
+        with patch.object(inner, 'embed_query', side_effect=RuntimeError("503 unavailable")) as embed:
+            keeper.retrieve("독 1", top_k=1)
+            keeper.result_cache.clear()
+            keeper.retrieve("두꺼비", top_k=1)
+            self.assertEqual(keeper.embedding_breaker.consecutive_failures, 1)
+            keeper.retrieve("독 2", top_k=1)
+            self.assertEqual(keeper.embedding_breaker.state, OPEN)
+
+            clock.now = 30
+            keeper.result_cache.clear()
+            self.assertIn("두꺼비", keeper.retrieve("두꺼비", top_k=1)[0])
+            self.assertEqual(asyncio.run(keeper.aretrieve("두꺼비", top_k=2))[0], "두꺼비가 구멍을 막아 주었습니다.")
+            self.assertEqual(keeper.embedding_breaker.state, OPEN)
+            keeper.retrieve("독 3", top_k=1)  # the real probe
+            self.assertEqual(embed.call_count, 3)
+
+            keeper.retrieval_mode = "hybrid"
+            clock.now = 60
+            self.assertIn("두꺼비가 구멍을 막아 주었습니다.", keeper.retrieve("두꺼비", top_k=2))
+            self.assertIn("두꺼비가 구멍을 막아 주었습니다.", asyncio.run(keeper.aretrieve("두꺼비", top_k=2)))
+            self.assertEqual((keeper.embedding_breaker.state, embed.call_count), (OPEN, 3))
+        self.assertEqual(keeper.embedding_breaker.stats()["transitions"],
+                         {"closed->open": 1, "open->half_open": 1, "half_open->open": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
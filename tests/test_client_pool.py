@@ -0,0 +1,78 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.impl.client_pool import KeyedClientPool
+
+
+class TestKeyedClientPool(unittest.TestCase):
+    def test_reuses_client_per_key(self):
+        factory = MagicMock(side_effect=lambda key: object())
+        pool = KeyedClientPool(factory)
+
+        first = pool.get("key-a")
+        self.assertIs(pool.get("key-a"), first)
+        self.assertIsNot(pool.get("key-b"), first)
+        self.assertEqual(factory.call_count, 2)
+        self.assertEqual(pool.stats()["hits"], 1)
+
+    def test_raw_key_not_stored(self):
+        pool = KeyedClientPool(lambda key: object())
+        pool.get("secret-key")
+        self.assertNotIn("secret-key", pool._entries)
+
+    def test_lru_eviction(self):
+        evicted = []
+        pool = KeyedClientPool(lambda key: key.upper(), max_size=2, on_evict=evicted.append)
+        pool.get("a")
+        pool.get("b")
+        pool.get("a")
+        pool.get("c")
+
+        self.assertEqual(evicted, ["B"])
+        self.assertEqual(len(pool), 2)
+
+    def test_idle_expiry(self):
+        factory = MagicMock(side_effect=lambda key: object())
+        pool = KeyedClientPool(factory, idle_ttl=60)
+        with patch('src.impl.client_pool.time.monotonic', return_value=100.0):
+            pool.get("a")
+        with patch('src.impl.client_pool.time.monotonic', return_value=200.0):
+            pool.get("a")
+
+        self.assertEqual(factory.call_count, 2)
+        self.assertEqual(pool.stats()["expirations"], 1)
+
+    def test_factory_error_not_pooled(self):
+        pool = KeyedClientPool(MagicMock(side_effect=ValueError("bad key")))
+        with self.assertRaises(ValueError):
+            pool.get("bad")
+        self.assertEqual(len(pool), 0)
+
+
+class TestLoreKeeperByokPool(unittest.TestCase):
+    @patch.dict(os.environ, {"AI_PROVIDER": "local"})
+    @patch('src.impl.lore_keeper_impl.Chroma')
+    @patch('src.impl.lore_keeper_impl.GoogleGenerativeAIEmbeddings')
+    def test_byok_clients_reused_and_isolated(self, mock_google, mock_chroma):
+        from src.impl.lore_keeper_impl import LoreKeeperImpl
+        keeper = LoreKeeperImpl()
+        keeper.vector_store = MagicMock()
+        global_embeddings = keeper.embeddings
+
+        store_a, embeddings_a = keeper._resolve_search_target("user-key-a")
+        store_a2, _ = keeper._resolve_search_target("user-key-a")
+        store_b, _ = keeper._resolve_search_target("user-key-b")
+
+        self.assertIs(store_a, store_a2)
+        self.assertEqual(mock_google.call_count, 2)
+        self.assertEqual(mock_google.call_args_list[0].kwargs["google_api_key"], "user-key-a")
+        self.assertIsNot(embeddings_a, global_embeddings)
+        self.assertIs(keeper.embeddings, global_embeddings)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.impl.context_assembler import ContextAssembler, estimate_tokens, merge_spans, truncate_to_tokens
+
+SOURCE = "콩쥐는 물을 길었습니다. 독은 밑이 빠져 있었습니다. 두꺼비가 나타났습니다. 구멍을 막아 주었습니다. 잔치에 갔습니다."
+
+
+def chunk(start, end):
+    return SOURCE[start:end]
+
+
+class TestContextAssembler(unittest.TestCase):
+    def setUp(self):
+        self.positions = {}
+
+    def _locate(self, text):
+        return self.positions.get(text)
+
+    def _chunks(self, *ranges):
+        chunks = []
+        for start, end in ranges:
+            text = chunk(start, end)
+            self.positions[text] = ("story", start)
+            chunks.append(text)
+        return chunks
+
+    def test_estimate_tokens(self):
+        self.assertEqual(estimate_tokens(""), 0)
+        self.assertEqual(estimate_tokens("콩쥐"), 2)
+        self.assertEqual(estimate_tokens("abcdefgh"), 2)
+
+    def test_merge_overlapping_and_adjacent(self):
+        spans = [("a", 10, "klmno", 0), ("a", 0, "abcdefghijkl", 1), ("a", 15, "pq", 2), ("b", 0, "zz", 3)]
+        self.assertEqual(merge_spans(spans), [("a", 0, "abcdefghijklmnopq", 0), ("b", 0, "zz", 3)])
+        # A chunk fully inside another adds nothing
+        self.assertEqual(merge_spans([("a", 0, "abcdef", 1), ("a", 2, "cd", 0)]), [("a", 0, "abcdef", 0)])
+
+    def test_overlapping_chunks_become_one_block(self):
+        chunks = self._chunks((0, 40), (30, 70), (90, len(SOURCE)))
+        assembler = ContextAssembler(token_budget=0, locate=self._locate)
+        context, stats = assembler.assemble(chunks)
+        self.assertEqual(context, [SOURCE[0:70], SOURCE[90:]])
+        self.assertGreater(stats["tokens_saved"], 0)
+        self.assertEqual(stats["tokens_out"], estimate_tokens(SOURCE[0:70]) + estimate_tokens(SOURCE[90:]))
+
+    def test_budget_drops_lowest_ranked_blocks_first(self):
+        chunks = self._chunks((50, 80), (0, 20))
+        budget = estimate_tokens(chunks[0]) + 5
+        context, stats = ContextAssembler(token_budget=budget, locate=self._locate, min_tail_tokens=10).assemble(chunks)
+        self.assertEqual(context, [chunks[0]])
+        self.assertLessEqual(stats["tokens_out"], budget)
+
+    def test_unknown_chunks_are_kept_and_deduplicated(self):
+        context, stats = ContextAssembler(token_budget=0).assemble(["가나다", "가나다", "라마"])
+        self.assertEqual(context, ["가나다", "라마"])
+        self.assertEqual(stats["tokens_saved"], 3)
+
+    def test_truncate_prefers_sentence_end(self):
+        text = truncate_to_tokens(SOURCE, 30)
+        self.assertTrue(SOURCE.startswith(text))
+        self.assertTrue(text.endswith("다."))
+        self.assertLessEqual(estimate_tokens(text), 30)
+
+
+@patch.dict(os.environ, {"AI_PROVIDER": "offline", "LORE_VECTOR_BACKEND": "numpy", "LORE_HASH_DIM": "64"})
+class TestLoreKeeperLocate(unittest.TestCase):
+    def test_locate_chunk_uses_start_index(self):
+        from src.impl.lore_keeper_impl import LoreKeeperImpl
+        keeper = LoreKeeperImpl()
+        keeper.chunk_size, keeper.chunk_overlap = 40, 15
+        text = "## 제1장\n\n" + SOURCE
+        keeper.documents = keeper._split_text(text, {"book": "story"})
+        self.assertGreater(len(keeper.documents), 2)
+
+        chunks = [doc.page_content for doc in keeper.documents]
+        for content in chunks:
+            book, start = keeper.locate_chunk(content)
+            self.assertEqual((book, text[start:start + len(content)]), ("story", content))
+        self.assertIsNone(keeper.locate_chunk("없는 청크"))
+
+        context, _ = ContextAssembler(token_budget=0, locate=keeper.locate_chunk).assemble(chunks)
+        self.assertEqual(len(context), 1)
+        self.assertEqual(context[0].split(), text.split())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 from unittest.mock import MagicMock, patch
 from typing import List
+import asyncio
 import os
 import sys
 
@@ -45,6 +46,74 @@ class TestDungeonMasterImpl(unittest.TestCase):
         # We'll just verify result for now.
         self.assertEqual(result, "Generated story")
 
+    @patch.dict(os.environ, {"AI_PROVIDER": "local"})
+    @patch('src.impl.dungeon_master_impl.ChatOllama')
+    def test_overlapping_context_is_merged_before_prompting(self, mock_chat_cls):
+        """Chunks that overlap in the source are sent once, and the saving is recorded"""
+        mock_llm = mock_chat_cls.return_value
+        mock_llm.invoke.return_value = MagicMock(content="Generated story")
+        positions = {"콩쥐가 물을 길었다": ("story", 0), "물을 길었다 그러나 독이": ("story", 4)}
+
+        dm = self.impl_class()
+        dm.set_chunk_locator(positions.get)
+        dm.generate_story("Fill the jar", list(positions))
+
+        prompt = mock_llm.invoke.call_args[0][0][1].content
+        self.assertIn("콩쥐가 물을 길었다 그러나 독이", prompt)
+        self.assertEqual(prompt.count("길었다"), 1)
+        self.assertGreater(dm.last_context_stats["tokens_saved"], 0)
+
+    @patch.dict(os.environ, {"AI_PROVIDER": "local"})
+    @patch('src.impl.dungeon_master_impl.ChatOllama')
+    def test_astream_story_yields_deltas_without_scene_tag(self, mock_chat_cls):
+        """Deltas stream as they arrive; a tag split across chunks never reaches the player"""
+        from src.impl.game_state_impl import GameStateImpl
+
+        async def stream(messages):
+            for text in ["콩쥐가 ", "", "독을 막았습니다.", " [SCENE_", "RESOLVED]", "\n1. 집을 나선다"]:
+                yield MagicMock(content=text)
+
+        mock_chat_cls.return_value.astream = stream
+        dm = self.impl_class(game_state=GameStateImpl())
+
+        async def collect():
+            return [delta async for delta in dm.astream_story("진흙으로 막는다", ["Context"])]
+
+        deltas = asyncio.run(collect())
+        self.assertNotIn("[", "".join(deltas))
+        self.assertEqual("".join(deltas), "콩쥐가 독을 막았습니다. \n1. 집을 나선다")
+        self.assertIn("다음 챕터로 이동합니다", dm.last_story)
+        self.assertEqual(dm.game_state.get_scene()["chapter"], "chapter_2_road")
+        self.assertEqual(dm.conversation_history[-1]["ai"], dm.last_story)
+        self.assertEqual(dm.last_generation_stats["deltas"], 5)
+        self.assertIsNotNone(dm.last_generation_stats["ttft_ms"])
+
+    @patch.dict(os.environ, {"AI_PROVIDER": "local"})
+    @patch('src.impl.dungeon_master_impl.ChatOllama')
+    def test_agenerate_story_is_cancellable(self, mock_chat_cls):
+        """agenerate_story awaits ainvoke; a cancelled turn leaves no trace in the history"""
+        from unittest.mock import AsyncMock
+        mock_llm = mock_chat_cls.return_value
+        mock_llm.ainvoke = AsyncMock(return_value=MagicMock(content="Generated story"))
+        dm = self.impl_class()
+        self.assertEqual(asyncio.run(dm.agenerate_story("Fill the jar", ["Context"])), "Generated story")
+        mock_llm.invoke.assert_not_called()
+
+        async def hang(messages):
+            await asyncio.sleep(60)
+
+        mock_llm.ainvoke = AsyncMock(side_effect=hang)
+
+        async def cancel_midway():
+            task = asyncio.create_task(dm.agenerate_story("Leave", ["Context"]))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_midway())
+        self.assertEqual([turn["user"] for turn in dm.conversation_history], ["Fill the jar"])
+
     def test_set_system_prompt(self):
         dm = self.impl_class()
         dm.set_system_prompt("New Persona")
@@ -62,9 +62,11 @@ class TestE2EScenarios:
     """E2E 시나리오 테스트"""
     
     @pytest.fixture(autouse=True)
-    def setup(self):
+    def setup(self, tmp_path):
         """각 테스트 전 설정"""
         self.test_story_path = os.path.join(project_root, "data", "e2e_test_story.txt")
+        # 인덱스(체크포인트 포함)는 저장소의 chroma_db_local 대신 임시 폴더에 생성
+        self.index_dir = str(tmp_path / "index")
         
         # 테스트용 스토리 파일 생성
         os.makedirs(os.path.dirname(self.test_story_path), exist_ok=True)
@@ -104,6 +106,7 @@ class TestE2EScenarios:
         # Given: 게임 컴포넌트 초기화
         game_state = GameStateImpl()
         lore_keeper = LoreKeeperImpl()
+        lore_keeper.db_path = self.index_dir
         dungeon_master = DungeonMasterImpl(game_state=game_state)
         
         # 스토리 로딩
@@ -148,6 +151,7 @@ class TestE2EScenarios:
         # Given: 게임 컴포넌트 초기화
         game_state = GameStateImpl()
         lore_keeper = LoreKeeperImpl()
+        lore_keeper.db_path = self.index_dir
         dungeon_master = DungeonMasterImpl(game_state=game_state)
         
         lore_keeper.load_book(self.test_story_path)
@@ -263,6 +267,7 @@ class TestE2EScenarios:
         # Given: 게임 루프 설정
         game_state = GameStateImpl()
         lore_keeper = LoreKeeperImpl()
+        lore_keeper.db_path = self.index_dir
         dungeon_master = DungeonMasterImpl(game_state=game_state)
         
         # Mock IO
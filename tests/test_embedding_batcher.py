@@ -0,0 +1,188 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+import asyncio
+import os
+import sys
+import threading
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.impl.embedding_batcher import (
+    EmbeddingBatcher, AsyncEmbeddingBatcher, BatchedEmbeddings, query_batch_fn, async_query_batch_fn
+)
+
+
+def fake_batch(texts):
+    return [[float(len(t))] for t in texts]
+
+
+async def afake_batch(texts):
+    await asyncio.sleep(0)
+    return fake_batch(texts)
+
+
+class TestEmbeddingBatcher(unittest.TestCase):
+    def test_concurrent_queries_share_one_call(self):
+        batch_fn = MagicMock(side_effect=fake_batch)
+        batcher = EmbeddingBatcher(batch_fn, max_batch_size=8, max_wait_ms=200)
+        texts = ["1", "거부한다", "두꺼비를 도와준다", "22"]
+        results = {}
+
+        def worker(text):
+            results[text] = batcher.embed(text)
+
+        threads = [threading.Thread(target=worker, args=(t,)) for t in texts]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        batcher.close()
+
+        batch_fn.assert_called_once()
+        self.assertEqual(results["거부한다"], [4.0])
+        self.assertEqual(results["두꺼비를 도와준다"], [9.0])
+        self.assertEqual(batcher.stats()["batch_size_histogram"], {4: 1})
+
+    def test_size_cap_splits_batches(self):
+        batch_fn = MagicMock(side_effect=fake_batch)
+        batcher = EmbeddingBatcher(batch_fn, max_batch_size=2, max_wait_ms=50)
+        futures = [batcher.submit(str(i)) for i in range(5)]
+        self.assertEqual([f.result()[0] for f in futures], [1.0] * 5)
+        batcher.close()
+
+        stats = batcher.stats()
+        self.assertEqual(stats["queries"], 5)
+        self.assertTrue(all(size <= 2 for size in stats["batch_size_histogram"]))
+
+    def test_duplicate_queries_deduplicated(self):
+        batch_fn = MagicMock(side_effect=fake_batch)
+        batcher = EmbeddingBatcher(batch_fn, max_batch_size=4, max_wait_ms=100)
+        futures = [batcher.submit("1") for _ in range(3)]
+        for f in futures:
+            self.assertEqual(f.result(), [1.0])
+        batcher.close()
+        batch_fn.assert_called_once_with(["1"])
+
+    def test_errors_reach_every_caller(self):
+        batcher = EmbeddingBatcher(MagicMock(side_effect=RuntimeError("429")), max_wait_ms=20)
+        futures = [batcher.submit("a"), batcher.submit("b")]
+        for f in futures:
+            with self.assertRaises(RuntimeError):
+                f.result()
+        batcher.close()
+
+    def test_async_callers(self):
+        batcher = EmbeddingBatcher(fake_batch, max_batch_size=8, max_wait_ms=50)
+
+        async def run():
+            return await asyncio.gather(*(batcher.aembed(t) for t in ["a", "bb", "ccc"]))
+
+        self.assertEqual(asyncio.run(run()), [[1.0], [2.0], [3.0]])
+        self.assertEqual(batcher.stats()["batches"], 1)
+        self.assertGreaterEqual(batcher.stats()["queue_delay_ms_p99"], 0.0)
+        batcher.close()
+
+    def test_cancelled_caller_does_not_fail_the_batch(self):
+        batcher = EmbeddingBatcher(fake_batch, max_batch_size=8, max_wait_ms=100)
+
+        async def run():
+            tasks = [asyncio.create_task(batcher.aembed(t)) for t in ["a", "bb", "ccc"]]
+            await asyncio.sleep(0.01)
+            tasks[1].cancel()
+            return await asyncio.gather(*tasks, return_exceptions=True)
+
+        first, cancelled, third = asyncio.run(run())
+        batcher.close()
+        self.assertIsInstance(cancelled, asyncio.CancelledError)
+        self.assertEqual((first, third), ([1.0], [3.0]))
+        self.assertEqual(batcher.stats()["batches"], 1)
+
+
+class TestAsyncEmbeddingBatcher(unittest.TestCase):
+    def test_concurrent_coroutines_share_one_call(self):
+        abatch_fn = AsyncMock(side_effect=afake_batch)
+        batcher = AsyncEmbeddingBatcher(abatch_fn, max_batch_size=8, max_wait_ms=50)
+
+        async def run():
+            return await asyncio.gather(*(batcher.aembed(t) for t in ["a", "bb", "ccc", "bb"]))
+
+        self.assertEqual(asyncio.run(run()), [[1.0], [2.0], [3.0], [2.0]])
+        abatch_fn.assert_awaited_once_with(["a", "bb", "ccc"])
+        self.assertEqual(batcher.stats()["batch_size_histogram"], {4: 1})
+
+    def test_full_batch_is_sent_before_the_window_ends(self):
+        abatch_fn = AsyncMock(side_effect=afake_batch)
+        batcher = AsyncEmbeddingBatcher(abatch_fn, max_batch_size=2, max_wait_ms=10000)
+
+        async def run():
+            return await asyncio.wait_for(asyncio.gather(*(batcher.aembed(str(i)) for i in range(4))), 5)
+
+        self.assertEqual(asyncio.run(run()), [[1.0]] * 4)
+        self.assertEqual(batcher.stats()["batch_size_histogram"], {2: 2})
+
+    def test_cancelled_caller_does_not_fail_the_batch(self):
+        batcher = AsyncEmbeddingBatcher(afake_batch, max_batch_size=8, max_wait_ms=50)
+
+        async def run():
+            tasks = [asyncio.create_task(batcher.aembed(t)) for t in ["a", "bb", "ccc"]]
+            await asyncio.sleep(0.01)
+            tasks[1].cancel()
+            return await asyncio.gather(*tasks, return_exceptions=True)
+
+        first, cancelled, third = asyncio.run(run())
+        self.assertIsInstance(cancelled, asyncio.CancelledError)
+        self.assertEqual((first, third), ([1.0], [3.0]))
+        self.assertEqual(batcher.stats()["queries"], 2)
+
+    def test_errors_reach_every_caller_and_new_loops_get_a_fresh_queue(self):
+        batcher = AsyncEmbeddingBatcher(AsyncMock(side_effect=RuntimeError("429")), max_wait_ms=10)
+
+        async def run():
+            return await asyncio.gather(batcher.aembed("a"), batcher.aembed("b"), return_exceptions=True)
+
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in asyncio.run(run())))
+        batcher.abatch_fn = afake_batch
+        self.assertEqual(asyncio.run(run()), [[1.0], [1.0]])
+        self.assertEqual(batcher.stats()["batches"], 2)
+
+
+class TestBatchedEmbeddings(unittest.TestCase):
+    def test_query_task_type_is_passed(self):
+        backend = MagicMock()
+        backend.embed_documents.return_value = [[0.5]]
+        batcher = EmbeddingBatcher(query_batch_fn(backend, "RETRIEVAL_QUERY"), max_wait_ms=1)
+        embeddings = BatchedEmbeddings(backend, batcher)
+
+        self.assertEqual(embeddings.embed_query("1"), [0.5])
+        backend.embed_documents.assert_called_once_with(["1"], task_type="RETRIEVAL_QUERY")
+        backend.embed_query.assert_not_called()
+        batcher.close()
+
+    def test_async_queries_use_the_async_batcher(self):
+        backend = MagicMock()
+        backend.aembed_documents = AsyncMock(return_value=[[0.5], [0.75]])
+        async_batcher = AsyncEmbeddingBatcher(async_query_batch_fn(backend, "RETRIEVAL_QUERY"), max_wait_ms=50)
+        embeddings = BatchedEmbeddings(backend, MagicMock(), async_batcher)
+
+        async def run():
+            return await asyncio.gather(embeddings.aembed_query("1"), embeddings.aembed_query("2"))
+
+        self.assertEqual(asyncio.run(run()), [[0.5], [0.75]])
+        backend.aembed_documents.assert_awaited_once_with(["1", "2"], task_type="RETRIEVAL_QUERY")
+        backend.aembed_query.assert_not_called()
+
+    def test_async_query_uses_native_client(self):
+        backend = MagicMock()
+        backend.aembed_query = AsyncMock(return_value=[0.25])
+        batch_fn = MagicMock(side_effect=fake_batch)
+        batcher = EmbeddingBatcher(batch_fn, max_wait_ms=1)
+        embeddings = BatchedEmbeddings(backend, batcher)
+
+        self.assertEqual(asyncio.run(embeddings.aembed_query("1")), [0.25])
+        backend.aembed_query.assert_awaited_once_with("1")
+        batch_fn.assert_not_called()
+        batcher.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.impl.embedding_cache import QueryEmbeddingCache, CachedEmbeddings
+
+
+class TestQueryEmbeddingCache(unittest.TestCase):
+    def test_normalized_query_hits(self):
+        """Whitespace/case variants of the same query share an entry"""
+        cache = QueryEmbeddingCache()
+        cache.put("두꺼비를 도와준다", "model-a", [0.1, 0.2])
+
+        self.assertEqual(cache.get("  두꺼비를   도와준다 ", "model-a"), [0.1, 0.2])
+        self.assertIsNone(cache.get("두꺼비를 도와준다", "model-b"))
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_lru_eviction(self):
+        cache = QueryEmbeddingCache(max_entries=2)
+        cache.put("1", "m", [1.0])
+        cache.put("2", "m", [2.0])
+        cache.get("1", "m")  # "1" becomes most recent
+        cache.put("3", "m", [3.0])
+
+        self.assertIsNone(cache.get("2", "m"))
+        self.assertEqual(cache.get("1", "m"), [1.0])
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_ttl_expiry(self):
+        cache = QueryEmbeddingCache(ttl_seconds=10)
+        with patch('src.impl.embedding_cache.time.time', return_value=1000.0):
+            cache.put("거부한다", "m", [1.0])
+        with patch('src.impl.embedding_cache.time.time', return_value=1005.0):
+            self.assertEqual(cache.get("거부한다", "m"), [1.0])
+        with patch('src.impl.embedding_cache.time.time', return_value=1011.0):
+            self.assertIsNone(cache.get("거부한다", "m"))
+
+    def test_disk_tier_survives_restart(self):
+        db_path = os.path.join(tempfile.mkdtemp(), "query_cache.sqlite3")
+        QueryEmbeddingCache(db_path=db_path).put("1", "m", [0.5, -0.25])
+
+        restarted = QueryEmbeddingCache(db_path=db_path)
+        self.assertEqual(restarted.get("1", "m"), [0.5, -0.25])
+        self.assertEqual(restarted.stats()["disk_hits"], 1)
+
+
+class TestCachedEmbeddings(unittest.TestCase):
+    def test_embed_query_calls_backend_once(self):
+        backend = MagicMock()
+        backend.embed_query.return_value = [0.3, 0.4]
+        embeddings = CachedEmbeddings(backend, QueryEmbeddingCache(), "m")
+
+        self.assertEqual(embeddings.embed_query("1"), [0.3, 0.4])
+        self.assertEqual(embeddings.embed_query("1"), [0.3, 0.4])
+        backend.embed_query.assert_called_once_with("1")
+
+    def test_shared_cache_across_api_keys(self):
+        """Two clients (different BYOK keys) with the same model share hits"""
+        cache = QueryEmbeddingCache()
+        key_a, key_b = MagicMock(), MagicMock()
+        key_a.embed_query.return_value = [1.0]
+        CachedEmbeddings(key_a, cache, "m").embed_query("거부한다")
+        CachedEmbeddings(key_b, cache, "m").embed_query("거부한다")
+
+        key_b.embed_query.assert_not_called()
+
+    def test_async_embed_query_uses_cache(self):
+        backend = MagicMock()
+        backend.aembed_query.side_effect = lambda text: asyncio.sleep(0, result=[0.9])
+        embeddings = CachedEmbeddings(backend, QueryEmbeddingCache(), "m")
+
+        async def run():
+            return [await embeddings.aembed_query("1"), await embeddings.aembed_query("1")]
+
+        self.assertEqual(asyncio.run(run()), [[0.9], [0.9]])
+        backend.aembed_query.assert_called_once()
+
+    def test_async_disk_tier_io_runs_in_a_worker_thread(self):
+        """With a SQLite tier, aembed_query reads/writes disk off the event loop; memory hits stay inline"""
+        db_path = os.path.join(tempfile.mkdtemp(), "query_cache.sqlite3")
+        QueryEmbeddingCache(db_path=db_path).put("1", "m", [0.5])
+        backend = MagicMock()
+        backend.aembed_query.side_effect = lambda text: asyncio.sleep(0, result=[0.9])
+        cache = QueryEmbeddingCache(db_path=db_path)
+        embeddings = CachedEmbeddings(backend, cache, "m")
+        offloaded = []
+        to_thread = asyncio.to_thread
+
+        async def record(func, *args):
+            offloaded.append(func.__name__)
+            return await to_thread(func, *args)
+
+        async def run():
+            return [await embeddings.aembed_query(q) for q in ["1", "1", "2"]]
+
+        with patch('src.impl.embedding_cache.asyncio.to_thread', new=record):
+            self.assertEqual(asyncio.run(run()), [[0.5], [0.5], [0.9]])
+        self.assertEqual(offloaded, ["get", "get", "put"])
+        self.assertEqual(QueryEmbeddingCache(db_path=db_path).get("2", "m"), [0.9])
+        self.assertEqual((cache.stats()["disk_hits"], cache.stats()["misses"]), (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
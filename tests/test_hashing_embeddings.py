@@ -0,0 +1,83 @@
+import unittest
+from unittest.mock import patch
+import asyncio
+import os
+import sys
+import tempfile
+import numpy as np
+from langchain_core.documents import Document
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.impl.hashing_embeddings import HashingEmbeddings
+
+STORY = [
+    "콩쥐는 밑 빠진 독에 물을 길어 붓느라 애를 썼습니다. 그때 두꺼비가 나타나 구멍을 막아 주었습니다.",
+    "팥쥐 어머니는 콩쥐에게 벼 한 섬을 찧으라고 시켰습니다. 참새 떼가 날아와 벼를 쪼아 주었습니다.",
+    "원님이 잔치를 열자 콩쥐는 꽃신을 잃어버렸고, 원님은 꽃신의 주인을 찾아 나섰습니다.",
+]
+
+
+class TestHashingEmbeddings(unittest.TestCase):
+    def test_deterministic_and_normalized(self):
+        a = HashingEmbeddings(dimension=256).embed_query("두꺼비가 독을 막았다")
+        b = HashingEmbeddings(dimension=256).embed_query("두꺼비가  독을 막았다 ")
+        self.assertEqual(a, b)
+        self.assertEqual(len(a), 256)
+        self.assertAlmostEqual(float(np.linalg.norm(a)), 1.0, places=5)
+        self.assertNotEqual(a, HashingEmbeddings(dimension=256, seed=1).embed_query("두꺼비가 독을 막았다"))
+
+    def test_empty_text(self):
+        self.assertEqual(HashingEmbeddings(dimension=8).embed_query("   "), [0.0] * 8)
+
+    def test_related_text_is_closer(self):
+        emb = HashingEmbeddings()
+        docs = np.array(emb.embed_documents(STORY))
+        for query, expected in (("두꺼비가 독 구멍을 막음", 0), ("참새가 벼를 쪼다", 1), ("잃어버린 꽃신", 2)):
+            self.assertEqual(int(np.argmax(docs @ np.array(emb.embed_query(query)))), expected)
+
+    def test_async_matches_sync(self):
+        emb = HashingEmbeddings(dimension=64)
+        self.assertEqual(asyncio.run(emb.aembed_query("콩쥐")), emb.embed_query("콩쥐"))
+
+    def test_bulk_matrix_matches_per_text_vectors(self):
+        emb = HashingEmbeddings(dimension=128)
+        chunks = [(" ".join(STORY) * 4)[i:i + 1000] for i in range(300)]
+        matrix = emb.embed_array(chunks)
+        self.assertEqual((matrix.shape, matrix.dtype), ((300, 128), np.float32))
+        np.testing.assert_allclose(np.linalg.norm(matrix, axis=1), 1.0, rtol=1e-5)
+        for i in (0, 149, 299):
+            np.testing.assert_array_equal(matrix[i], np.array(emb.embed_query(chunks[i]), dtype=np.float32))
+        self.assertEqual(emb.embed_documents(chunks[:2]), matrix[:2].tolist())
+
+
+@patch.dict(os.environ, {"AI_PROVIDER": "offline", "LORE_HASH_DIM": "128"})
+class TestOfflineProvider(unittest.TestCase):
+    def _keeper(self, backend):
+        with patch.dict(os.environ, {"LORE_VECTOR_BACKEND": backend}):
+            from src.impl.lore_keeper_impl import LoreKeeperImpl
+            keeper = LoreKeeperImpl()
+        keeper.db_path = tempfile.mkdtemp()
+        keeper.documents = [Document(page_content=text, metadata={"book": "kongjwi"}) for text in STORY]
+        keeper.build_index()
+        return keeper
+
+    def test_build_and_retrieve_without_network(self):
+        for backend in ("numpy", "chroma"):
+            with self.subTest(backend=backend):
+                keeper = self._keeper(backend)
+                self.assertFalse(keeper.fallback_mode)
+                self.assertIsInstance(keeper.embeddings.embeddings, HashingEmbeddings)
+                self.assertEqual(keeper.model_name, "hashing-ngram1-3-d128")
+                self.assertIn("두꺼비", keeper.retrieve("두꺼비가 독을 막아 줌", top_k=1)[0])
+                self.assertIn("참새", asyncio.run(keeper.aretrieve("참새 떼", top_k=1))[0])
+
+    def test_user_key_does_not_switch_embedder(self):
+        keeper = self._keeper("numpy")
+        with patch('src.impl.lore_keeper_impl.GoogleGenerativeAIEmbeddings') as mock_google:
+            self.assertIn("꽃신", keeper.retrieve("꽃신", top_k=1, api_key="user-key")[0])
+        mock_google.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
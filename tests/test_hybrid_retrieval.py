@@ -0,0 +1,69 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import os
+import sys
+import time
+from langchain_core.documents import Document
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.impl.rank_fusion import reciprocal_rank_fusion
+
+
+class TestReciprocalRankFusion(unittest.TestCase):
+    def test_items_in_both_lists_rank_first(self):
+        fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "d", "a"]])
+        self.assertEqual(fused[:2], ["a", "c"])
+        self.assertEqual(set(fused), {"a", "b", "c", "d"})
+
+    def test_top_k(self):
+        self.assertEqual(reciprocal_rank_fusion([["a", "b"], ["b"]], top_k=1), ["b"])
+
+    def test_empty(self):
+        self.assertEqual(reciprocal_rank_fusion([[], []]), [])
+
+
+class TestHybridRetrieval(unittest.TestCase):
+    @patch.dict(os.environ, {"AI_PROVIDER": "local", "LORE_RETRIEVAL_MODE": "hybrid",
+                             "LORE_VECTOR_DEADLINE_MS": "100"})
+    def setUp(self):
+        from src.impl.lore_keeper_impl import LoreKeeperImpl
+        self.keeper = LoreKeeperImpl()
+        self.keeper.documents = [
+            Document(page_content="콩쥐는 집안일을 했습니다."),
+            Document(page_content="두꺼비가 독의 구멍을 막아 주었습니다."),
+            Document(page_content="참새들이 쌀을 골라 주었습니다."),
+        ]
+
+    def test_fuses_vector_and_lexical(self):
+        store = MagicMock()
+        store.similarity_search.return_value = [self.keeper.documents[2], self.keeper.documents[1]]
+        self.keeper.vector_store = store
+
+        results = self.keeper.retrieve("두꺼비를 도와준다", top_k=2)
+        # chunk 1 is ranked by both sides
+        self.assertEqual(results[0], "두꺼비가 독의 구멍을 막아 주었습니다.")
+        self.assertEqual(len(results), 2)
+
+    def test_slow_vector_search_returns_lexical(self):
+        store = MagicMock()
+        store.similarity_search.side_effect = lambda query, k: time.sleep(0.5) or []
+        self.keeper.vector_store = store
+
+        started = time.perf_counter()
+        results = self.keeper.retrieve("참새", top_k=3)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(results, ["참새들이 쌀을 골라 주었습니다."])
+        self.assertLess(elapsed, 0.4)
+
+    def test_vector_error_returns_lexical(self):
+        store = MagicMock()
+        store.similarity_search.side_effect = RuntimeError("429 ResourceExhausted")
+        self.keeper.vector_store = store
+
+        self.assertEqual(self.keeper.retrieve("참새", top_k=3), ["참새들이 쌀을 골라 주었습니다."])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+from unittest.mock import patch
+import json
+import os
+import sys
+import tempfile
+import numpy as np
+from langchain_core.documents import Document
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.impl.index_snapshot import SNAPSHOT_VERSION, read_manifest, read_snapshot, write_snapshot
+
+
+class TestSnapshotFile(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "snap", "lore.npz")
+        self.matrix = np.random.default_rng(0).normal(size=(6, 8)).astype(np.float32)
+        self.ids = [f"id{i}" for i in range(6)]
+        self.texts = [f"콩쥐 {i}" for i in range(6)]
+        self.metadatas = [{"book": "story", "chapter": i % 3} for i in range(6)]
+
+    def test_round_trip_is_memory_mapped(self):
+        write_snapshot(self.path, {"model": "m"}, self.ids, self.texts, self.metadatas, self.matrix)
+        snapshot = read_snapshot(self.path)
+        self.assertIsInstance(snapshot["matrix"], np.memmap)
+        np.testing.assert_array_equal(snapshot["matrix"], self.matrix)
+        np.testing.assert_allclose(snapshot["sq_norms"], (self.matrix ** 2).sum(axis=1), rtol=1e-5)
+        self.assertEqual((snapshot["ids"], snapshot["texts"], snapshot["metadatas"]),
+                         (self.ids, self.texts, self.metadatas))
+        manifest = snapshot["manifest"]
+        self.assertEqual((manifest["version"], manifest["chunk_count"], manifest["dimension"]),
+                         (SNAPSHOT_VERSION, 6, 8))
+
+        self.assertNotIsInstance(read_snapshot(self.path, mmap=False)["matrix"], np.memmap)
+
+    def test_rejects_other_versions(self):
+        write_snapshot(self.path, {"model": "m"}, self.ids, self.texts, self.metadatas, self.matrix)
+        with np.load(self.path) as archive:
+            arrays = {name: archive[name] for name in archive.files}
+        manifest = json.loads(bytes(arrays["manifest"]).decode("utf-8"))
+        manifest["version"] = SNAPSHOT_VERSION + 1
+        arrays["manifest"] = np.frombuffer(json.dumps(manifest).encode("utf-8"), dtype=np.uint8)
+        with open(self.path, 'wb') as f:
+            np.savez(f, **arrays)
+        with self.assertRaises(ValueError):
+            read_manifest(self.path)
+
+
+@patch.dict(os.environ, {"AI_PROVIDER": "offline", "LORE_VECTOR_BACKEND": "numpy", "LORE_HASH_DIM": "64"})
+class TestLoreKeeperSnapshot(unittest.TestCase):
+    def _built_keeper(self):
+        from src.impl.lore_keeper_impl import LoreKeeperImpl
+        keeper = LoreKeeperImpl()
+        keeper.db_path = tempfile.mkdtemp()
+        keeper.documents = [
+            Document(page_content="콩쥐가 밑 빠진 독에 물을 붓습니다.", metadata={"book": "story", "chapter": 1}),
+            Document(page_content="두꺼비가 구멍을 막아 주었습니다.", metadata={"book": "story", "chapter": 1}),
+            Document(page_content="참새 떼가 곡식을 골라 주었습니다.", metadata={"book": "story", "chapter": 2}),
+        ]
+        keeper.books = {"story": {"title": "콩쥐팥쥐", "path": "data/story.txt", "hash": "h", "chunks": 3}}
+        keeper.build_index()
+        return keeper
+
+    def test_server_loads_snapshot_without_embedding_documents(self):
+        from src.impl.lore_keeper_impl import LoreKeeperImpl
+        from src.impl.hashing_embeddings import HashingEmbeddings
+        path = os.path.join(tempfile.mkdtemp(), "lore.npz")
+        built = self._built_keeper()
+        built.save_snapshot(path)
+        expected = built.retrieve("두꺼비", top_k=1)
+
+        with patch.object(HashingEmbeddings, 'embed_documents', side_effect=AssertionError("re-embedded")):
+            keeper = LoreKeeperImpl()
+            self.assertTrue(keeper.load_snapshot(path))
+        self.assertEqual(keeper.retrieve("두꺼비", top_k=1), expected)
+        self.assertEqual(keeper.books["story"]["title"], "콩쥐팥쥐")
+        self.assertEqual(len(keeper.documents), 3)
+        self.assertIn("참새", keeper.retrieve("참새", top_k=1, chapter=2)[0])
+
+    def test_snapshot_from_another_model_is_ignored(self):
+        from src.impl.lore_keeper_impl import LoreKeeperImpl
+        path = os.path.join(tempfile.mkdtemp(), "lore.npz")
+        self._built_keeper().save_snapshot(path)
+        with patch.dict(os.environ, {"LORE_HASH_DIM": "32"}):
+            keeper = LoreKeeperImpl()
+        self.assertFalse(keeper.load_snapshot(path))
+        self.assertIsNone(keeper.vector_store)
+        self.assertFalse(keeper.load_snapshot(path + ".missing"))
+
+
+if __name__ == '__main__':
+    unittest.main()
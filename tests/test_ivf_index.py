@@ -0,0 +1,122 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+import numpy as np
+from langchain_core.documents import Document
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.impl.ivf_index import IVFIndex, kmeans
+from src.impl.vector_store import NumpyVectorStore
+
+
+def clustered(n=4000, dim=32, clusters=50, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)) * 3
+    labels = rng.integers(0, clusters, n)
+    vectors = (centers[labels] + rng.normal(size=(n, dim))).astype(np.float32)
+    queries = (centers[:20] + rng.normal(size=(20, dim))).astype(np.float32)
+    return vectors, queries
+
+
+class TestIVFIndex(unittest.TestCase):
+    def test_kmeans_separates_clusters(self):
+        rng = np.random.default_rng(1)
+        data = np.concatenate([rng.normal(size=(200, 4)) + 20, rng.normal(size=(200, 4)) - 20]).astype(np.float32)
+        centroids = kmeans(data, 2, seed=0)
+        self.assertEqual(sorted(np.sign(centroids[:, 0]).tolist()), [-1.0, 1.0])
+
+    def test_probe_returns_rows_of_closest_lists(self):
+        vectors, queries = clustered()
+        index = IVFIndex.build(vectors, n_lists=40)
+        self.assertEqual(index.offsets[-1], len(vectors))
+        rows = index.probe(queries[0], nprobe=3)
+        lists = set(index.assignments[rows].tolist())
+        self.assertEqual(len(lists), 3)
+        self.assertEqual(len(rows), sum(int(np.sum(index.assignments == i)) for i in lists))
+        self.assertEqual(len(index.probe(queries[0], nprobe=40)), len(vectors))
+
+
+class TestNumpyStoreIVF(unittest.TestCase):
+    def setUp(self):
+        self.vectors, self.queries = clustered()
+        self.ids = [f"id{i}" for i in range(len(self.vectors))]
+        self.metadatas = [{"book": "a" if i % 3 else "b"} for i in range(len(self.vectors))]
+
+    def _store(self, directory=None, **options):
+        store = NumpyVectorStore(persist_directory=directory, ann="ivf", ann_min_rows=100, **options)
+        store.add_embeddings(self.ids, self.ids, self.vectors, self.metadatas)
+        return store
+
+    def test_recall_against_exact(self):
+        exact = NumpyVectorStore()
+        exact.add_embeddings(self.ids, self.ids, self.vectors)
+        store = self._store(nprobe=4)
+        store.build_ann()
+        self.assertIsNotNone(store._ivf)
+        hits = sum(len({r for r, _ in store.search(q, k=3)} & {r for r, _ in exact.search(q, k=3)})
+                   for q in self.queries)
+        self.assertGreaterEqual(hits / (3 * len(self.queries)), 0.9)
+
+        # Probing every list is exact search
+        store.nprobe = store._ivf.n_lists
+        self.assertEqual(store.search(self.queries[0], k=3), exact.search(self.queries[0], k=3))
+
+    def test_small_store_stays_exact(self):
+        store = NumpyVectorStore(ann="ivf", ann_min_rows=10_000)
+        store.add_embeddings(self.ids, self.ids, self.vectors)
+        self.assertIsNone(store.build_ann())
+
+    def test_filter_and_writes_keep_lists_aligned(self):
+        store = self._store(nprobe=8)
+        store.build_ann()
+        results = store.search(self.queries[1], k=3, filter={"book": "b"})
+        self.assertTrue(all(self.metadatas[r]["book"] == "b" for r, _ in results))
+
+        store.delete(ids=self.ids[:500])
+        store.add_embeddings(["new"], ["new"], self.queries[2:3])
+        self.assertEqual(len(store._ivf.assignments), len(store))
+        self.assertEqual(store.ids[store.search(self.queries[2], k=1)[0][0]], "new")
+
+    def test_persisted_lists_are_reused(self):
+        directory = tempfile.mkdtemp()
+        store = self._store(directory, nprobe=4)
+        store.persist()
+
+        with patch('src.impl.ivf_index.kmeans') as mock_kmeans:
+            loaded = NumpyVectorStore.load(directory, ann="ivf", nprobe=4, ann_min_rows=100)
+            self.assertEqual(loaded.search(self.queries[3], k=3), store.search(self.queries[3], k=3))
+        mock_kmeans.assert_not_called()
+        self.assertIsNotNone(loaded._ivf)
+
+    def test_combines_with_quantization(self):
+        store = self._store(nprobe=6, quantization="int8")
+        store.build_ann()
+        exact = NumpyVectorStore()
+        exact.add_embeddings(self.ids, self.ids, self.vectors)
+        self.assertEqual(store.search(self.queries[4], k=1)[0][0], exact.search(self.queries[4], k=1)[0][0])
+
+
+@patch.dict(os.environ, {"AI_PROVIDER": "offline", "LORE_VECTOR_BACKEND": "numpy", "LORE_VECTOR_ANN": "ivf",
+                         "LORE_ANN_MIN_ROWS": "10", "LORE_ANN_NPROBE": "2", "LORE_HASH_DIM": "64"})
+class TestLoreKeeperIVF(unittest.TestCase):
+    def test_build_persists_ivf_and_retrieves(self):
+        from src.impl.lore_keeper_impl import LoreKeeperImpl
+        db_path = tempfile.mkdtemp()
+        documents = [Document(page_content=f"{i}번째 이야기: 콩쥐가 {i}번 물을 길었습니다.") for i in range(40)]
+        documents.append(Document(page_content="두꺼비가 나타나 깨진 독의 구멍을 막아 주었습니다."))
+
+        for _ in range(2):
+            keeper = LoreKeeperImpl()
+            keeper.db_path = db_path
+            keeper.documents = documents
+            keeper.build_index()
+            self.assertIsNotNone(keeper.vector_store._ivf)
+            self.assertTrue(os.path.exists(os.path.join(keeper._index_dir(), "ivf.npz")))
+            self.assertIn("두꺼비", keeper.retrieve("두꺼비가 독의 구멍을 막아 주었다", top_k=1)[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
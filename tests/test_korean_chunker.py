@@ -0,0 +1,72 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.impl.korean_chunker import KoreanStructureChunker, paragraph_spans, sentence_spans
+
+BOOK = (
+    "# 콩쥐팥쥐\n\n"
+    "## 제1장: 시작\n\n"
+    "콩쥐는 착한 소녀였습니다. 새어머니는 콩쥐를 구박했어요. 왜 그랬을까?\n\n"
+    "\"콩쥐야, 물을 길어 오너라.\"\n\n"
+    "## 제2장: 과제\n\n"
+    "밑 빠진 독에 물을 채워야 했습니다. 두꺼비가 도와주었습니다.\n"
+)
+
+
+class TestKoreanStructureChunker(unittest.TestCase):
+    def test_sentence_and_paragraph_spans(self):
+        text = "첫 문장입니다. 둘째 문장이에요! 셋째는 어떨까? \"따옴표.\" 끝 없는 문장"
+        sentences = [text[s:e] for s, e in sentence_spans(text, 0, len(text))]
+        self.assertEqual(sentences, ["첫 문장입니다.", "둘째 문장이에요!", "셋째는 어떨까?", "\"따옴표.\"", "끝 없는 문장"])
+        self.assertEqual([BOOK[s:e] for s, e in paragraph_spans(BOOK)][:3],
+                         ["# 콩쥐팥쥐", "## 제1장: 시작", BOOK.split("\n\n")[2]])
+
+    def test_chunks_are_exact_slices_with_metadata(self):
+        docs = KoreanStructureChunker(chunk_size=60, chunk_overlap=20).split_text(BOOK, {"book": "story"})
+        for doc in docs:
+            meta = doc.metadata
+            self.assertEqual(BOOK[meta["start_index"]:meta["end_index"]], doc.page_content)
+            self.assertEqual(meta["book"], "story")
+            self.assertLessEqual(len(doc.page_content), 60)
+            self.assertLessEqual(meta["paragraph"], meta["paragraph_end"])
+        self.assertEqual({doc.metadata["chapter"] for doc in docs}, {1, 2})
+        # No chunk crosses a chapter heading
+        self.assertTrue(all(doc.page_content.count("## ") <= 1 for doc in docs))
+
+    def test_long_paragraphs_split_at_sentence_ends(self):
+        paragraph = " ".join(f"{i}번째 문장은 여기서 끝납니다." for i in range(20))
+        docs = KoreanStructureChunker(chunk_size=100, chunk_overlap=30).split_text(paragraph)
+        self.assertGreater(len(docs), 3)
+        self.assertTrue(all(doc.page_content.endswith("끝납니다.") for doc in docs))
+        # Overlap is whole sentences carried over from the previous chunk
+        self.assertTrue(any(docs[i + 1].metadata["start_index"] < docs[i].metadata["end_index"]
+                            for i in range(len(docs) - 1)))
+
+    def test_overlong_sentence_is_hard_cut(self):
+        docs = KoreanStructureChunker(chunk_size=50, chunk_overlap=10).split_text("가" * 130)
+        self.assertEqual([len(doc.page_content) for doc in docs], [50, 50, 30])
+
+    def test_overlap_must_be_smaller_than_size(self):
+        with self.assertRaises(ValueError):
+            KoreanStructureChunker(chunk_size=100, chunk_overlap=100)
+
+
+@patch.dict(os.environ, {"AI_PROVIDER": "offline", "LORE_CHUNKER": "structure"})
+class TestLoreKeeperStructureChunker(unittest.TestCase):
+    def test_chunker_selected_by_env_and_fingerprinted(self):
+        from src.impl.lore_keeper_impl import LoreKeeperImpl
+        from src.impl.index_manifest import config_fingerprint
+        keeper = LoreKeeperImpl()
+        self.assertEqual(keeper.chunker, "structure")
+        docs = keeper._split_text(BOOK, {"book": "story"})
+        self.assertIn("paragraph", docs[0].metadata)
+        self.assertNotEqual(config_fingerprint("m", 1000, 200, "c", "structure"),
+                            config_fingerprint("m", 1000, 200, "c", "chapters"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,10 @@
 import unittest
-from unittest.mock import MagicMock, patch, mock_open
+from unittest.mock import MagicMock, AsyncMock, patch, mock_open
+import asyncio
 import os
 import sys
+import tempfile
+from langchain_core.documents import Document
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -27,16 +30,68 @@ class TestLoreKeeperImpl(unittest.TestCase):
     @patch('src.impl.lore_keeper_impl.Chroma')
     @patch('src.impl.lore_keeper_impl.OllamaEmbeddings')
     def test_build_index(self, mock_embeddings, mock_chroma):
-        """Test building index calls ChromaDB with documents"""
+        """Test building index writes embedded chunks into ChromaDB"""
+        mock_embeddings.return_value.embed_documents.side_effect = lambda texts: [[0.1, 0.2] for _ in texts]
         keeper = self.impl_class()
+        keeper.db_path = tempfile.mkdtemp()
         
         # Mock documents
-        keeper.documents = [MagicMock(), MagicMock()] 
+        keeper.documents = [Document(page_content="chunk1"), Document(page_content="chunk2")]
         
         keeper.build_index()
         
-        # Verify Chroma.from_documents is called
-        mock_chroma.from_documents.assert_called_once()
+        # Verify embedded chunks were upserted into the collection
+        mock_chroma.return_value._collection.upsert.assert_called_once()
+        self.assertEqual(len(mock_chroma.return_value._collection.upsert.call_args.kwargs["ids"]), 2)
+        self.assertEqual(keeper.index_stats["embedded"], 2)
+        self.assertFalse(keeper.fallback_mode)
+
+    @patch('src.impl.lore_keeper_impl.Chroma')
+    @patch('src.impl.lore_keeper_impl.OllamaEmbeddings')
+    def test_build_index_reuses_persisted_collection(self, mock_embeddings, mock_chroma):
+        """Second build with unchanged chunks must not re-embed anything"""
+        mock_embeddings.return_value.embed_documents.side_effect = lambda texts: [[0.1, 0.2] for _ in texts]
+        upsert = mock_chroma.return_value._collection.upsert
+        db_path = tempfile.mkdtemp()
+        first = self.impl_class()
+        first.db_path = db_path
+        first.documents = [Document(page_content="chunk1"), Document(page_content="chunk2")]
+        first.build_index()
+        stored_ids = upsert.call_args.kwargs["ids"]
+        upsert.reset_mock()
+
+        mock_chroma.return_value.get.return_value = {"ids": stored_ids}
+        second = self.impl_class()
+        second.db_path = db_path
+        second.documents = [Document(page_content="chunk1"), Document(page_content="chunk2")]
+        second.build_index()
+
+        upsert.assert_not_called()
+        self.assertEqual(second.index_stats, {"reused": 2, "embedded": 0, "deleted": 0})
+
+    @patch('src.impl.lore_keeper_impl.Chroma')
+    @patch('src.impl.lore_keeper_impl.OllamaEmbeddings')
+    def test_build_index_embeds_only_changed_chunks(self, mock_embeddings, mock_chroma):
+        """Changed chunks are embedded, removed chunks are purged"""
+        mock_embeddings.return_value.embed_documents.side_effect = lambda texts: [[0.1, 0.2] for _ in texts]
+        upsert = mock_chroma.return_value._collection.upsert
+        db_path = tempfile.mkdtemp()
+        first = self.impl_class()
+        first.db_path = db_path
+        first.documents = [Document(page_content="chunk1"), Document(page_content="chunk2")]
+        first.build_index()
+        stored_ids = upsert.call_args.kwargs["ids"]
+        upsert.reset_mock()
+
+        mock_chroma.return_value.get.return_value = {"ids": stored_ids}
+        second = self.impl_class()
+        second.db_path = db_path
+        second.documents = [Document(page_content="chunk1"), Document(page_content="chunk2 edited")]
+        second.build_index()
+
+        self.assertEqual(upsert.call_args.kwargs["documents"], ["chunk2 edited"])
+        mock_chroma.return_value.delete.assert_called_once_with(ids=[stored_ids[1]])
+        self.assertEqual(second.index_stats, {"reused": 1, "embedded": 1, "deleted": 1})
 
     @patch('builtins.open', new_callable=mock_open, read_data="Test story content")
     @patch('src.impl.lore_keeper_impl.RecursiveCharacterTextSplitter')
@@ -47,7 +102,9 @@ class TestLoreKeeperImpl(unittest.TestCase):
         # Setup mock splitter return
         mock_splitter_instance = mock_splitter.return_value
         mock_splitter_instance.split_text.return_value = ["chunk1", "chunk2"]
-        mock_splitter_instance.create_documents.return_value = ["doc1", "doc2"]
+        mock_splitter_instance.create_documents.return_value = [
+            Document(page_content="doc1"), Document(page_content="doc2")
+        ]
         
         keeper.load_book("dummy_path.txt")
         
@@ -56,6 +113,64 @@ class TestLoreKeeperImpl(unittest.TestCase):
         # Verify split called
         mock_splitter_instance.create_documents.assert_called()
         self.assertEqual(len(keeper.documents), 2)
+        # Lexical index is built at load time
+        self.assertEqual(len(keeper.lexical_index), 2)
+
+    def test_aretrieve_uses_async_embeddings(self):
+        """aretrieve embeds with aembed_query and searches by vector (no thread hop)"""
+        keeper = self.impl_class()
+        keeper.embeddings = MagicMock()
+        keeper.embeddings.aembed_query = AsyncMock(return_value=[0.1, 0.2])
+        keeper.vector_store = MagicMock()
+        keeper.vector_store.similarity_search_by_vector.return_value = [Document(page_content="독")]
+
+        result = asyncio.run(keeper.aretrieve("물을 붓는다", top_k=1))
+
+        self.assertEqual(result, ["독"])
+        keeper.embeddings.aembed_query.assert_awaited_once_with("물을 붓는다")
+        keeper.embeddings.embed_query.assert_not_called()
+        keeper.vector_store.similarity_search_by_vector.assert_called_once_with([0.1, 0.2], k=1)
+
+    def test_aretrieve_falls_back_on_embedding_error(self):
+        keeper = self.impl_class()
+        keeper.documents = [Document(page_content="콩쥐 이야기"), Document(page_content="두꺼비가 도와줌")]
+        keeper.embeddings = MagicMock()
+        keeper.embeddings.aembed_query = AsyncMock(side_effect=RuntimeError("429"))
+        keeper.vector_store = MagicMock()
+
+        self.assertEqual(asyncio.run(keeper.aretrieve("두꺼비", top_k=1)), ["두꺼비가 도와줌"])
+
+    @patch.dict(os.environ, {"AI_PROVIDER": "offline", "LORE_VECTOR_BACKEND": "numpy", "LORE_HASH_DIM": "64"})
+    def test_retrieve_is_lexical_until_background_build_completes(self):
+        """Serving starts on BM25 while build_index runs on another thread, then switches to vectors"""
+        import threading
+        keeper = self.impl_class()
+        keeper.db_path = tempfile.mkdtemp()
+        keeper.documents = [Document(page_content="콩쥐 이야기"), Document(page_content="두꺼비가 도와줌")]
+        self.assertEqual((keeper.vector_ready, keeper.search_mode), (False, "lexical"))
+
+        started, release = threading.Event(), threading.Event()
+        initialize = keeper._initialize_embeddings
+
+        def slow_initialize():
+            started.set()
+            release.wait(5)
+            initialize()
+
+        with patch.object(keeper, '_initialize_embeddings', side_effect=slow_initialize):
+            builder = threading.Thread(target=keeper.build_index)
+            builder.start()
+            self.assertTrue(started.wait(5))
+            keeper.vector_store = MagicMock()  # e.g. a previous index: not used while rebuilding
+            self.assertEqual(keeper.search_mode, "lexical")
+            self.assertEqual(keeper.retrieve("두꺼비", top_k=1), ["두꺼비가 도와줌"])
+            self.assertEqual(asyncio.run(keeper.aretrieve("두꺼비", top_k=1)), ["두꺼비가 도와줌"])
+            keeper.vector_store.similarity_search.assert_not_called()
+            release.set()
+            builder.join(5)
+
+        self.assertEqual((keeper.vector_ready, keeper.search_mode), (True, "vector"))
+        self.assertEqual(len(keeper.retrieve("두꺼비", top_k=2)), 2)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+from unittest.mock import patch
+import json
+import os
+import sys
+import tempfile
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.impl.lore_library import read_book_metadata, discover_books, ChunkCache
+
+KONGJWI = "# 콩쥐팥쥐\n\n## 제1장\n\n콩쥐는 밑 빠진 독에 물을 길었습니다. 두꺼비가 구멍을 막아 주었습니다.\n"
+HEUNGBU = "# 흥부와 놀부\n\n## 제1장\n\n흥부는 다리가 부러진 제비를 정성껏 치료해 주었습니다.\n"
+
+
+class TestLoreLibraryHelpers(unittest.TestCase):
+    def test_metadata_from_heading_and_sidecar(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, "heungbu.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(HEUNGBU)
+        self.assertEqual(read_book_metadata(path)["title"], "흥부와 놀부")
+
+        with open(os.path.join(directory, "heungbu.json"), 'w', encoding='utf-8') as f:
+            json.dump({"title": "흥부전", "region": "전라도", "nested": {"x": 1}}, f, ensure_ascii=False)
+        metadata = read_book_metadata(path)
+        self.assertEqual(metadata["title"], "흥부전")
+        self.assertEqual(metadata["region"], "전라도")
+        self.assertNotIn("nested", metadata)
+        self.assertEqual(metadata["book"], "heungbu")
+        # sidecar json is metadata, not a book
+        self.assertEqual([os.path.basename(p) for p in discover_books(directory)], ["heungbu.txt"])
+
+    def test_chunk_cache_keyed_by_hash_and_params(self):
+        from langchain_core.documents import Document
+        cache = ChunkCache(tempfile.mkdtemp())
+        cache.save("story", "h1", {"chunk_size": 10}, [Document(page_content="a", metadata={"book": "story"})])
+
+        self.assertEqual(cache.load("story", "h1", {"chunk_size": 10})[0].page_content, "a")
+        self.assertIsNone(cache.load("story", "h2", {"chunk_size": 10}))
+        self.assertIsNone(cache.load("story", "h1", {"chunk_size": 20}))
+
+
+@patch.dict(os.environ, {"AI_PROVIDER": "local", "LORE_VECTOR_BACKEND": "numpy",
+                         "LORE_EMBED_BATCH_WINDOW_MS": "0"})
+class TestLoreKeeperLibrary(unittest.TestCase):
+    def setUp(self):
+        self.library = tempfile.mkdtemp()
+        self.db_path = tempfile.mkdtemp()
+        self._write("kongjwi.txt", KONGJWI)
+        self._write("heungbu.txt", HEUNGBU)
+
+    def _write(self, name, text):
+        with open(os.path.join(self.library, name), 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def _keeper(self):
+        from src.impl.lore_keeper_impl import LoreKeeperImpl
+        keeper = LoreKeeperImpl()
+        keeper.db_path = self.db_path
+        keeper.embeddings = DeterministicFakeEmbedding(size=16)
+        keeper.load_library(self.library)
+        keeper.build_index()
+        return keeper
+
+    def test_restart_only_reindexes_changed_books(self):
+        first = self._keeper()
+        self.assertEqual(sorted(first.library_stats["added"]), ["heungbu", "kongjwi"])
+        self.assertEqual(first.index_stats["embedded"], 2)
+
+        self._write("heungbu.txt", HEUNGBU + "\n제비가 박씨를 물어다 주었습니다.\n")
+        os.remove(os.path.join(self.library, "kongjwi.txt"))
+        self._write("janghwa.txt", "# 장화홍련\n\n장화와 홍련 자매 이야기입니다.\n")
+
+        second = self._keeper()
+        self.assertEqual(second.library_stats["modified"], ["heungbu"])
+        self.assertEqual(second.library_stats["added"], ["janghwa"])
+        self.assertEqual(second.library_stats["deleted"], ["kongjwi"])
+        self.assertEqual(second.index_stats, {"reused": 0, "embedded": 2, "deleted": 2})
+        self.assertEqual(sorted(second.books), ["heungbu", "janghwa"])
+
+        third = self._keeper()
+        self.assertEqual(sorted(third.library_stats["unchanged"]), ["heungbu", "janghwa"])
+        self.assertEqual(third.index_stats["embedded"], 0)
+
+    def test_retrieve_filters_by_book(self):
+        keeper = self._keeper()
+        for query in ("제비", "두꺼비"):
+            self.assertIn("흥부", keeper.retrieve(query, top_k=3, book="heungbu")[0])
+            self.assertIn("콩쥐", keeper.retrieve(query, top_k=3, book="kongjwi")[0])
+            self.assertEqual(len(keeper.retrieve(query, top_k=3, book="heungbu")), 1)
+
+    def test_fallback_search_filters_by_book(self):
+        keeper = self._keeper()
+        keeper.fallback_mode = True
+        # No match inside the book -> first chunk of that book, never another tale
+        self.assertIn("흥부", keeper.retrieve("두꺼비", top_k=3, book="heungbu")[0])
+        self.assertIn("두꺼비", keeper.retrieve("두꺼비", top_k=3, book="kongjwi")[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
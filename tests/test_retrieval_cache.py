@@ -0,0 +1,93 @@
+import unittest
+from unittest.mock import patch
+import asyncio
+import os
+import sys
+import tempfile
+from langchain_core.documents import Document
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.impl.retrieval_cache import RetrievalResultCache
+from src.impl.embedding_cache import QueryEmbeddingCache
+from src.impl.choice_parser import extract_choices, resolve_choice
+
+
+class TestRetrievalResultCache(unittest.TestCase):
+    def test_lru_eviction_spares_pinned_entries(self):
+        cache = RetrievalResultCache(max_entries=2)
+        cache.put("warm", ["a"])
+        self.assertTrue(cache.pin("warm"))
+        self.assertFalse(cache.pin("missing"))
+        for i in range(5):
+            cache.put(i, [str(i)])
+        self.assertEqual(cache.get("warm"), ["a"])
+        self.assertIsNone(cache.get(0))
+        self.assertEqual(cache.get(4), ["4"])
+        self.assertEqual(cache.stats()["pinned"], 1)
+
+        cache.clear()
+        self.assertIsNone(cache.get("warm"))
+
+    def test_pinned_query_embedding_survives_ttl_and_eviction(self):
+        cache = QueryEmbeddingCache(max_entries=1, ttl_seconds=0.001)
+        cache.put("밑 빠진 독", "m", [1.0, 2.0])
+        self.assertTrue(cache.pin("밑 빠진 독", "m"))
+        cache.put("다른 질의", "m", [3.0])
+        with patch('src.impl.embedding_cache.time.time', return_value=10 ** 12):
+            self.assertEqual(cache.get("밑  빠진 독", "m"), [1.0, 2.0])
+
+
+class TestChoiceParser(unittest.TestCase):
+    def test_extract_last_choice_list(self):
+        story = "1. 예전 선택\n\n이야기...\n\n1. **독을 고친다**\n2) 운다\n3. 잔치로 간다\n"
+        self.assertEqual(extract_choices(story), ["독을 고친다", "운다", "잔치로 간다"])
+        self.assertEqual(extract_choices("선택지 없음"), [])
+
+    def test_resolve_numbered_input(self):
+        choices = ["독을 고친다", "운다"]
+        self.assertEqual(resolve_choice("2번", choices), "운다")
+        self.assertEqual(resolve_choice(" 1 ", choices), "독을 고친다")
+        self.assertEqual(resolve_choice("3", choices), "3")
+        self.assertEqual(resolve_choice("두꺼비를 부른다", choices), "두꺼비를 부른다")
+
+
+@patch.dict(os.environ, {"AI_PROVIDER": "offline", "LORE_VECTOR_BACKEND": "numpy", "LORE_HASH_DIM": "64"})
+class TestLoreKeeperWarmup(unittest.TestCase):
+    def _keeper(self):
+        from src.impl.lore_keeper_impl import LoreKeeperImpl
+        keeper = LoreKeeperImpl()
+        keeper.db_path = tempfile.mkdtemp()
+        keeper.documents = [
+            Document(page_content="콩쥐가 밑 빠진 독에 물을 붓습니다.", metadata={"chapter": 1}),
+            Document(page_content="두꺼비가 구멍을 막아 주었습니다.", metadata={"chapter": 1}),
+            Document(page_content="참새 떼가 곡식을 골라 주었습니다.", metadata={"chapter": 2}),
+        ]
+        keeper.build_index()
+        return keeper
+
+    def test_warm_queries_skip_embedding(self):
+        keeper = self._keeper()
+        stats = keeper.warmup(["밑 빠진 독에 물을 채운다", "밑 빠진 독에 물을 채운다", ""], top_k=1,
+                              chapter="chapter_1_house")
+        self.assertEqual(stats["queries"], 1)
+
+        inner = keeper.embeddings.embeddings
+        with patch.object(type(inner), 'embed_query', side_effect=AssertionError("embedded")), \
+                patch.object(type(inner), 'aembed_query', side_effect=AssertionError("embedded")), \
+                patch.object(keeper.vector_store, 'search', side_effect=AssertionError("searched")):
+            sync = keeper.retrieve("밑 빠진 독에 물을 채운다", top_k=1, chapter="chapter_1_house")
+            result = asyncio.run(keeper.aretrieve("밑 빠진 독에  물을 채운다", top_k=1, chapter="chapter_1_house"))
+        self.assertEqual(result, sync)
+        self.assertIn("독", result[0])
+
+    def test_rebuilding_the_index_clears_results(self):
+        keeper = self._keeper()
+        keeper.warmup(["참새"], top_k=1)
+        self.assertEqual(keeper.get_result_cache_stats()["pinned"], 1)
+        keeper.build_index()
+        self.assertEqual(keeper.get_result_cache_stats()["pinned"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
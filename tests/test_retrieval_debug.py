@@ -1,6 +1,7 @@
 
 import sys
 import os
+import tempfile
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -9,6 +10,7 @@ from src.impl.lore_keeper_impl import LoreKeeperImpl
 
 def test_retrieval():
     lore_keeper = LoreKeeperImpl()
+    lore_keeper.db_path = tempfile.mkdtemp()
     story_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'story.txt')
     
     print(f"Loading story from {story_path}...")
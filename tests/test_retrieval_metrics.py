@@ -0,0 +1,88 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import asyncio
+import os
+import sys
+import tempfile
+from langchain_core.documents import Document
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.impl.retrieval_metrics import LatencyHistogram, RetrievalMetrics, format_metrics
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_buckets_and_percentiles(self):
+        histogram = LatencyHistogram(bounds_ms=(1, 10, 100))
+        for ms in [0.5] * 90 + [50] * 9 + [400]:
+            histogram.observe(ms)
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot["count"], 100)
+        self.assertEqual(snapshot["buckets"], {"<=1ms": 90, "<=100ms": 9, "+inf": 1})
+        self.assertLessEqual(snapshot["p50_ms"], 1)
+        self.assertTrue(10 < snapshot["p95_ms"] <= 100)
+        self.assertEqual(snapshot["max_ms"], 400)
+        self.assertEqual(LatencyHistogram().snapshot()["p99_ms"], 0.0)
+
+    def test_span_records_when_the_block_raises(self):
+        metrics = RetrievalMetrics()
+        with self.assertRaises(RuntimeError):
+            with metrics.span("embed_query"):
+                raise RuntimeError("429")
+        self.assertEqual(metrics.snapshot("embed_query")["count"], 1)
+        self.assertEqual(metrics.snapshot("similarity_search")["count"], 0)
+        self.assertIn("stage:embed_query", format_metrics(metrics.snapshot()))
+        metrics.reset()
+        self.assertEqual(metrics.snapshot(), {"paths": {}, "stages": {}})
+
+
+@patch.dict(os.environ, {"AI_PROVIDER": "offline", "LORE_VECTOR_BACKEND": "numpy", "LORE_HASH_DIM": "64"})
+class TestLoreKeeperMetrics(unittest.TestCase):
+    def _keeper(self):
+        from src.impl.lore_keeper_impl import LoreKeeperImpl
+        keeper = LoreKeeperImpl()
+        keeper.db_path = tempfile.mkdtemp()
+        keeper.documents = [
+            Document(page_content="콩쥐가 밑 빠진 독에 물을 붓습니다."),
+            Document(page_content="두꺼비가 구멍을 막아 주었습니다."),
+        ]
+        return keeper
+
+    def test_paths_and_stages_are_counted(self):
+        keeper = self._keeper()
+        keeper.retrieve("두꺼비", top_k=1)  # index not built yet
+        keeper.build_index()
+        keeper.retrieve("두꺼비", top_k=1)
+        asyncio.run(keeper.aretrieve("두꺼비", top_k=1))
+        with patch.object(keeper.vector_store, 'search', side_effect=RuntimeError("boom")):
+            keeper.retrieve("독", top_k=1)
+
+        metrics = keeper.get_retrieval_metrics()
+        paths = {name: h["count"] for name, h in metrics["paths"].items()}
+        self.assertEqual(paths, {"fallback": 1, "vector": 1, "cached": 1, "error": 1})
+        stages = {name: h["count"] for name, h in metrics["stages"].items()}
+        self.assertEqual(stages["build_index"], 1)
+        self.assertEqual(stages["init_embeddings"], 1)
+        self.assertEqual(stages["embed_query"], 2)
+        self.assertEqual(stages["similarity_search"], 2)
+        self.assertEqual(stages["fallback_search"], 2)
+
+    def test_byok_path_times_client_lookup(self):
+        keeper = self._keeper()
+        keeper.build_index()
+        keeper.provider = "google"
+        user_store = MagicMock()
+        user_store.similarity_search_by_vector.return_value = [Document(page_content="두꺼비")]
+        with patch.object(keeper, '_resolve_search_target', return_value=(user_store, keeper.embeddings)):
+            keeper.retrieve("두꺼비", top_k=1, api_key="user-key")
+        with patch.object(keeper.byok_pool, 'get', side_effect=RuntimeError("bad key")):
+            keeper.retrieve("참새", top_k=1, api_key="bad-key")
+
+        metrics = keeper.get_retrieval_metrics()
+        self.assertEqual(metrics["paths"]["byok"]["count"], 1)
+        self.assertEqual(metrics["paths"]["error"]["count"], 1)
+        self.assertEqual(metrics["stages"]["byok_client"]["count"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+@patch.dict(os.environ, {"AI_PROVIDER": "local"})
+class TestGameSessionStreaming(unittest.TestCase):
+    def test_deltas_then_final_story_with_turn_and_state(self):
+        import web_server
+
+        async def astream_story(user_input, context):
+            for delta in ["콩쥐가 ", "물을 긷습니다.\n1. 두꺼비를 부른다"]:
+                yield delta
+            session.dungeon_master.last_story = "콩쥐가 물을 긷습니다.\n1. 두꺼비를 부른다"
+            session.dungeon_master.last_generation_stats = {"ttft_ms": 12.0, "total_ms": 30.0,
+                                                            "deltas": 2, "chars": 24}
+
+        keeper = MagicMock()
+        keeper.aretrieve = AsyncMock(return_value=["ctx"])
+        session = web_server.GameSession(keeper)
+        session.prefetch_enabled = False
+        sent = []
+
+        async def on_delta(delta):
+            sent.append(delta)
+
+        with patch.object(session.dungeon_master, 'astream_story', side_effect=astream_story):
+            response = asyncio.run(session.process_input("물을 긷는다", on_delta=on_delta))
+
+        self.assertEqual(sent, ["콩쥐가 ", "물을 긷습니다.\n1. 두꺼비를 부른다"])
+        self.assertEqual(response["type"], "story")
+        self.assertEqual(response["message"], "".join(sent))
+        self.assertEqual((response["turn"], response["ttft_ms"]), (1, 12.0))
+        self.assertEqual(response["state"]["scene"]["chapter"], "chapter_1_house")
+        self.assertEqual(session.last_choices, ["두꺼비를 부른다"])
+        self.assertGreaterEqual(web_server.generation_metrics.snapshot("ttft")["count"], 1)
+
+    def test_new_input_cancels_the_turn_in_flight(self):
+        import web_server
+        keeper = MagicMock()
+        keeper.aretrieve = AsyncMock(return_value=["ctx"])
+        session = web_server.GameSession(keeper)
+        session.prefetch_enabled = False
+        aborted = []
+
+        async def endless_stream(user_input, context):
+            try:
+                yield "콩쥐가 "
+                await asyncio.sleep(60)
+                yield "늦었습니다."
+            finally:
+                aborted.append(user_input)
+
+        async def scenario():
+            sent = []
+
+            async def on_delta(delta):
+                sent.append(delta)
+
+            with patch.object(session.dungeon_master, 'astream_story', side_effect=endless_stream):
+                session.turn_task = asyncio.create_task(session.process_input("물을 긷는다", on_delta=on_delta))
+                await asyncio.sleep(0.01)
+                cancelled = await session.cancel_turn()
+            return sent, cancelled, await session.cancel_turn()
+
+        sent, cancelled, again = asyncio.run(scenario())
+        self.assertEqual(sent, ["콩쥐가 "])
+        self.assertEqual((cancelled, again), (True, False))
+        self.assertEqual(aborted, ["물을 긷는다"])
+        self.assertEqual((session.turn_count, session.history), (0, []))
+
+    def test_meta_commands_do_not_count_as_game_input(self):
+        import web_server
+        for command in ["help", "STATUS", "persona", "persona dialect"]:
+            self.assertTrue(web_server.GameSession.is_meta_command(command), command)
+        for game_input in ["두꺼비를 부른다", "1", "helper를 찾는다"]:
+            self.assertFalse(web_server.GameSession.is_meta_command(game_input), game_input)
+
+
+if __name__ == '__main__':
+    unittest.main()
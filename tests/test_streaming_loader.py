@@ -0,0 +1,118 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+import tracemalloc
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.impl.streaming_loader import iter_text_blocks, iter_chunks, iter_batches
+
+PARAGRAPH = "콩쥐는 밑 빠진 독에 물을 길었습니다. 두꺼비가 나타나 구멍을 막아 주었습니다.\n\n"
+
+
+def _write_book(text):
+    path = os.path.join(tempfile.mkdtemp(), "big_story.txt")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return path
+
+
+class TestStreamingSplitter(unittest.TestCase):
+    def test_chunks_independent_of_block_size(self):
+        text = "# 콩쥐팥쥐\n\n" + "".join(f"{i}번째 문단. " + PARAGRAPH for i in range(80))
+        reference = [d.page_content for d in iter_chunks([text], 300, 60)]
+        self.assertGreater(len(reference), 5)
+        for block_size in (1, 7, 100, 999, 5000):
+            blocks = [text[i:i + block_size] for i in range(0, len(text), block_size)]
+            self.assertEqual([d.page_content for d in iter_chunks(blocks, 300, 60)], reference)
+
+    def test_chunks_record_source_offsets(self):
+        text = "".join(f"{i}장. " + PARAGRAPH for i in range(40))
+        for doc in iter_chunks(iter_text_blocks(_write_book(text), block_chars=128), 200, 40, {"book": "big"}):
+            start = doc.metadata["start_index"]
+            self.assertEqual(text[start:start + len(doc.page_content)], doc.page_content)
+            self.assertLessEqual(len(doc.page_content), 200)
+            self.assertEqual(doc.metadata["book"], "big")
+
+    def test_rejects_overlap_not_smaller_than_size(self):
+        with self.assertRaises(ValueError):
+            list(iter_chunks(["abc"], 100, 100))
+
+    def test_iter_batches(self):
+        self.assertEqual(list(iter_batches(range(5), 2)), [[0, 1], [2, 3], [4]])
+
+
+@patch.dict(os.environ, {"AI_PROVIDER": "local", "LORE_VECTOR_BACKEND": "chroma",
+                         "LORE_EMBED_BATCH_WINDOW_MS": "0"})
+class TestStreamingIngest(unittest.TestCase):
+    def _keeper(self, db_path):
+        from src.impl.lore_keeper_impl import LoreKeeperImpl
+        keeper = LoreKeeperImpl()
+        keeper.db_path = db_path
+        keeper.collection_name = "stream_test"
+        keeper.embeddings = DeterministicFakeEmbedding(size=8)
+        return keeper
+
+    def test_ingest_embeds_in_bounded_batches_and_is_incremental(self):
+        path = _write_book("# 콩쥐팥쥐\n\n" + "".join(f"{i}번째 문단. " + PARAGRAPH for i in range(600)))
+        db_path = tempfile.mkdtemp()
+        keeper = self._keeper(db_path)
+        batch_sizes = []
+
+        class CountingEmbedding(DeterministicFakeEmbedding):
+            def embed_documents(self, texts):
+                batch_sizes.append(len(texts))
+                return super().embed_documents(texts)
+
+        keeper.embeddings = CountingEmbedding(size=8)
+        stats = keeper.ingest_book_streaming(path, batch_size=16)
+
+        self.assertGreater(stats["chunks"], 16)
+        self.assertTrue(batch_sizes and max(batch_sizes) <= 16)
+        self.assertEqual(stats["embedded"], keeper.vector_store._collection.count())
+        self.assertEqual(keeper.documents, [])
+        self.assertIn("두꺼비", keeper.retrieve("두꺼비", top_k=1, book="big_story")[0])
+
+        # Re-ingesting the unchanged file embeds nothing
+        again = self._keeper(db_path).ingest_book_streaming(path, batch_size=16)
+        self.assertEqual(again["embedded"], 0)
+        self.assertEqual(again["reused"], stats["embedded"])
+
+    def test_streamed_collection_is_separate_from_the_library_index(self):
+        """Own fingerprint and collection: build_index() neither reuses nor purges streamed chunks"""
+        from langchain_core.documents import Document
+        db_path = tempfile.mkdtemp()
+        keeper = self._keeper(db_path)
+        stats = keeper.ingest_book_streaming(_write_book("".join(PARAGRAPH for _ in range(30))), batch_size=8)
+        self.assertNotEqual(keeper._stream_config_fingerprint(), keeper._config_fingerprint())
+
+        keeper.documents = [Document(page_content="참새들이 쌀을 골라 주었습니다.", metadata={"book": "other"})]
+        keeper.build_index()
+        self.assertEqual(keeper.vector_store._collection.count(), 1)
+        self.assertEqual(keeper._open_stream_store()._collection.count(), stats["embedded"])
+
+    @patch.dict(os.environ, {"LORE_VECTOR_BACKEND": "numpy"})
+    def test_numpy_backend_is_rejected(self):
+        keeper = self._keeper(tempfile.mkdtemp())
+        with self.assertRaises(ValueError):
+            keeper.ingest_book_streaming(_write_book(PARAGRAPH))
+
+    def test_peak_memory_far_below_file_size(self):
+        path = _write_book("".join(f"{i}번째 문단. " + PARAGRAPH for i in range(60000)))
+        file_size = os.path.getsize(path)
+        tracemalloc.start()
+        try:
+            count = sum(1 for _ in iter_batches(
+                iter_chunks(iter_text_blocks(path, block_chars=1 << 16), 1000, 200), 64))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertGreater(count, 0)
+        self.assertLess(peak, file_size / 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
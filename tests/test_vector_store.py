@@ -0,0 +1,146 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.impl.vector_store import NumpyVectorStore
+
+
+class TestNumpyVectorStore(unittest.TestCase):
+    def setUp(self):
+        self.embeddings = DeterministicFakeEmbedding(size=16)
+        self.docs = [Document(page_content=f"chunk {i}", metadata={"n": i}) for i in range(10)]
+
+    def _store(self, persist_directory=None):
+        store = NumpyVectorStore(embedding_function=self.embeddings, persist_directory=persist_directory)
+        store.add_documents(self.docs, ids=[f"id{i}" for i in range(10)])
+        return store
+
+    def test_matrix_is_contiguous_float32(self):
+        store = self._store()
+        self.assertEqual(store.matrix.dtype, np.float32)
+        self.assertTrue(store.matrix.flags['C_CONTIGUOUS'])
+        self.assertEqual(store.matrix.shape, (10, 16))
+
+    def test_top_k_matches_exact_l2(self):
+        store = self._store()
+        query = self.embeddings.embed_query("chunk 3")
+        distances = ((store.matrix - np.asarray(query, dtype=np.float32)) ** 2).sum(axis=1)
+        expected = [f"chunk {i}" for i in np.argsort(distances)[:3]]
+
+        results = store.similarity_search("chunk 3", k=3)
+        self.assertEqual([d.page_content for d in results], expected)
+        self.assertEqual(results[0].page_content, "chunk 3")
+
+    def test_delete_and_replace(self):
+        store = self._store()
+        store.delete(ids=["id0", "id1"])
+        self.assertEqual(len(store), 8)
+        self.assertNotIn("id0", store.get(include=[])["ids"])
+
+        store.add_documents([Document(page_content="new")], ids=["id2"])
+        self.assertEqual(len(store), 8)
+        self.assertIn("new", store.get()["documents"])
+
+    def test_persist_and_mmap_load(self):
+        directory = tempfile.mkdtemp()
+        self._store(directory).persist()
+
+        loaded = NumpyVectorStore.load(directory, self.embeddings, mmap=True)
+        self.assertIsInstance(loaded.matrix, np.memmap)
+        self.assertEqual(loaded.similarity_search("chunk 7", k=1)[0].metadata, {"n": 7})
+
+    def test_load_missing_directory_is_empty(self):
+        store = NumpyVectorStore.load(os.path.join(tempfile.mkdtemp(), "none"))
+        self.assertEqual(len(store), 0)
+        self.assertEqual(store.search([0.0] * 4, k=3), [])
+
+
+class TestQuantizedSearch(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        centers = rng.normal(size=(40, 64))
+        self.vectors = (centers[rng.integers(0, 40, 3000)] + 0.3 * rng.normal(size=(3000, 64))).astype(np.float32)
+        self.queries = (centers[:20] + 0.3 * rng.normal(size=(20, 64))).astype(np.float32)
+        self.ids = [f"id{i}" for i in range(len(self.vectors))]
+        self.metadatas = [{"book": "a" if i % 2 else "b"} for i in range(len(self.vectors))]
+
+    def _store(self, quantization, persist_directory=None):
+        store = NumpyVectorStore(persist_directory=persist_directory, quantization=quantization)
+        store.add_embeddings(self.ids, self.ids, self.vectors, self.metadatas)
+        return store
+
+    def test_recall_against_exact_search(self):
+        exact = self._store(None)
+        for mode in ("float16", "int8"):
+            store = self._store(mode)
+            hits = 0
+            for q in self.queries:
+                expected = exact.search(q, k=5)
+                results = store.search(q, k=5)
+                hits += len({r for r, _ in results} & {r for r, _ in expected})
+                # Returned distances are exact (rescored at full precision)
+                for row, distance in results:
+                    self.assertAlmostEqual(distance, float(((self.vectors[row] - q) ** 2).sum()), places=2)
+            self.assertGreaterEqual(hits / (5 * len(self.queries)), 0.95, mode)
+
+    def test_filter_with_quantization(self):
+        store = self._store("int8")
+        results = store.search(self.queries[0], k=5, filter={"book": "a"})
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(self.metadatas[r]["book"] == "a" for r, _ in results))
+
+    def test_memory_and_persisted_codes(self):
+        directory = tempfile.mkdtemp()
+        store = self._store("int8", directory)
+        store.persist()
+        # After persisting, only the int8 codes stay resident
+        usage = store.memory_usage()
+        self.assertEqual(usage["matrix"], 0)
+        self.assertLess(usage["quantized"], self.vectors.nbytes / 3)
+
+        with patch('src.impl.vector_store.quantize') as mock_quantize:
+            loaded = NumpyVectorStore.load(directory, quantization="int8")
+            self.assertEqual(loaded.search(self.queries[0], k=3), store.search(self.queries[0], k=3))
+        mock_quantize.assert_not_called()
+
+        # A different mode ignores the sidecar and quantizes again
+        self.assertEqual(NumpyVectorStore.load(directory, quantization="float16").search(self.queries[1], k=3),
+                         store.search(self.queries[1], k=3))
+
+    def test_writes_invalidate_codes(self):
+        store = self._store("float16")
+        store.search(self.queries[0], k=3)
+        store.add_embeddings(["new"], ["new"], self.queries[:1])
+        self.assertEqual(store.ids[store.search(self.queries[0], k=1)[0][0]], "new")
+
+
+class TestLoreKeeperNumpyBackend(unittest.TestCase):
+    @patch.dict(os.environ, {"AI_PROVIDER": "local"})
+    def test_retrieve_matches_chroma_backend(self):
+        """Both backends return the same chunks in the same order"""
+        from src.impl.lore_keeper_impl import LoreKeeperImpl
+        story_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'story.txt')
+
+        results = {}
+        for backend in ("numpy", "chroma"):
+            with patch.dict(os.environ, {"LORE_VECTOR_BACKEND": backend}):
+                keeper = LoreKeeperImpl()
+            keeper.db_path = tempfile.mkdtemp()
+            keeper.embeddings = DeterministicFakeEmbedding(size=32)
+            keeper.load_book(story_path)
+            keeper.build_index()
+            self.assertFalse(keeper.fallback_mode)
+            results[backend] = keeper.retrieve("두꺼비가 독을 막아주었다", top_k=3)
+
+        self.assertEqual(results["numpy"], results["chroma"])
+
+
+if __name__ == '__main__':
+    unittest.main()
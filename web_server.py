@@ -29,8 +29,11 @@ load_dotenv()
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from src.impl.lore_keeper_impl import LoreKeeperImpl
-from src.impl.dungeon_master_impl import DungeonMasterImpl
+from src.impl.dungeon_master_impl import DungeonMasterImpl, PROLOGUE_TEXT
 from src.impl.game_state_impl import GameStateImpl
+from src.impl.choice_parser import extract_choices, resolve_choice
+from src.impl.choice_prefetch import ChoicePrefetcher
+from src.impl.retrieval_metrics import RetrievalMetrics
 
 app = FastAPI(title="전래동화 리부트")
 
@@ -39,48 +42,135 @@ app = FastAPI(title="전래동화 리부트")
 game_sessions = {}
 # 전역 LoreKeeper 인스턴스 (싱글톤)
 global_lore_keeper = None
+# 백그라운드 벡터 인덱스 빌드 태스크 (참조를 유지해야 GC되지 않음)
+index_build_task = None
+# 스냅샷 로드 후 검색 캐시 워밍 태스크
+warmup_task = None
+# 스토리 생성 지연 히스토그램 (ttft: 첫 토큰까지, generation: 스트림 완료까지), 전체 세션 합산
+generation_metrics = RetrievalMetrics()
 
 @app.on_event("startup")
 async def startup_event():
     """서버 시작 시 LoreKeeper 초기화 (DB 동시성 문제 방지)"""
     print("\n\n🔥 [VERSION CHECK] New Server Code Loaded (Instant Prologue Enabled) 🔥\n\n")
-    global global_lore_keeper
+    global global_lore_keeper, index_build_task, warmup_task
     print("🚀 서버 시작: 지식 베이스 초기화 중...")
     global_lore_keeper = LoreKeeperImpl()
     
-    story_path = os.path.join(os.path.dirname(__file__), 'data', 'story.txt')
-    if os.path.exists(story_path):
-        # 비동기 환경에서 동기 메서드 실행 시 주의 필요하지만, 
-        # 초기화는 블로킹되어도 안전함
-        global_lore_keeper.load_book(story_path)
-        global_lore_keeper.build_index()
-        print("✅ 지식 베이스 준비 완료")
+    data_dir = os.path.join(os.path.dirname(__file__), 'data')
+    # 배포 시 미리 만든 스냅샷이 있으면 임베딩 없이 바로 로드 (scripts/build_index_snapshot.py)
+    snapshot_path = os.getenv("LORE_INDEX_SNAPSHOT")
+    if snapshot_path and global_lore_keeper.load_snapshot(snapshot_path):
+        print(f"✅ 인덱스 스냅샷 로드 완료 (동화 {len(global_lore_keeper.books)}편)")
+        # 워밍은 임베딩 호출이 있어 워커 스레드에서 (이벤트 루프를 막지 않음)
+        warmup_task = asyncio.create_task(asyncio.to_thread(warmup_retrieval_cache, global_lore_keeper))
+    elif os.path.isdir(data_dir):
+        # data/ 아래 모든 동화를 로드하고 BM25 인덱스만 만든 뒤 바로 접속을 받음
+        # (변경된 파일만 다시 청킹, 임베딩은 하지 않음)
+        global_lore_keeper.load_library(data_dir)
+        print(f"✅ 키워드 검색 준비 완료 (동화 {len(global_lore_keeper.books)}편) - 벡터 인덱스는 백그라운드에서 생성")
+        index_build_task = asyncio.create_task(build_vector_index(global_lore_keeper))
     else:
-        print("⚠️ 스토리 파일을 찾을 수 없습니다.")
+        print("⚠️ 스토리 폴더를 찾을 수 없습니다.")
+
+
+async def build_vector_index(lore_keeper: LoreKeeperImpl) -> None:
+    """
+    벡터 인덱스를 워커 스레드에서 생성 (이벤트 루프는 계속 접속/턴을 처리)
+    완료 전까지 retrieve()는 BM25 검색을 쓰고, 완료되면 자동으로 벡터 검색으로 전환됨
+    """
+    await asyncio.to_thread(lore_keeper.build_index)
+    if not lore_keeper.vector_ready:
+        print("⚠️ 벡터 인덱스 생성 실패: 키워드 검색으로 계속 서비스합니다.")
+        return
+    print(f"✅ 벡터 인덱스 준비 완료: {lore_keeper.search_mode} 검색으로 전환")
+    await asyncio.to_thread(warmup_retrieval_cache, lore_keeper)
+
+
+def warmup_queries() -> list:
+    """
+    첫 턴에 들어올 가능성이 높은 입력 목록
+    프롤로그의 선택지 + LORE_WARMUP_QUERIES ('|'로 구분한 자주 쓰는 입력)
+    """
+    frequent = [q.strip() for q in os.getenv("LORE_WARMUP_QUERIES", "").split("|") if q.strip()]
+    return extract_choices(PROLOGUE_TEXT) + frequent
+
+
+def warmup_retrieval_cache(lore_keeper: LoreKeeperImpl) -> None:
+    """첫 턴 검색 결과와 쿼리 임베딩을 미리 계산해 캐시에 고정 (첫 턴에 임베딩 지연 없음)"""
+    # 새 세션의 첫 장면과 같은 조건(전체 라이브러리, 첫 챕터)으로 검색해 두어야 캐시가 맞음
+    first_chapter = GameStateImpl().get_scene().get("chapter")
+    stats = lore_keeper.warmup(warmup_queries(), top_k=3, chapter=first_chapter)
+    print(f"🔥 검색 캐시 워밍 완료: {stats['queries']}개 입력 ({stats['seconds']:.1f}s)")
 
 
 class GameSession:
-    def __init__(self, lore_keeper: LoreKeeperImpl, persona_type: str = "classic"):
+    def __init__(self, lore_keeper: LoreKeeperImpl, persona_type: str = "classic", book: Optional[str] = None):
         self.game_state = GameStateImpl()
         # 공유된 LoreKeeper 사용 (Read-only)
         self.lore_keeper = lore_keeper
+        # 이 세션이 플레이 중인 동화 (None이면 전체 라이브러리 검색)
+        self.book = book
         self.dungeon_master = DungeonMasterImpl(
             game_state=self.game_state,
             persona_type=persona_type
         )
+        # 검색된 청크를 원문 위치로 되돌려 겹치는 부분을 병합 (프롬프트 토큰 절약)
+        if lore_keeper is not None:
+            self.dungeon_master.set_chunk_locator(lore_keeper.locate_chunk)
         self.history = []
         self.turn_count = 0
         self.initialized = False
         self.last_failed_input = None
         self.user_api_key = None
+        # 진행 중인 턴(검색 + 스토리 생성) 태스크: 연결 종료/새 입력 시 취소해 LLM 요청과 쿼터를 아낌
+        self.turn_task = None
+        # 마지막 스토리의 선택지 ("1", "2번" 같은 입력을 선택지 문장으로 바꿔 검색)
+        self.last_choices = extract_choices(PROLOGUE_TEXT)
+        # 플레이어가 읽는 동안 제시된 선택지들의 검색을 미리 시작 (다음 턴에 선택지/비슷한 말을 고르면 바로 사용)
+        self.prefetch_enabled = lore_keeper is not None and os.getenv("LORE_PREFETCH_CHOICES", "1") != "0"
+        self.prefetcher = ChoicePrefetcher(
+            self._prefetch_retrieve,
+            ttl_seconds=float(os.getenv("LORE_PREFETCH_TTL_SECONDS", "120"))
+        )
     
     async def initialize(self):
         """게임 초기화"""
         if not self.initialized:
             self.initialized = True
+            self._start_prefetch()
+
+    async def cancel_turn(self) -> bool:
+        """진행 중인 턴을 취소하고 끝날 때까지 대기 (취소한 턴이 있으면 True)"""
+        task, self.turn_task = self.turn_task, None
+        if task is None or task.done():
+            return False
+        task.cancel()
+        # asyncio.wait 는 태스크의 CancelledError 를 다시 던지지 않음 (호출자 자신의 취소는 그대로 전파)
+        await asyncio.wait([task])
+        print("[INFO] In-flight turn cancelled")
+        return True
+
+    async def _prefetch_retrieve(self, choice: str, chapter) -> list:
+        return await self.lore_keeper.aretrieve(choice, 3, self.user_api_key, book=self.book, chapter=chapter)
+
+    def _start_prefetch(self) -> None:
+        """현재 선택지들의 검색을 백그라운드로 시작 (이전 턴의 선택지 결과는 버림)"""
+        if self.prefetch_enabled and self.last_choices:
+            self.prefetcher.prefetch(self.last_choices, self.game_state.get_scene().get("chapter"))
     
-    async def process_input(self, user_input: str) -> dict:
-        """사용자 입력 처리"""
+    @staticmethod
+    def is_meta_command(user_input: str) -> bool:
+        """help / status / persona: 게임 진행과 무관한 명령 (진행 중인 턴을 취소하지 않음)"""
+        command = user_input.lower()
+        return command in ('help', 'status') or command.startswith('persona')
+
+    async def process_input(self, user_input: str, on_delta=None) -> dict:
+        """
+        사용자 입력 처리
+        on_delta(텍스트 조각) 코루틴을 주면 스토리를 토큰 단위로 스트리밍하고,
+        반환값(최종 story 메시지)에는 완성된 스토리와 턴/상태가 담김
+        """
         # 메타 커맨드 처리
         if user_input.lower() == 'help':
             return {
@@ -97,24 +187,46 @@ class GameSession:
         
         # 일반 게임 입력 처리
         try:
-            # RAG 검색 (비동기 실행으로 변경하여 UI 블로킹 방지)
-            context = await asyncio.to_thread(self.lore_keeper.retrieve, user_input, 3, self.user_api_key)
+            # RAG 검색 (네이티브 async 임베딩 사용 - 세션마다 스레드를 점유하지 않음)
+            # 현재 장면의 장(chapter)을 먼저 검색하고, 매칭이 약하면 인접 장으로 넓힘
+            chapter = self.game_state.get_scene().get("chapter")
+            query = resolve_choice(user_input, self.last_choices)
+            context = await self.prefetcher.lookup(query, chapter) if self.prefetch_enabled else None
+            if context is None:
+                context = await self.lore_keeper.aretrieve(query, 3, self.user_api_key, book=self.book,
+                                                           chapter=chapter)
             
-            # AI 스토리 생성 (비동기 실행)
-            story_segment = await asyncio.to_thread(self.dungeon_master.generate_story, user_input, context)
+            # AI 스토리 생성 (스트리밍이면 조각마다 on_delta 전송, 아니면 ainvoke로 한 번에)
+            # 둘 다 네이티브 async라 턴 태스크가 취소되면 업스트림 요청도 함께 중단됨
+            generation = None
+            if on_delta is not None:
+                async for delta in self.dungeon_master.astream_story(user_input, context):
+                    await on_delta(delta)
+                story_segment = self.dungeon_master.last_story
+                generation = self.dungeon_master.last_generation_stats
+                self._record_generation(generation)
+            else:
+                story_segment = await self.dungeon_master.agenerate_story(user_input, context)
             
             # 히스토리 저장
             self.history.append({"user": user_input, "ai": story_segment})
             self.turn_count += 1
+            self.last_choices = extract_choices(story_segment)
             
             # 선택 분석 및 기록
             self._analyze_and_record_choice(user_input)
+            self._start_prefetch()
             
-            return {
+            response = {
                 "type": "story",
                 "message": story_segment,
                 "turn": self.turn_count
             }
+            if on_delta is not None:
+                response["streamed"] = True
+                response["state"] = self._state_snapshot()
+                response["ttft_ms"] = generation.get("ttft_ms") if generation else None
+            return response
         except Exception as e:
             # Check for Google API Quota Error
             error_msg = str(e)
@@ -132,6 +244,23 @@ class GameSession:
                 "message": f"오류 발생: {str(e)}"
             }
     
+    def _state_snapshot(self) -> dict:
+        """스트리밍 최종 메시지에 실어 보내는 게임 상태"""
+        return {
+            "scene": self.game_state.get_scene(),
+            "reboot_score": self.game_state.get_reboot_score(),
+            "ending": self.game_state.determine_ending().value,
+        }
+
+    @staticmethod
+    def _record_generation(stats: Optional[dict]) -> None:
+        if not stats:
+            return
+        if stats.get("ttft_ms") is not None:
+            generation_metrics.observe("ttft", stats["ttft_ms"] / 1000)
+            print(f"[INFO] Story TTFT {stats['ttft_ms']:.0f}ms, total {stats['total_ms']:.0f}ms ({stats['deltas']} deltas)")
+        generation_metrics.observe("generation", stats["total_ms"] / 1000)
+
     def _get_help_text(self) -> str:
         return """
 **도움말**
@@ -214,12 +343,57 @@ class GameSession:
             self.game_state.record_choice("left_home_early", True)
 
 
+async def run_turn(session: GameSession, websocket: WebSocket, user_input: str) -> None:
+    """한 턴 처리: 스토리는 story_delta 조각으로 스트리밍한 뒤 최종 story 메시지 전송"""
+    async def send_delta(delta: str, turn=session.turn_count + 1):
+        await websocket.send_json({"type": "story_delta", "delta": delta, "turn": turn})
+
+    try:
+        response = await session.process_input(user_input, on_delta=send_delta)
+        # 응답 전송
+        await websocket.send_json(response)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        # 연결이 이미 끊긴 경우 등 (process_input 자체의 오류는 error 메시지로 반환됨)
+        print(f"[WARN] Turn failed: {e}")
+
+
 @app.get("/")
 async def read_root():
     """메인 페이지"""
     return FileResponse("web/index.html")
 
 
+@app.get("/api/ready")
+async def get_readiness():
+    """검색 준비 상태 (mode: lexical → 벡터 인덱스 생성 중 또는 실패, vector/hybrid → 벡터 검색 사용 중)"""
+    if global_lore_keeper is None:
+        return {"ready": False, "vector_ready": False, "mode": None, "books": 0}
+    return {
+        "ready": bool(global_lore_keeper.documents),
+        "vector_ready": global_lore_keeper.vector_ready,
+        "mode": global_lore_keeper.search_mode,
+        "books": len(global_lore_keeper.books),
+    }
+
+
+@app.get("/api/metrics")
+async def get_metrics():
+    """검색 계측: 경로별(vector/byok/cached/fallback/breaker/error) 지연 히스토그램, 구간별 지연, 서킷 브레이커 상태, 캐시 카운터, 쿼리 임베딩 배치 분포"""
+    if global_lore_keeper is None:
+        return {"retrieval": {"paths": {}, "stages": {}}, "generation": generation_metrics.snapshot()["stages"]}
+    return {
+        "search_mode": global_lore_keeper.search_mode,
+        "retrieval": global_lore_keeper.get_retrieval_metrics(),
+        "query_cache": global_lore_keeper.get_cache_stats(),
+        "result_cache": global_lore_keeper.get_result_cache_stats(),
+        "byok_pool": global_lore_keeper.get_byok_pool_stats(),
+        "embedding_batcher": global_lore_keeper.get_batcher_stats(),
+        "generation": generation_metrics.snapshot()["stages"],
+    }
+
+
 @app.get("/api/personas")
 async def get_personas():
     """사용 가능한 페르소나 목록"""
@@ -248,9 +422,13 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
             # 첫 메시지로 페르소나 받기
             data = await websocket.receive_json()
             persona_type = data.get("persona", "classic")
+            # 플레이할 동화 선택 (없거나 모르는 동화면 전체 검색)
+            book = data.get("book")
+            if book not in global_lore_keeper.books:
+                book = None
             
             # 전역 lore_keeper 주입
-            game_sessions[session_id] = GameSession(global_lore_keeper, persona_type)
+            game_sessions[session_id] = GameSession(global_lore_keeper, persona_type, book)
 
             # 로그 콜백 설정 (WebSocket으로 전송, Thread-Safe)
             main_loop = asyncio.get_running_loop()
@@ -364,19 +542,10 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                             "message": "🤔 AI가 다시 생각하는 중..."
                         })
                         
-                        try:
-                            response = await asyncio.wait_for(session.process_input(retry_input), timeout=30.0)
-                            await websocket.send_json(response)
-                        except asyncio.TimeoutError:
-                             await websocket.send_json({
-                                "type": "error",
-                                "message": "❌ 응답 시간이 초과되었습니다. 다시 시도해주세요."
-                            })
-                        except Exception as e:
-                            await websocket.send_json({
-                                "type": "error",
-                                "message": f"❌ 오류 발생: {str(e)}"
-                            })
+                        # 일반 입력과 같은 턴 태스크로 실행 (스트리밍, 새 입력/연결 종료 시 취소)
+                        if await session.cancel_turn():
+                            await websocket.send_json({"type": "story_cancelled"})
+                        session.turn_task = asyncio.create_task(run_turn(session, websocket, retry_input))
                 else:
                     error_details = []
                     if not dm_success: error_details.append(f"DM: {dm_msg}")
@@ -392,16 +561,27 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
             if not user_input:
                 continue
 
-            # 입력 처리
-            response = await session.process_input(user_input)
-            
-            # 응답 전송
-            await websocket.send_json(response)
+            # 메타 커맨드는 바로 응답 (생성 중인 스토리는 그대로 계속)
+            if session.is_meta_command(user_input):
+                await websocket.send_json(await session.process_input(user_input))
+                continue
+
+            # 입력 처리: 턴을 태스크로 실행해 생성 중에도 다음 메시지(새 입력, 연결 종료)를 받음
+            # 새 게임 입력이 오면 이전 턴은 취소 (화면의 스트리밍 중이던 말풍선도 제거)
+            if await session.cancel_turn():
+                await websocket.send_json({"type": "story_cancelled"})
+            session.turn_task = asyncio.create_task(run_turn(session, websocket, user_input))
             
     except WebSocketDisconnect:
         if session_id in game_sessions:
+            await game_sessions[session_id].cancel_turn()
+            game_sessions[session_id].prefetcher.cancel()
             del game_sessions[session_id]
     except Exception as e:
+        # 루프가 끝났으므로 진행 중인 턴과 선택지 미리 검색도 정리
+        if session_id in game_sessions:
+            await game_sessions[session_id].cancel_turn()
+            game_sessions[session_id].prefetcher.cancel()
         await websocket.send_json({
             "type": "error",
             "message": f"오류 발생: {str(e)}"